@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Time humanize's detect() on large inputs, against one regex pass per rule."""
+
+import argparse
+import importlib.util
+import random
+import re
+import time
+from pathlib import Path
+
+HOOK = Path(__file__).parents[2] / "plugins/humanize/hooks/scripts/humanize.py"
+
+spec = importlib.util.spec_from_file_location("humanize", HOOK)
+humanize = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(humanize)
+
+
+def per_rule_detect(regions):
+    """Scan every region once per rule family and once per phrase, the pre-RULE_RE way."""
+    mark_re = re.compile("|".join(map(re.escape, humanize.MARKS)))
+    swap_re = re.compile(r"\b(" + "|".join(humanize.SWAP) + r")\b", re.IGNORECASE)
+    often_re = re.compile(r"\b(" + "|".join(humanize.OFTEN) + r")\b", re.IGNORECASE)
+    findings = []
+    piles = {}
+    for region in regions:
+        for match in mark_re.finditer(region.text):
+            rule, replacement = humanize.MARKS[match.group()]
+            findings.append(humanize.Finding(region, *match.span(), rule, replacement))
+        for match in swap_re.finditer(region.text):
+            word = match.group().lower()
+            replacement = humanize.SWAP[word]
+            replacement = replacement if replacement == "drop it" else f'use "{replacement}"'
+            findings.append(humanize.Finding(region, *match.span(), f'"{word}"', replacement))
+        for pattern, replacement in humanize.PHRASES:
+            for match in re.finditer(rf"\b(?:{pattern})\b", region.text, re.IGNORECASE):
+                findings.append(humanize.Finding(region, *match.span(), f'"{match.group()}"', replacement))
+        for match in often_re.finditer(region.text):
+            rule = f'"{match.group().lower()}"'
+            piles.setdefault(rule, []).append(humanize.Finding(region, *match.span(), rule, "vary it"))
+    return findings, {rule: matches for rule, matches in piles.items() if len(matches) >= humanize.LIMIT}
+
+
+def sample(size, density, seed):
+    """Build Markdown of about size bytes where density of the words hit a rule."""
+    rng = random.Random(seed)
+    plain = "the a report build team change file section page value of and to in with for user".split()
+    flagged = list(humanize.SWAP) + humanize.OFTEN + ["a testament to", "in summary", "plays a key role in shaping"]
+    words, length = [], 0
+    while length < size:
+        word = rng.choice(flagged) if rng.random() < density else rng.choice(plain)
+        word += rng.choice([" "] * 12 + [". ", ", ", "\n", "; ", " — "])
+        words.append(word)
+        length += len(word)
+    return "".join(words)[:size]
+
+
+def best(function, regions, repeat):
+    """Return the fastest of repeat calls in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(regions)
+        times.append((time.perf_counter() - started) * 1000)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=1 << 20, help="input bytes (default 1 MB)")
+    parser.add_argument("--repeat", type=int, default=5, help="calls per case, the fastest is reported")
+    args = parser.parse_args()
+
+    print(f"{'input':<28}{'per-rule ms':>12}{'combined ms':>13}{'speedup':>9}")
+    for label, density in (("plain text", 0.0), ("1% flagged words", 0.01), ("10% flagged words", 0.1)):
+        regions = [humanize.Region("bench.md", humanize.md_text(sample(args.size, density, 1)))]
+        if per_rule_detect(regions) != humanize.detect(regions):
+            raise SystemExit(f"detect() and the per-rule scan disagree on {label}")
+        old = best(per_rule_detect, regions, args.repeat)
+        new = best(humanize.detect, regions, args.repeat)
+        print(f"{label:<28}{old:>12.1f}{new:>13.1f}{old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
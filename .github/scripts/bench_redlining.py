@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Time RedliningValidator's tracked-change matching on heavily redlined documents, against per-element keys."""
+
+import argparse
+import random
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+OFFICE = Path(__file__).parents[2] / "plugins/anthropic-office-skills/skills/docx/scripts/office"
+sys.path.insert(0, str(OFFICE))
+
+from validators.redlining import RedliningValidator  # noqa: E402
+
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+AUTHORS = ["Alice", "Bob", "Carol", "Dave"]
+WORDS = "the party shall agreement term notice payment within days of any and to in such".split()
+
+
+def per_element_new_tracked_changes(validator, original_root, modified_root):
+    """Match tracked changes keying each element on every lookup, the pre-key-table way."""
+
+    def elements(root):
+        return [elem for elem in root.iter() if elem.tag in (f"{{{W}}}ins", f"{{{W}}}del")]
+
+    def key(elem):
+        nodes = [node for node in elem.iter() if node.tag in (f"{{{W}}}t", f"{{{W}}}delText")]
+        text = "".join(validator._rendered_text(node) for node in nodes)
+        return (elem.tag, elem.get(f"{{{W}}}author"), elem.get(f"{{{W}}}date"), text)
+
+    original, modified = elements(original_root), elements(modified_root)
+    pool = {}
+    for elem in original:
+        pool.setdefault(key(elem), []).append(elem)
+    matched, leftover = set(), []
+    for elem in modified:
+        bucket = pool.get(key(elem))
+        if bucket:
+            matched.add(bucket.pop())
+        else:
+            leftover.append(elem)
+    unmatched_original, by_group = {}, {}
+    for elem in original:
+        if elem not in matched:
+            unmatched_original.setdefault(key(elem)[:3], []).append(elem)
+    for elem in leftover:
+        by_group.setdefault(key(elem)[:3], []).append(elem)
+    new = set()
+    for group, elems in by_group.items():
+        rebuilt = "".join(key(e)[3] for e in elems)
+        if rebuilt and rebuilt == "".join(key(e)[3] for e in unmatched_original.get(group, [])):
+            continue
+        new.update(elems)
+    return new
+
+
+def run(tag, text):
+    """Return a <w:r> holding text as <w:t>, or <w:delText> inside a deletion."""
+    r = ET.Element(f"{{{W}}}r")
+    t = ET.SubElement(r, f"{{{W}}}delText" if tag == "del" else f"{{{W}}}t")
+    t.text = text
+    if text != text.strip():
+        t.set("{http://www.w3.org/XML/1998/namespace}space", "preserve")
+    return r
+
+
+def sample(changes, seed):
+    """Build an original body with changes tracked changes and a redlined copy that adds and splits some."""
+    rng = random.Random(seed)
+    body = ET.Element(f"{{{W}}}body")
+    for i in range(changes):
+        p = ET.SubElement(body, f"{{{W}}}p")
+        p.append(run("t", " ".join(rng.choices(WORDS, k=8)) + " "))
+        tag = rng.choice(["ins", "del"])
+        change = ET.SubElement(
+            p, f"{{{W}}}{tag}", {f"{{{W}}}author": rng.choice(AUTHORS), f"{{{W}}}date": f"2024-01-{i % 28 + 1:02d}"}
+        )
+        for _ in range(rng.randint(1, 4)):
+            change.append(run(tag, " ".join(rng.choices(WORDS, k=3)) + " "))
+        if tag == "ins" and rng.random() < 0.5:
+            nested = ET.SubElement(change, f"{{{W}}}del", {f"{{{W}}}author": "Reviewer"})
+            nested.append(run("del", rng.choice(WORDS)))
+    modified = ET.fromstring(ET.tostring(body))
+    paragraphs = list(modified)
+    for p in rng.sample(paragraphs, len(paragraphs) // 10):
+        change = ET.SubElement(p, f"{{{W}}}ins", {f"{{{W}}}author": "Reviewer"})
+        change.append(run("ins", " ".join(rng.choices(WORDS, k=3))))
+    for p in rng.sample(paragraphs, len(paragraphs) // 10):
+        change = p[1]
+        if len(change) > 1:
+            split = ET.Element(change.tag, change.attrib)
+            split.append(change[-1])
+            change.remove(change[-1])
+            p.insert(2, split)
+    return body, modified
+
+
+def best(function, args, repeat):
+    """Return the fastest of repeat calls in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(*args)
+        times.append((time.perf_counter() - started) * 1000)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--changes", type=int, default=10_000, help="tracked changes in the largest document")
+    parser.add_argument("--repeat", type=int, default=3, help="calls per case, the fastest is reported")
+    args = parser.parse_args()
+
+    validator = RedliningValidator(OFFICE, OFFICE / "original.docx")
+    print(f"{'tracked changes':<20}{'per-element ms':>15}{'key table ms':>14}{'speedup':>9}")
+    for changes in (args.changes // 100, args.changes // 10, args.changes):
+        original, modified = sample(changes, 1)
+        old_args = (validator, original, modified)
+        new_args = (original, modified)
+        if per_element_new_tracked_changes(*old_args) != validator._new_tracked_changes(*new_args):
+            raise SystemExit(f"the key table and per-element matching disagree at {changes} changes")
+        old = best(per_element_new_tracked_changes, old_args, args.repeat)
+        new = best(validator._new_tracked_changes, new_args, args.repeat)
+        print(f"{changes:<20}{old:>15.1f}{new:>14.1f}{old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Test that hooks run through the hookd server behave as if run directly."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+HOOKD = REPO_ROOT / "plugins/humanize/hooks/scripts/hookd.py"
+HUMANIZE = REPO_ROOT / "plugins/humanize/hooks/scripts/humanize.py"
+EVENT = json.dumps({"tool_name": "Write", "tool_input": {"file_path": "README.md", "content": "We leverage it."}})
+
+
+class HookdTest(unittest.TestCase):
+    """Test the hook server against direct runs of the same scripts."""
+
+    def setUp(self):
+        """Point hookd at a private socket and write a hook that exercises exit codes."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.env = {**os.environ, "HOOKD_SOCKET": str(self.root / "hookd.sock")}
+        self.hook = self.root / "exit_hook.py"
+        self.hook.write_text(
+            "import json, os, sys\n"
+            "data = json.load(sys.stdin)\n"
+            "print(json.dumps({'cwd': os.getcwd(), 'marker': os.environ.get('HOOKD_TEST_MARKER')}))\n"
+            "print('to stderr', file=sys.stderr)\n"
+            "sys.exit(data['exit'])\n"
+        )
+
+    def tearDown(self):
+        """Stop any server the test started and remove its files."""
+        subprocess.run([sys.executable, HOOKD, "--stop"], env=self.env, capture_output=True)
+        self.temp_dir.cleanup()
+
+    def run_hook(self, script, payload, env=None, direct=False, hookd=HOOKD):
+        """Run a hook through hookd, or directly, and return the completed process."""
+        command = [sys.executable, script] if direct else [sys.executable, "-I", "-S", hookd, script]
+        return subprocess.run(
+            command, input=payload, capture_output=True, text=True, env=env or self.env, cwd=self.root
+        )
+
+    def start_server(self, hookd=HOOKD, *preload):
+        """Start a server on the private socket and wait until it listens."""
+        subprocess.Popen(
+            [sys.executable, hookd, "--serve", *preload],
+            env=self.env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        for _ in range(100):
+            if (self.root / "hookd.sock").exists():
+                return
+            time.sleep(0.05)
+        self.fail("hookd did not start")
+
+    def test_served_hook_matches_direct_run(self):
+        """Give the same stdout, stderr and exit code served as run directly."""
+        self.start_server()
+        for script, payload in ((HUMANIZE, EVENT), (self.hook, json.dumps({"exit": 2}))):
+            direct = self.run_hook(script, payload, direct=True)
+            served = self.run_hook(script, payload)
+            self.assertEqual(
+                (served.stdout, served.stderr, served.returncode),
+                (direct.stdout, direct.stderr, direct.returncode),
+            )
+        self.assertIn("leverage", self.run_hook(HUMANIZE, EVENT).stdout)
+
+    def test_passes_cwd_and_environment(self):
+        """Run the script in the caller's directory with the caller's environment."""
+        self.start_server()
+        result = self.run_hook(self.hook, json.dumps({"exit": 0}), env={**self.env, "HOOKD_TEST_MARKER": "seen"})
+        self.assertEqual(json.loads(result.stdout), {"cwd": str(self.root.resolve()), "marker": "seen"})
+
+    def test_runs_directly_without_server(self):
+        """Run the hook in process when nothing listens, and start a server for next time."""
+        result = self.run_hook(self.hook, json.dumps({"exit": 3}))
+        self.assertEqual((result.returncode, result.stderr), (3, "to stderr\n"))
+        for _ in range(100):
+            if (self.root / "hookd.sock").exists():
+                break
+            time.sleep(0.05)
+        self.assertTrue((self.root / "hookd.sock").exists())
+
+    def test_disabled_runs_directly(self):
+        """Never start a server when HOOKD=0."""
+        result = self.run_hook(self.hook, json.dumps({"exit": 0}), env={**self.env, "HOOKD": "0"})
+        self.assertEqual(result.returncode, 0)
+        time.sleep(0.3)
+        self.assertFalse((self.root / "hookd.sock").exists())
+
+    def test_edited_script_is_reloaded(self):
+        """Pick up a hook script edited while the server runs."""
+        self.start_server()
+        self.assertEqual(self.run_hook(self.hook, json.dumps({"exit": 4})).returncode, 4)
+        edited = self.root / "edited.py"
+        shutil.copy(self.hook, edited)
+        edited.write_text(edited.read_text().replace("sys.exit(data['exit'])", "sys.exit(5)"))
+        self.assertEqual(self.run_hook(edited, json.dumps({"exit": 4})).returncode, 5)
+        edited.write_text(edited.read_text().replace("sys.exit(5)", "sys.exit(6)  # edited"))
+        self.assertEqual(self.run_hook(edited, json.dumps({"exit": 4})).returncode, 6)
+
+    def test_edited_sibling_module_is_reloaded(self):
+        """Pick up a module next to the hook edited while the server runs, as post_write.py's formatters."""
+        shutil.copy(HOOKD, self.root / "hookd.py")
+        (self.root / "helper.py").write_text("CODE = 7\n")
+        hook = self.root / "sibling_hook.py"
+        hook.write_text("import sys\nimport helper\n\nif __name__ == '__main__':\n    sys.exit(helper.CODE)\n")
+        self.start_server(self.root / "hookd.py", hook)
+        self.assertEqual(self.run_hook(hook, "{}", hookd=self.root / "hookd.py").returncode, 7)
+        (self.root / "helper.py").write_text("CODE = 8  # edited\n")
+        self.assertEqual(self.run_hook(hook, "{}", hookd=self.root / "hookd.py").returncode, 8)
+
+    def test_default_socket_in_private_dir(self):
+        """Put the default socket in a 0700 directory, and run hooks directly when that directory is not private."""
+        env = {key: value for key, value in self.env.items() if key not in ("HOOKD_SOCKET", "XDG_RUNTIME_DIR")}
+        env["TMPDIR"] = str(self.root)
+        private = self.root / f"hookd-{os.getuid()}"
+        try:
+            self.assertEqual(self.run_hook(self.hook, json.dumps({"exit": 0}), env=env).returncode, 0)
+            for _ in range(100):
+                if (private / "hookd.sock").exists():
+                    break
+                time.sleep(0.05)
+            self.assertTrue((private / "hookd.sock").exists())
+            self.assertEqual(private.stat().st_mode & 0o777, 0o700)
+        finally:
+            subprocess.run([sys.executable, HOOKD, "--stop"], env=env, capture_output=True)
+        shutil.rmtree(private)
+        private.mkdir(mode=0o777)
+        private.chmod(0o777)
+        subprocess.run([sys.executable, HOOKD, "--serve"], env=env, timeout=10)
+        self.assertFalse((private / "hookd.sock").exists())
+        self.assertEqual(self.run_hook(self.hook, json.dumps({"exit": 2}), env=env).returncode, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -113,6 +113,13 @@ class HumanizeTest(unittest.TestCase):
         self.assertIn('"leverage" at README.md:3:4, use "use"', reason)
         self.assertIn('"In conclusion" at README.md:4:1, drop it', reason)
 
+    def test_reports_words_inside_phrases(self):
+        """Report a phrase and the blocked words inside it, as separate rules."""
+        reason = run_hook("Write", {"file_path": "README.md", "content": "It is a vibrant tapestry.\n"})
+        self.assertIn('"vibrant tapestry" at README.md:1:9, drop the cliche', reason)
+        self.assertIn('"vibrant" at README.md:1:9, use "lively"', reason)
+        self.assertIn('"tapestry" at README.md:1:17, use "mix"', reason)
+
     def test_caps_pileup_locations(self):
         """Report five pile-up locations and count the remainder."""
         content = "\n".join(f"crucial item {i}" for i in range(7))
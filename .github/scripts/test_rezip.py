@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Test that rezip() against the original package copies unchanged members byte for byte."""
+
+import io
+import struct
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+OFFICE = REPO_ROOT / "plugins/anthropic-office-skills/skills/docx/scripts/office"
+
+sys.path.insert(0, str(OFFICE))
+from helpers import rezip, safe_extract  # noqa: E402
+
+CONTENT_TYPES = '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types"/>'
+DOCUMENT = "<w:document>" + "<w:p><w:r><w:t>Unchanged paragraph text.</w:t></w:r></w:p>" * 200 + "</w:document>"
+STYLES = "<w:styles>" + "<w:style w:styleId='Normal'/>" * 100 + "</w:styles>"
+IMAGE = bytes(range(256)) * 40
+
+
+class Unseekable(io.RawIOBase):
+    """A write-only stream, so zipfile writes every member with a data descriptor."""
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def writable(self):
+        """Accept writes."""
+        return True
+
+    def write(self, data):
+        """Append data to the buffer."""
+        return self.buffer.write(data)
+
+
+def raw_member(zf, info):
+    """Return a member's local header flags and its compressed bytes as stored."""
+    zf.fp.seek(info.header_offset)
+    header = zf.fp.read(30)
+    flags = struct.unpack("<H", header[6:8])[0]
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    zf.fp.seek(info.header_offset + 30 + name_len + extra_len)
+    return flags, zf.fp.read(info.compress_size)
+
+
+class RezipTest(unittest.TestCase):
+    """Test rezip(..., original=...) round trips."""
+
+    def setUp(self):
+        """Create a temp directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        """Remove the temp directory."""
+        self.temp_dir.cleanup()
+
+    def write_original(self, data_descriptor):
+        """Write the original package, with data descriptors when asked, and return its path.
+
+        It is deflated at level 1, so a member rezip() deflated again would not keep its bytes.
+        """
+        stream = Unseekable() if data_descriptor else io.BytesIO()
+        with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+            zf.writestr("[Content_Types].xml", CONTENT_TYPES, compress_type=zipfile.ZIP_STORED)
+            zf.writestr("word/document.xml", DOCUMENT)
+            zf.writestr("word/styles.xml", STYLES)
+            zf.writestr("word/media/image1.png", IMAGE)
+        original = self.root / ("descriptor.docx" if data_descriptor else "plain.docx")
+        original.write_bytes(stream.buffer.getvalue() if data_descriptor else stream.getvalue())
+        return original
+
+    def check_round_trip(self, data_descriptor, modified):
+        """Edit one part of an extracted original, rezip it, and check every member of the result."""
+        original = self.write_original(data_descriptor)
+        unpacked = self.root / f"unpacked-{original.stem}-{modified is None}"
+        with zipfile.ZipFile(original) as zf:
+            self.assertEqual(
+                all(info.flag_bits & 0x08 for info in zf.infolist()[1:]),
+                data_descriptor,
+            )
+            safe_extract(zf, unpacked)
+        edited = DOCUMENT.replace("Unchanged", "Changed", 1)
+        (unpacked / "word/document.xml").write_text(edited)
+        (unpacked / "word/new.xml").write_text("<new/>")
+        out = self.root / f"out-{original.stem}-{modified is None}.docx"
+        rezip(unpacked, out, original=original, modified=modified)
+
+        with zipfile.ZipFile(original) as src, zipfile.ZipFile(out) as dst:
+            self.assertIsNone(dst.testzip())
+            self.assertEqual(dst.namelist()[0], "[Content_Types].xml")
+            for info in dst.infolist():
+                flags, raw = raw_member(dst, info)
+                self.assertEqual(flags, info.flag_bits)
+                self.assertEqual(dst.read(info), (unpacked / info.filename).read_bytes())
+                if info.filename in ("word/document.xml", "word/new.xml"):
+                    self.assertEqual(info.compress_type, zipfile.ZIP_DEFLATED)
+                    continue
+                source = src.getinfo(info.filename)
+                self.assertEqual(raw, raw_member(src, source)[1])
+                self.assertFalse(info.flag_bits & 0x08)
+                self.assertEqual(
+                    (info.compress_type, info.CRC, info.compress_size),
+                    (source.compress_type, source.CRC, source.compress_size),
+                )
+            self.assertNotEqual(
+                raw_member(dst, dst.getinfo("word/document.xml"))[1],
+                raw_member(src, src.getinfo("word/document.xml"))[1],
+            )
+
+    def test_round_trip(self):
+        """Copy unchanged members still compressed and re-deflate the changed and new ones."""
+        for data_descriptor in (False, True):
+            for modified in (None, ["/word/document.xml", "/word/new.xml"]):
+                with self.subTest(data_descriptor=data_descriptor, modified=modified):
+                    self.check_round_trip(data_descriptor, modified)
+
+
+if __name__ == "__main__":
+    unittest.main()
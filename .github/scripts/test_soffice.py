@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Test soffice.py's seed profile checks and SofficePool job handling without a real LibreOffice."""
+
+import importlib.util
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+SOFFICE = REPO_ROOT / "plugins/anthropic-office-skills/skills/docx/scripts/office/soffice.py"
+
+spec = importlib.util.spec_from_file_location("soffice", SOFFICE)
+soffice = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(soffice)
+
+
+class Process:
+    """Stand in for a Popen whose poll() reports it alive or exited."""
+
+    def __init__(self, returncode=None):
+        self.returncode = returncode
+
+    def poll(self):
+        """Return None while alive, else the exit code."""
+        return self.returncode
+
+
+class StubInstance:
+    """Stand in for _Instance, running jobs with a given function."""
+
+    def __init__(self, work, returncode=None, start_error=None):
+        self.work = work
+        self.returncode = returncode
+        self.start_error = start_error
+        self.desktop = None
+        self.process = None
+        self.starts = 0
+        self.stops = 0
+
+    def start(self):
+        """Count the start, or fail like a LibreOffice that never answers."""
+        self.starts += 1
+        if self.start_error:
+            raise self.start_error
+        self.desktop = object()
+        self.process = Process(self.returncode)
+
+    def stop(self):
+        """Count the stop and forget the process."""
+        self.stops += 1
+        self.desktop = None
+        self.process = None
+
+    def run(self, job):
+        """Run the job with the stub's function."""
+        return self.work(job)
+
+
+def pool_of(instance):
+    """Return a SofficePool that hands every job to instance."""
+    pool = soffice.SofficePool(0)
+    pool._instances = [instance]
+    pool._idle.put(instance)
+    return pool
+
+
+class SofficePoolTest(unittest.TestCase):
+    """Test SofficePool.run against stub instances."""
+
+    def test_runs_job(self):
+        """Start an idle instance once and return the job's result."""
+        instance = StubInstance(lambda job: {"path": job["path"]})
+        pool = pool_of(instance)
+        self.assertEqual(pool.run({"path": "/a.docx"}), {"path": "/a.docx"})
+        self.assertEqual(pool.run({"path": "/b.docx"}), {"path": "/b.docx"})
+        self.assertEqual((instance.starts, instance.stops), (1, 0))
+
+    def test_timeout_kills_instance(self):
+        """Kill an instance that overruns the timeout and give it back for a restart."""
+        release = threading.Event()
+        instance = StubInstance(lambda job: release.wait(10) and {})
+        pool = pool_of(instance)
+        try:
+            reply = pool.run({"path": "/slow.docx"}, timeout=0.2)
+        finally:
+            release.set()
+        self.assertTrue(reply["timed_out"])
+        self.assertIn("timed out after 0.2s", reply["error"])
+        self.assertEqual(instance.stops, 1)
+        self.assertIs(pool._idle.get_nowait(), instance)
+
+    def test_crash_restarts_instance(self):
+        """Stop an instance whose process died during the job, so the next job starts a fresh one."""
+
+        def crash(job):
+            instance.process = Process(-11)
+            raise RuntimeError("bridge disposed")
+
+        instance = StubInstance(crash)
+        pool = pool_of(instance)
+        self.assertEqual(pool.run({"path": "/crash.docx"}), {"error": "RuntimeError: bridge disposed"})
+        self.assertEqual(instance.stops, 1)
+        instance.work = lambda job: {"path": job["path"]}
+        self.assertEqual(pool.run({"path": "/next.docx"}), {"path": "/next.docx"})
+        self.assertEqual(instance.starts, 2)
+
+    def test_job_error_keeps_live_instance(self):
+        """Keep an instance whose process survived a failed job."""
+
+        def fail(job):
+            raise ValueError("unknown op 'x'")
+
+        instance = StubInstance(fail)
+        self.assertEqual(pool_of(instance).run({"op": "x"}), {"error": "ValueError: unknown op 'x'"})
+        self.assertEqual(instance.stops, 0)
+
+    def test_start_failure_is_reported(self):
+        """Report an instance that cannot start as the job's error."""
+        instance = StubInstance(dict, start_error=RuntimeError("LibreOffice did not start"))
+        self.assertEqual(pool_of(instance).run({}), {"error": "RuntimeError: LibreOffice did not start"})
+        self.assertEqual(instance.stops, 1)
+
+
+class SeedProfileTest(unittest.TestCase):
+    """Test that copy_seed_profile only copies a private seed this user owns."""
+
+    def setUp(self):
+        """Point XDG_CACHE_HOME at a temp directory holding a seed profile."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.old_env = os.environ.get("XDG_CACHE_HOME")
+        os.environ["XDG_CACHE_HOME"] = str(self.root / "cache")
+        self.seed = soffice._seed_profile()
+        (self.seed / "user").mkdir(parents=True)
+        (self.seed / "user" / "registrymodifications.xcu").write_text("<items/>")
+        self.profile = self.root / "profile"
+
+    def tearDown(self):
+        """Restore XDG_CACHE_HOME and remove the temp directory."""
+        if self.old_env is None:
+            os.environ.pop("XDG_CACHE_HOME", None)
+        else:
+            os.environ["XDG_CACHE_HOME"] = self.old_env
+        self.temp_dir.cleanup()
+
+    def test_copies_private_seed(self):
+        """Copy a seed with mode 0700 into the profile."""
+        self.seed.chmod(0o700)
+        self.assertTrue(soffice.copy_seed_profile(self.profile))
+        self.assertTrue((self.profile / "user" / "registrymodifications.xcu").is_file())
+
+    def test_refuses_open_seed(self):
+        """Never copy a seed that others can write to or read."""
+        self.seed.chmod(0o777)
+        self.assertFalse(soffice.copy_seed_profile(self.profile))
+        self.assertFalse(self.profile.exists())
+
+    def test_refuses_symlinked_seed(self):
+        """Never follow a seed path that is a symlink."""
+        target = self.root / "planted"
+        self.seed.rename(target)
+        target.chmod(0o700)
+        self.seed.symlink_to(target)
+        self.assertFalse(soffice.copy_seed_profile(self.profile))
+        self.assertFalse(self.profile.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
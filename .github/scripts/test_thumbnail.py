@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Test which edits to a deck change thumbnail.py's per-slide cache keys."""
+
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPTS = REPO_ROOT / "plugins/anthropic-office-skills/skills/pptx/scripts"
+
+sys.path.insert(0, str(SCRIPTS))
+import thumbnail  # noqa: E402
+
+P = 'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"'
+A = 'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+R = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+
+def rels(*relationships):
+    """Return a .rels part with (type, target) relationships."""
+    body = "".join(
+        f'<Relationship Id="rId{i}" Type="{REL_NS}/{kind}" Target="{target}"/>'
+        for i, (kind, target) in enumerate(relationships, 1)
+    )
+    return f'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{body}</Relationships>'
+
+
+def slide(text):
+    """Return a slide part showing text."""
+    return f"<p:sld {P} {A}><p:cSld><p:spTree><a:t>{text}</a:t></p:spTree></p:cSld></p:sld>"
+
+
+DECK = {
+    "ppt/presentation.xml": (
+        f'<p:presentation {P} {A} {R}><p:sldIdLst><p:sldId id="256" r:id="rId3"/><p:sldId id="257" r:id="rId4"/>'
+        '</p:sldIdLst><p:sldSz cx="9144000" cy="6858000"/><p:defaultTextStyle><a:lvl1pPr algn="l"/>'
+        "</p:defaultTextStyle></p:presentation>"
+    ),
+    "ppt/_rels/presentation.xml.rels": rels(
+        ("slideMaster", "slideMasters/slideMaster1.xml"),
+        ("theme", "theme/theme1.xml"),
+        ("slide", "slides/slide1.xml"),
+        ("slide", "slides/slide2.xml"),
+        ("font", "fonts/font1.fntdata"),
+        ("viewProps", "viewProps.xml"),
+    ),
+    "ppt/slides/slide1.xml": slide("one"),
+    "ppt/slides/_rels/slide1.xml.rels": rels(("slideLayout", "../slideLayouts/slideLayout1.xml")),
+    "ppt/slides/slide2.xml": slide("two"),
+    "ppt/slides/_rels/slide2.xml.rels": rels(("slideLayout", "../slideLayouts/slideLayout2.xml")),
+    "ppt/slideLayouts/slideLayout1.xml": f"<p:sldLayout {P}/>",
+    "ppt/slideLayouts/_rels/slideLayout1.xml.rels": rels(("slideMaster", "../slideMasters/slideMaster1.xml")),
+    "ppt/slideLayouts/slideLayout2.xml": f'<p:sldLayout {P} type="title"/>',
+    "ppt/slideLayouts/_rels/slideLayout2.xml.rels": rels(("slideMaster", "../slideMasters/slideMaster1.xml")),
+    "ppt/slideMasters/slideMaster1.xml": f"<p:sldMaster {P}/>",
+    "ppt/slideMasters/_rels/slideMaster1.xml.rels": rels(("theme", "../theme/theme1.xml")),
+    "ppt/theme/theme1.xml": f'<a:theme {A} name="Office"/>',
+    "ppt/fonts/font1.fntdata": "font bytes",
+    "ppt/viewProps.xml": f"<p:viewPr {P}/>",
+}
+SLIDES = ("ppt/slides/slide1.xml", "ppt/slides/slide2.xml")
+
+
+class SlideKeysTest(unittest.TestCase):
+    """Test slide_keys against a small hand-written deck."""
+
+    def setUp(self):
+        """Create a temp directory and the keys of the unedited deck."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.base = self.keys()
+
+    def tearDown(self):
+        """Remove the temp directory."""
+        self.temp_dir.cleanup()
+
+    def keys(self, edits=None):
+        """Write the deck with edits applied, as part name to new text, and return each slide's key."""
+        parts = {**DECK, **(edits or {})}
+        path = self.root / f"deck{len(list(self.root.iterdir()))}.pptx"
+        with zipfile.ZipFile(path, "w") as zf:
+            for name, text in parts.items():
+                zf.writestr(name, text)
+        return thumbnail.slide_keys(path, [{"part": part} for part in SLIDES])
+
+    def changed(self, name, text):
+        """Return the slides whose key changes when part name is replaced by text."""
+        keys = self.keys({name: text})
+        return [part for part in SLIDES if keys[part] != self.base[part]]
+
+    def test_unchanged_deck_keeps_keys(self):
+        """Give the same keys to the same deck."""
+        self.assertEqual(self.keys(), self.base)
+
+    def test_slide_edit_changes_own_key(self):
+        """Change only the edited slide's key."""
+        self.assertEqual(self.changed("ppt/slides/slide1.xml", slide("uno")), [SLIDES[0]])
+
+    def test_layout_edit_changes_its_slides(self):
+        """Change the keys of the slides using an edited layout, and no others."""
+        layout = f'<p:sldLayout {P} type="obj"/>'
+        self.assertEqual(self.changed("ppt/slideLayouts/slideLayout2.xml", layout), [SLIDES[1]])
+
+    def test_master_and_theme_edits_change_every_slide(self):
+        """Change every key when the master or theme both layouts use is edited."""
+        self.assertEqual(
+            self.changed("ppt/slideMasters/slideMaster1.xml", f'<p:sldMaster {P} preserve="1"/>'), list(SLIDES)
+        )
+        self.assertEqual(self.changed("ppt/theme/theme1.xml", f'<a:theme {A} name="Other"/>'), list(SLIDES))
+
+    def test_presentation_edits_change_every_slide(self):
+        """Change every key when the default text style or an embedded font changes."""
+        presentation = DECK["ppt/presentation.xml"].replace('algn="l"', 'algn="ctr"')
+        self.assertEqual(self.changed("ppt/presentation.xml", presentation), list(SLIDES))
+        self.assertEqual(self.changed("ppt/fonts/font1.fntdata", "other font bytes"), list(SLIDES))
+
+    def test_slide_list_and_view_edits_keep_keys(self):
+        """Keep every key when only the slide order or the saved view changes."""
+        presentation = DECK["ppt/presentation.xml"].replace('id="256" r:id="rId3"', 'id="300" r:id="rId3"')
+        self.assertEqual(self.changed("ppt/presentation.xml", presentation), [])
+        self.assertEqual(self.changed("ppt/viewProps.xml", f'<p:viewPr {P} lastView="sldView"/>'), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Test that validate.py's on-disk caches are keyed stably and stay bounded."""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+import zipfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+OFFICE = REPO_ROOT / "plugins/anthropic-office-skills/skills/docx/scripts/office"
+
+sys.path.insert(0, str(OFFICE))
+from validators import baseline  # noqa: E402
+
+DOCUMENT = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+    "<w:body><w:p><w:r><w:t>Hello</w:t></w:r></w:p></w:body></w:document>"
+)
+CONTENT_TYPES = (
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    "</Types>"
+)
+
+
+class ValidateCacheTest(unittest.TestCase):
+    """Test the incremental manifest and baseline cache directories."""
+
+    def setUp(self):
+        """Write a minimal .docx into a temp directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.cache = self.root / "cache"
+        self.document = self.root / "doc.docx"
+        with zipfile.ZipFile(self.document, "w") as zf:
+            zf.writestr("[Content_Types].xml", CONTENT_TYPES)
+            zf.writestr("word/document.xml", DOCUMENT)
+
+    def tearDown(self):
+        """Remove the temp directory."""
+        self.temp_dir.cleanup()
+
+    def validate(self, *args):
+        """Run validate.py on the document with the temp cache directory."""
+        return subprocess.run(
+            [sys.executable, OFFICE / "validate.py", self.document, "--cache-dir", self.cache, *args],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "HOOKD": "0", "OFFICE_VALIDATE_SOCKET": str(self.root / "none.sock")},
+        )
+
+    def test_auto_repair_reuses_manifest(self):
+        """Key the manifest of a packed file on the file, not on the temp directory it is extracted to."""
+        for args in (("--auto-repair",), ("--auto-repair",), ()):
+            self.validate("--incremental", *args)
+        self.assertEqual(len(list((self.cache / "incremental").glob("*.json"))), 1)
+
+    def test_prune_keeps_newest_files(self):
+        """Remove files past MAX_FILES, oldest first, and files unused for MAX_AGE_DAYS."""
+        self.cache.mkdir()
+        now = time.time()
+        for index in range(baseline.MAX_FILES + 3):
+            path = self.cache / f"{index:04d}.json"
+            path.write_text("{}")
+            os.utime(path, (now - 1000 + index, now - 1000 + index))
+        stale = self.cache / "stale.json"
+        stale.write_text("{}")
+        os.utime(stale, (now - (baseline.MAX_AGE_DAYS + 1) * 86400,) * 2)
+        baseline.prune_cache_dir(self.cache)
+        kept = sorted(path.name for path in self.cache.glob("*.json"))
+        self.assertEqual(kept, [f"{index:04d}.json" for index in range(3, baseline.MAX_FILES + 3)])
+
+    def test_read_marks_file_used(self):
+        """Touch a cache file on every read so pruning keeps the files in use."""
+        path = self.cache / "entry.json"
+        self.cache.mkdir()
+        path.write_text('{"a": []}')
+        os.utime(path, (0, 0))
+        self.assertEqual(baseline.read_cache_file(path), {"a": []})
+        self.assertGreater(path.stat().st_mtime, time.time() - 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
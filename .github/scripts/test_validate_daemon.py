@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Test the office validation server protocol, its restart on stale sources, and its per-copy sockets."""
+
+import contextlib
+import importlib.util
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+import zipfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+OFFICE = REPO_ROOT / "plugins/anthropic-office-skills/skills/docx/scripts/office"
+
+
+def load_daemon(office_dir, name):
+    """Import validate_daemon.py from one copy of the office directory."""
+    spec = importlib.util.spec_from_file_location(name, Path(office_dir) / "validate_daemon.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class ValidateDaemonTest(unittest.TestCase):
+    """Test validate_daemon.py against a private copy of the office directory."""
+
+    def setUp(self):
+        """Copy the office directory, point the socket at a temp path and write a workbook to validate."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.office = self.root / "office"
+        shutil.copytree(OFFICE, self.office, ignore=shutil.ignore_patterns("__pycache__"))
+        self.socket = self.root / "validate.sock"
+        self.old_env = os.environ.get("OFFICE_VALIDATE_SOCKET")
+        os.environ["OFFICE_VALIDATE_SOCKET"] = str(self.socket)
+        self.workbook = self.root / "book.xlsx"
+        with zipfile.ZipFile(self.workbook, "w") as zf:
+            zf.writestr("[Content_Types].xml", "<Types/>")
+        self.daemon = load_daemon(self.office, "validate_daemon_copy")
+        self.server = None
+
+    def tearDown(self):
+        """Stop the server and restore the environment."""
+        if self.server is not None:
+            self.daemon.stop(self.socket)
+            self.server.wait(timeout=10)
+        if self.old_env is None:
+            os.environ.pop("OFFICE_VALIDATE_SOCKET", None)
+        else:
+            os.environ["OFFICE_VALIDATE_SOCKET"] = self.old_env
+        self.temp_dir.cleanup()
+
+    def start_server(self):
+        """Start the copy's server and wait until it listens."""
+        self.server = subprocess.Popen(
+            [sys.executable, self.office / "validate_daemon.py"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        for _ in range(200):
+            if self.socket.exists():
+                return
+            time.sleep(0.05)
+        self.fail("validate_daemon did not start")
+
+    def request(self, daemon, argv):
+        """Send argv to the server and return its exit code, or None for a fallback, and its stdout."""
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            exit_code = daemon.run_in_daemon(argv)
+        return exit_code, stdout.getvalue()
+
+    def test_serves_request(self):
+        """Run validate.py in the server and hand back its output and exit code."""
+        self.start_server()
+        exit_code, stdout = self.request(self.daemon, [str(self.workbook)])
+        self.assertEqual(exit_code, 0)
+        self.assertIn("No XSD schema validation is performed for xlsx-family files", stdout)
+
+    def test_no_server_falls_back(self):
+        """Return None when nothing listens on the socket."""
+        self.assertIsNone(self.request(self.daemon, [str(self.workbook)])[0])
+
+    def test_stale_sources_stop_server(self):
+        """Fall back and exit once a validator source changes on disk."""
+        self.start_server()
+        source = self.office / "validators" / "base.py"
+        source.write_text(source.read_text() + "\n# edited\n")
+        self.assertIsNone(self.request(self.daemon, [str(self.workbook)])[0])
+        self.assertEqual(self.server.wait(timeout=10), 0)
+        self.server = None
+
+    def test_other_copy_falls_back(self):
+        """Refuse requests from another copy of the office directory, and keep serving its own."""
+        self.start_server()
+        other = load_daemon(OFFICE, "validate_daemon_repo")
+        self.assertIsNone(self.request(other, [str(self.workbook)])[0])
+        self.assertEqual(self.request(self.daemon, [str(self.workbook)])[0], 0)
+
+    def test_socket_per_copy(self):
+        """Give every copy of the office directory its own default socket."""
+        del os.environ["OFFICE_VALIDATE_SOCKET"]
+        other = load_daemon(OFFICE, "validate_daemon_repo")
+        self.assertNotEqual(self.daemon.socket_path(), other.socket_path())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -359,6 +359,19 @@ CODEX_MARKETPLACE = REPO_ROOT / ".agents" / "plugins" / "marketplace.json"
 CURSOR_MARKETPLACE = REPO_ROOT / ".cursor-plugin" / "marketplace.json"
 
 
+def validate_hookd_copies() -> list[str]:
+    """Validate every plugin ships the same hookd.py, since one running server answers for all of them."""
+    copies = sorted(REPO_ROOT.glob("plugins/*/hooks/scripts/hookd.py"))
+    if not copies:
+        return []
+    reference = copies[0].read_bytes()
+    return [
+        f"{copy.relative_to(REPO_ROOT)} differs from {copies[0].relative_to(REPO_ROOT)}, keep every hookd.py identical"
+        for copy in copies[1:]
+        if copy.read_bytes() != reference
+    ]
+
+
 def load_json(path: Path) -> dict | list | None:
     """Load JSON file, return None on failure."""
     if not path.exists():
@@ -631,6 +644,7 @@ def main():
         all_errors.extend(validate_cross_tool_manifests(plugin_dir))
 
     all_errors.extend(validate_symlinks())
+    all_errors.extend(validate_hookd_copies())
     all_errors.extend(validate_marketplace_alignment())
     all_errors.extend(validate_plugin_summary_length())
     all_errors.extend(validate_advisor_context_handoff())
@@ -7,7 +7,7 @@ Usage:
     python comment.py unpacked/ "Comment text"
     python comment.py unpacked/ "Reply text" --parent 0
 
-    # Against a .docx directly (extracts, writes satellite files, rezips)
+    # Against a .docx directly (edits in memory, rezips once)
     python comment.py contract.docx "This cap is too low" -o annotated.docx
     python comment.py contract.docx "Comment" --id 5      # explicit ID
 
@@ -24,9 +24,7 @@ After running, add markers to word/document.xml so the comment is visible:
 
 import argparse
 import random
-import shutil
 import sys
-import tempfile
 import zipfile
 from datetime import datetime, timezone
 from pathlib import Path
@@ -35,9 +33,12 @@ import defusedxml.minidom
 from xml.parsers.expat import ExpatError
 from xml.sax.saxutils import escape as xml_escape
 
-from office.helpers import opc_target, rezip as _rezip, safe_extract as _safe_extract
+from office.helpers import opc_target
+from office.helpers.package import CONTENT_TYPES, OfficePackage, rels_name
 
 TEMPLATE_DIR = Path(__file__).parent / "templates"
+DOCUMENT = "word/document.xml"
+COMMENTS = "word/comments.xml"
 NS = {
     "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
     "w14": "http://schemas.microsoft.com/office/word/2010/wordml",
@@ -87,6 +88,11 @@ SMART_QUOTE_ENTITIES = {
 }
 
 
+def _ensure_part(package: OfficePackage, part: str) -> None:
+    if not package.has_part(part):
+        package.write_part(part, (TEMPLATE_DIR / part.rsplit("/", 1)[1]).read_bytes())
+
+
 def _generate_hex_id() -> str:
     return f"{random.randint(0, 0x7FFFFFFE):08X}"
 
@@ -97,8 +103,8 @@ def _encode_smart_quotes(text: str) -> str:
     return text
 
 
-def _append_xml(xml_path: Path, root_tag: str, content: str) -> None:
-    dom = defusedxml.minidom.parseString(xml_path.read_text(encoding="utf-8"))
+def _append_xml(package: OfficePackage, part: str, root_tag: str, content: str) -> None:
+    dom = package.dom(part)
     root = dom.getElementsByTagName(root_tag)[0]
     ns_attrs = " ".join(f'xmlns:{k}="{v}"' for k, v in NS.items())
     wrapper_dom = defusedxml.minidom.parseString(f"<root {ns_attrs}>{content}</root>")
@@ -106,11 +112,11 @@ def _append_xml(xml_path: Path, root_tag: str, content: str) -> None:
         if child.nodeType == child.ELEMENT_NODE:
             root.appendChild(dom.importNode(child, True))
     output = _encode_smart_quotes(dom.toxml(encoding="UTF-8").decode("utf-8"))
-    xml_path.write_text(output, encoding="utf-8")
+    package.write_text(part, output)
 
 
-def _find_para_id(comments_path: Path, comment_id: int) -> str | None:
-    dom = defusedxml.minidom.parseString(comments_path.read_text(encoding="utf-8"))
+def _find_para_id(package: OfficePackage, comment_id: int) -> str | None:
+    dom = package.dom(COMMENTS)
     for c in dom.getElementsByTagName("w:comment"):
         if c.getAttribute("w:id") == str(comment_id):
             for p in c.getElementsByTagName("w:p"):
@@ -119,10 +125,10 @@ def _find_para_id(comments_path: Path, comment_id: int) -> str | None:
     return None
 
 
-def _next_comment_id(comments_path: Path) -> int:
-    if not comments_path.exists():
+def _next_comment_id(package: OfficePackage) -> int:
+    if not package.has_part(COMMENTS):
         return 0
-    dom = defusedxml.minidom.parseString(comments_path.read_text(encoding="utf-8"))
+    dom = package.dom(COMMENTS)
     ids = []
     for c in dom.getElementsByTagName("w:comment"):
         try:
@@ -132,35 +138,6 @@ def _next_comment_id(comments_path: Path) -> int:
     return (max(ids) + 1) if ids else 0
 
 
-def _get_next_rid(rels_path: Path) -> int:
-    dom = defusedxml.minidom.parseString(rels_path.read_text(encoding="utf-8"))
-    max_rid = 0
-    for rel in dom.getElementsByTagName("Relationship"):
-        rid = rel.getAttribute("Id")
-        if rid and rid.startswith("rId"):
-            try:
-                max_rid = max(max_rid, int(rid[3:]))
-            except ValueError:
-                pass
-    return max_rid + 1
-
-
-def _has_relationship(rels_path: Path, target: str) -> bool:
-    dom = defusedxml.minidom.parseString(rels_path.read_text(encoding="utf-8"))
-    return any(
-        rel.getAttribute("Target") == target
-        for rel in dom.getElementsByTagName("Relationship")
-    )
-
-
-def _has_content_type(ct_path: Path, part_name: str) -> bool:
-    dom = defusedxml.minidom.parseString(ct_path.read_text(encoding="utf-8"))
-    return any(
-        o.getAttribute("PartName") == part_name
-        for o in dom.getElementsByTagName("Override")
-    )
-
-
 _COMMENT_RELS = [
     ("http://schemas.openxmlformats.org/officeDocument/2006/relationships/comments", "comments.xml"),
     ("http://schemas.microsoft.com/office/2011/relationships/commentsExtended", "commentsExtended.xml"),
@@ -175,65 +152,31 @@ _COMMENT_OVERRIDES = [
 ]
 
 
-def _ensure_comment_relationships(unpacked_dir: Path) -> None:
-    rels_path = unpacked_dir / "word" / "_rels" / "document.xml.rels"
-    if not rels_path.exists():
+def _ensure_comment_relationships(package: OfficePackage) -> None:
+    if not package.has_part(rels_name(DOCUMENT)):
         return
-    dom = defusedxml.minidom.parseString(rels_path.read_text(encoding="utf-8"))
-    root = dom.documentElement
     comment_types = {rel_type for rel_type, _ in _COMMENT_RELS}
-    existing = set()
-    for rel in dom.getElementsByTagName("Relationship"):
-        if rel.getAttribute("Type") not in comment_types:
-            continue
-        part = opc_target(
-            rel.getAttribute("Target"),
-            "word/document.xml",
-            rel.getAttribute("TargetMode"),
-        )
-        if part is not None:
-            existing.add(part)
-    next_rid = _get_next_rid(rels_path)
-    changed = False
-    for rel_type, target in _COMMENT_RELS:
-        if opc_target(target, "word/document.xml") in existing:
-            continue
-        rel = dom.createElement("Relationship")
-        rel.setAttribute("Id", f"rId{next_rid}")
-        rel.setAttribute("Type", rel_type)
-        rel.setAttribute("Target", target)
-        root.appendChild(rel)  
-        next_rid += 1
-        changed = True
-    if changed:
-        rels_path.write_bytes(dom.toxml(encoding="UTF-8"))
-
-
-def _ensure_comment_content_types(unpacked_dir: Path) -> None:
-    ct_path = unpacked_dir / "[Content_Types].xml"
-    if not ct_path.exists():
-        return
-    dom = defusedxml.minidom.parseString(ct_path.read_text(encoding="utf-8"))
-    root = dom.documentElement
     existing = {
-        o.getAttribute("PartName")
-        for o in dom.getElementsByTagName("Override")
+        rel.part
+        for rel in package.relationships(DOCUMENT)
+        if rel.type in comment_types and rel.part is not None
     }
-    changed = False
+    for rel_type, target in _COMMENT_RELS:
+        if opc_target(target, DOCUMENT) not in existing:
+            package.add_relationship(DOCUMENT, rel_type, target)
+
+
+def _ensure_comment_content_types(package: OfficePackage) -> None:
+    if not package.has_part(CONTENT_TYPES):
+        return
+    existing = package.content_type_overrides()
     for part_name, content_type in _COMMENT_OVERRIDES:
-        if part_name in existing:
-            continue
-        override = dom.createElement("Override")
-        override.setAttribute("PartName", part_name)
-        override.setAttribute("ContentType", content_type)
-        root.appendChild(override)  
-        changed = True
-    if changed:
-        ct_path.write_bytes(dom.toxml(encoding="UTF-8"))
+        if part_name not in existing:
+            package.add_override(part_name, content_type)
 
 
 def add_comment(
-    unpacked_dir: Path | str,
+    package: OfficePackage | Path | str,
     text: str,
     comment_id: int | None = None,
     author: str = "Claude",
@@ -241,34 +184,36 @@ def add_comment(
     parent_id: int | None = None,
     raw: bool = False,
 ) -> tuple[int, str, str]:
-    unpacked_dir = Path(unpacked_dir)
+    if not isinstance(package, OfficePackage):
+        with OfficePackage(package) as pkg:
+            result = add_comment(pkg, text, comment_id, author, initials, parent_id, raw)
+            pkg.save()
+        return result
     if not raw:
         text = xml_escape(text)
     author = xml_escape(author, {'"': "&quot;"})
     initials = xml_escape(initials, {'"': "&quot;"})
-    word = unpacked_dir / "word"
-    if not word.exists():
-        raise FileNotFoundError(f"{word} not found (not an unpacked .docx?)")
+    if not package.find_parts("word/*"):
+        raise FileNotFoundError(f"{package.path / 'word'} not found (not an unpacked .docx?)")
 
-    comments = word / "comments.xml"
     if comment_id is None:
-        comment_id = _next_comment_id(comments)
+        comment_id = _next_comment_id(package)
 
     parent_para = None
     if parent_id is not None:
-        parent_para = _find_para_id(comments, parent_id) if comments.exists() else None
+        parent_para = _find_para_id(package, parent_id) if package.has_part(COMMENTS) else None
         if not parent_para:
             raise ValueError(f"parent comment {parent_id} not found")
 
     para_id, durable_id = _generate_hex_id(), _generate_hex_id()
     ts = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
-    if not comments.exists():
-        shutil.copy(TEMPLATE_DIR / "comments.xml", comments)
-    _ensure_comment_relationships(unpacked_dir)
-    _ensure_comment_content_types(unpacked_dir)
+    _ensure_part(package, COMMENTS)
+    _ensure_comment_relationships(package)
+    _ensure_comment_content_types(package)
     _append_xml(
-        comments,
+        package,
+        COMMENTS,
         "w:comments",
         COMMENT_XML.format(
             id=comment_id, author=author, date=ts, initials=initials,
@@ -276,33 +221,30 @@ def add_comment(
         ),
     )
 
-    ext = word / "commentsExtended.xml"
-    if not ext.exists():
-        shutil.copy(TEMPLATE_DIR / "commentsExtended.xml", ext)
+    ext = "word/commentsExtended.xml"
+    _ensure_part(package, ext)
     if parent_para is not None:
         _append_xml(
-            ext, "w15:commentsEx",
+            package, ext, "w15:commentsEx",
             f'<w15:commentEx w15:paraId="{para_id}" w15:paraIdParent="{parent_para}" w15:done="0"/>',
         )
     else:
         _append_xml(
-            ext, "w15:commentsEx",
+            package, ext, "w15:commentsEx",
             f'<w15:commentEx w15:paraId="{para_id}" w15:done="0"/>',
         )
 
-    ids = word / "commentsIds.xml"
-    if not ids.exists():
-        shutil.copy(TEMPLATE_DIR / "commentsIds.xml", ids)
+    ids = "word/commentsIds.xml"
+    _ensure_part(package, ids)
     _append_xml(
-        ids, "w16cid:commentsIds",
+        package, ids, "w16cid:commentsIds",
         f'<w16cid:commentId w16cid:paraId="{para_id}" w16cid:durableId="{durable_id}"/>',
     )
 
-    extensible = word / "commentsExtensible.xml"
-    if not extensible.exists():
-        shutil.copy(TEMPLATE_DIR / "commentsExtensible.xml", extensible)
+    extensible = "word/commentsExtensible.xml"
+    _ensure_part(package, extensible)
     _append_xml(
-        extensible, "w16cex:commentsExtensible",
+        package, extensible, "w16cex:commentsExtensible",
         f'<w16cex:commentExtensible w16cex:durableId="{durable_id}" w16cex:dateUtc="{ts}"/>',
     )
 
@@ -339,16 +281,13 @@ def main() -> None:
             print(msg)
         elif src.is_file() and src.suffix.lower() in (".docx", ".dotx"):
             out = Path(args.output) if args.output else src
-            with tempfile.TemporaryDirectory() as tmp:
-                tmp_path = Path(tmp)
-                with zipfile.ZipFile(src) as zf:
-                    _safe_extract(zf, tmp_path)
+            with OfficePackage(src) as package:
                 cid, _, msg = add_comment(
-                    tmp_path, args.text, comment_id=args.comment_id,
+                    package, args.text, comment_id=args.comment_id,
                     author=args.author, initials=args.initials,
                     parent_id=args.parent, raw=args.raw,
                 )
-                _rezip(tmp_path, out)
+                package.save(out)
             print(msg)
             print(f"Wrote {out} (comment defined; add markers to word/document.xml to make it visible)")
         else:
@@ -26,25 +26,28 @@ Usage:
 
 import argparse
 import sys
-import tempfile
 import zipfile
 from pathlib import Path
 
-import defusedxml.minidom
-
-from office.helpers import XML_SPACE, rendered_text, rezip, safe_extract
+from office.helpers import XML_SPACE, rendered_text
+from office.helpers.package import OfficePackage
 
 WORDML_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+DOCUMENT = "word/document.xml"
 
 
-def merge_runs(input_dir: str) -> tuple[int, str]:
-    doc_xml = Path(input_dir) / "word" / "document.xml"
+def merge_runs(package: OfficePackage | str) -> tuple[int, str]:
+    if not isinstance(package, OfficePackage):
+        with OfficePackage(package) as pkg:
+            result = merge_runs(pkg)
+            pkg.save()
+        return result
 
-    if not doc_xml.exists():
-        return 0, f"Error: {doc_xml} not found"
+    if not package.has_part(DOCUMENT):
+        return 0, f"Error: {package.path / DOCUMENT} not found"
 
     try:
-        dom = defusedxml.minidom.parseString(doc_xml.read_text(encoding="utf-8"))
+        dom = package.dom(DOCUMENT)
         root = dom.documentElement
         run_names = _run_tag_names(root)
 
@@ -57,10 +60,11 @@ def merge_runs(input_dir: str) -> tuple[int, str]:
         for container in {run.parentNode for run in runs}:
             merge_count += _merge_runs_in(container, run_names)
 
-        doc_xml.write_bytes(dom.toxml(encoding="UTF-8"))
+        package.write_dom(DOCUMENT)
         return merge_count, f"Merged {merge_count} runs"
 
     except Exception as e:
+        package.discard_dom(DOCUMENT)
         return 0, f"Error: {e}"
 
 
@@ -263,8 +267,8 @@ def _consolidate_text_elements(run, tag: str):
 
 
 
-def _merge_or_die(path: Path) -> str:
-    _, msg = merge_runs(str(path))
+def _merge_or_die(package: OfficePackage) -> str:
+    _, msg = merge_runs(package)
     if msg.startswith("Error"):
         print(msg, file=sys.stderr)
         sys.exit(1)
@@ -288,15 +292,15 @@ def main() -> None:
         if src.is_dir():
             if args.output:
                 p.error("--output is only valid for .docx input; directory input is modified in place")
-            print(_merge_or_die(src))
+            with OfficePackage(src) as package:
+                msg = _merge_or_die(package)
+                package.save()
+            print(msg)
         elif src.is_file() and src.suffix.lower() in (".docx", ".dotx"):
             out = Path(args.output) if args.output else src
-            with tempfile.TemporaryDirectory() as tmp:
-                tmp_path = Path(tmp)
-                with zipfile.ZipFile(src) as zf:
-                    safe_extract(zf, tmp_path)
-                msg = _merge_or_die(tmp_path)
-                rezip(tmp_path, out)
+            with OfficePackage(src) as package:
+                msg = _merge_or_die(package)
+                package.save(out)
             print(f"{msg}; wrote {out}")
         else:
             print(f"Error: {src} is neither a directory nor a .docx/.dotx file", file=sys.stderr)
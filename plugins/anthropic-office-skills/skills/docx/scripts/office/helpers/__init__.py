@@ -1,10 +1,14 @@
+import contextlib
 import os
 import posixpath
 import re
 import stat
+import struct
 import tempfile
 import urllib.parse
 import zipfile
+import zlib
+from collections.abc import Iterable
 from pathlib import Path
 
 OOXML_FAMILY = {
@@ -20,6 +24,10 @@ _SCHEME_RE = re.compile(r"^[A-Za-z][A-Za-z0-9+.\-]*:")
 
 SLIDE_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide"
 
+_LOCAL_HEADER_SIZE = 30
+_DATA_DESCRIPTOR = 0x08
+_COPY_CHUNK = 1 << 20
+
 
 def opc_target(target: str, source_part: str, target_mode: str = "") -> str | None:
     if not target:
@@ -82,9 +90,57 @@ def safe_extract(zf: zipfile.ZipFile, dest: Path) -> None:
         zf.extract(m, dest)
 
 
-def rezip(src_dir: Path, out_path: Path) -> None:
-    files = sorted(p for p in src_dir.rglob("*") if p.is_file())
-    ct = src_dir / "[Content_Types].xml"
+def _unchanged(path: Path, info: zipfile.ZipInfo) -> bool:
+    if path.stat().st_size != info.file_size:
+        return False
+    crc = 0
+    with path.open("rb") as fh:
+        while chunk := fh.read(_COPY_CHUNK):
+            crc = zlib.crc32(chunk, crc)
+    return crc == info.CRC
+
+
+def copy_member(
+    src: zipfile.ZipFile, info: zipfile.ZipInfo, dst: zipfile.ZipFile
+) -> None:
+    # Writes the member's local header and compressed bytes as they are, with no
+    # inflate/deflate.
+    src.fp.seek(info.header_offset)
+    header = src.fp.read(_LOCAL_HEADER_SIZE)
+    if len(header) != _LOCAL_HEADER_SIZE or header[:4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"bad local header for {info.filename!r}")
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    src.fp.seek(info.header_offset + _LOCAL_HEADER_SIZE + name_len + extra_len)
+
+    copy = zipfile.ZipInfo(info.filename, info.date_time)
+    copy.compress_type = info.compress_type
+    copy.create_system = info.create_system
+    copy.external_attr = info.external_attr
+    copy.flag_bits = info.flag_bits & ~_DATA_DESCRIPTOR
+    copy.CRC = info.CRC
+    copy.compress_size = info.compress_size
+    copy.file_size = info.file_size
+    with dst._lock:
+        dst._writecheck(copy)
+        dst._didModify = True
+        copy.header_offset = dst.fp.tell()
+        dst.fp.write(copy.FileHeader())
+        remaining = info.compress_size
+        while remaining:
+            chunk = src.fp.read(min(remaining, _COPY_CHUNK))
+            if not chunk:
+                raise zipfile.BadZipFile(f"truncated member {info.filename!r}")
+            dst.fp.write(chunk)
+            remaining -= len(chunk)
+        dst.filelist.append(copy)
+        dst.NameToInfo[copy.filename] = copy
+        dst.start_dir = dst.fp.tell()
+
+
+@contextlib.contextmanager
+def atomic_zip(out_path: Path):
+    # Yields a ZipFile writing to a temp file next to out_path, which replaces
+    # out_path (keeping its mode) only once the archive is complete.
     fd, tmp_name = tempfile.mkstemp(
         prefix=out_path.name + ".", suffix=".tmp", dir=out_path.parent
     )
@@ -92,12 +148,7 @@ def rezip(src_dir: Path, out_path: Path) -> None:
     try:
         with os.fdopen(fd, "wb") as fh:
             with zipfile.ZipFile(fh, "w", zipfile.ZIP_DEFLATED) as zf:
-                if ct.exists():
-                    zf.write(ct, ct.relative_to(src_dir), compress_type=zipfile.ZIP_STORED)
-                for f in files:
-                    if f == ct:
-                        continue
-                    zf.write(f, f.relative_to(src_dir))
+                yield zf
         if out_path.exists():
             mode = out_path.stat().st_mode & 0o777
         else:
@@ -109,3 +160,37 @@ def rezip(src_dir: Path, out_path: Path) -> None:
     finally:
         if tmp_out.exists():
             tmp_out.unlink()
+
+
+def rezip(
+    src_dir: Path,
+    out_path: Path,
+    original: Path | None = None,
+    modified: Iterable[str] | None = None,
+) -> None:
+    # With original (the package src_dir was extracted from), members whose bytes are
+    # unchanged are copied still compressed and only changed or new parts are deflated.
+    # modified names the parts that changed; without it every part is compared by CRC.
+    files = sorted(p for p in src_dir.rglob("*") if p.is_file())
+    ct = src_dir / "[Content_Types].xml"
+    if ct in files:
+        files.remove(ct)
+        files.insert(0, ct)
+    changed = None if modified is None else {name.lstrip("/") for name in modified}
+    with contextlib.ExitStack() as stack:
+        zf = stack.enter_context(atomic_zip(out_path))
+        members = {}
+        if original is not None:
+            src = stack.enter_context(zipfile.ZipFile(original))
+            members = {info.filename: info for info in src.infolist()}
+        for f in files:
+            name = f.relative_to(src_dir).as_posix()
+            info = members.get(name)
+            if info is not None and (
+                name not in changed if changed is not None else _unchanged(f, info)
+            ):
+                copy_member(src, info, zf)
+            elif f == ct:
+                zf.write(f, name, compress_type=zipfile.ZIP_STORED)
+            else:
+                zf.write(f, name)
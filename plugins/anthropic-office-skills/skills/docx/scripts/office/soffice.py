@@ -13,13 +13,41 @@ the env dict carries the shim but names no user profile, and a non-root sandbox
 cannot bootstrap the default one -- soffice aborts with "User installation could
 not be completed" and converts nothing. get_soffice_env() stays public for the
 callers that build their own argv (they must pass -env:UserInstallation too).
+
+Every fresh profile is copied from a seed profile bootstrapped once per user
+under $XDG_CACHE_HOME/office-soffice (~/.cache/office-soffice), so soffice
+skips its first-start setup. A seed not owned by the user or open to others is
+never copied.
+
+For many conversions in a row, start a pool of warm instances:
+
+    python office/soffice.py --pool 2
+
+pool_request() hands it a job over a Unix socket: {"op": "pdf", "path": ...,
+"outdir": ...} writes <stem>.pdf into outdir, {"op": "recalc", "path": ...}
+recalculates and saves in place. Paths must be absolute. The reply has an
+"error" key on failure, and pool_request() returns None when no pool is
+running, so callers fall back to run_soffice. Each instance has its own copy
+of the seed profile, and one that crashes or overruns a job's timeout is
+killed and restarted. The pool drives LibreOffice over UNO and needs the pyuno
+module. Where AF_UNIX sockets are blocked no pool can run, and callers always
+take the fallback.
 """
 
 import contextlib
+import json
 import os
+import queue
+import shutil
+import signal
 import socket
+import socketserver
+import stat
 import subprocess
+import sys
 import tempfile
+import threading
+import time
 from collections.abc import Iterable
 from pathlib import Path
 
@@ -42,10 +70,287 @@ def run_soffice(args: Iterable[str], **kwargs) -> subprocess.CompletedProcess:
             profile = stack.enter_context(
                 tempfile.TemporaryDirectory(prefix="lo_profile_", ignore_cleanup_errors=True)
             )
+            copy_seed_profile(Path(profile))
             args = [f"-env:UserInstallation={Path(profile).as_uri()}"] + args
         return subprocess.run(["soffice"] + args, env=get_soffice_env(), **kwargs)
 
 
+def _seed_profile() -> Path:
+    root = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(root) / "office-soffice" / "seed-profile"
+
+
+def _owned_private_dir(path: Path) -> bool:
+    # the seed lands in every profile, so only a directory no one else can
+    # have planted or written to is used
+    try:
+        st = path.lstat()
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(st.st_mode)
+        and st.st_uid == os.getuid()
+        and stat.S_IMODE(st.st_mode) == 0o700
+    )
+
+
+def copy_seed_profile(profile_dir: Path) -> bool:
+    seed = _seed_profile()
+    if not (_owned_private_dir(seed) and (seed / "user").is_dir()):
+        if seed.exists() or seed.is_symlink():
+            return False
+        try:
+            seed.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            staging = Path(tempfile.mkdtemp(prefix=seed.name + ".", dir=seed.parent))
+        except OSError:
+            return False
+        try:
+            subprocess.run(
+                [
+                    "soffice",
+                    "--headless",
+                    "--terminate_after_init",
+                    f"-env:UserInstallation={staging.as_uri()}",
+                ],
+                env=get_soffice_env(),
+                capture_output=True,
+                timeout=60,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        if (staging / "user").is_dir():
+            with contextlib.suppress(OSError):
+                staging.rename(seed)
+        shutil.rmtree(staging, ignore_errors=True)
+        if not (_owned_private_dir(seed) and (seed / "user").is_dir()):
+            return False
+    shutil.copytree(
+        seed,
+        profile_dir,
+        dirs_exist_ok=True,
+        ignore=shutil.ignore_patterns(".lock"),
+    )
+    return True
+
+
+POOL_SOCKET_ENV = "SOFFICE_POOL_SOCKET"
+
+_PDF_FILTERS = {
+    "com.sun.star.presentation.PresentationDocument": "impress_pdf_Export",
+    "com.sun.star.drawing.DrawingDocument": "draw_pdf_Export",
+    "com.sun.star.sheet.SpreadsheetDocument": "calc_pdf_Export",
+    "com.sun.star.text.TextDocument": "writer_pdf_Export",
+}
+
+
+def pool_socket_path() -> Path:
+    if os.environ.get(POOL_SOCKET_ENV):
+        return Path(os.environ[POOL_SOCKET_ENV])
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return Path(runtime_dir) / f"soffice-pool-{os.getuid()}.sock"
+
+
+def pool_request(job: dict, timeout: float = 120) -> dict | None:
+    path = pool_socket_path()
+    try:
+        if path.lstat().st_uid != os.getuid():
+            return None
+    except OSError:
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(path))
+            sock.settimeout(timeout + 30)
+            sock.sendall(json.dumps({**job, "timeout": timeout}).encode() + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            with sock.makefile("rb") as fh:
+                reply = json.loads(fh.readline() or b"null")
+    except (OSError, ValueError):
+        return None
+    return reply if isinstance(reply, dict) else None
+
+
+class _Instance:
+    def __init__(self, index: int):
+        self.pipe = f"soffice_pool_{os.getpid()}_{index}"
+        self.profile = None
+        self.process = None
+        self.desktop = None
+
+    def start(self, startup_timeout: float = 60):
+        import uno
+        from com.sun.star.connection import NoConnectException
+
+        self.stop()
+        self.profile = tempfile.TemporaryDirectory(
+            prefix="lo_profile_", ignore_cleanup_errors=True
+        )
+        copy_seed_profile(Path(self.profile.name))
+        self.process = subprocess.Popen(
+            [
+                "soffice",
+                "--headless",
+                "--invisible",
+                "--norestore",
+                "--nologo",
+                f"-env:UserInstallation={Path(self.profile.name).as_uri()}",
+                f"--accept=pipe,name={self.pipe};urp;StarOffice.ComponentContext",
+            ],
+            env=get_soffice_env(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local
+        )
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            try:
+                context = resolver.resolve(
+                    f"uno:pipe,name={self.pipe};urp;StarOffice.ComponentContext"
+                )
+                break
+            except NoConnectException:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError("LibreOffice did not start")
+                time.sleep(0.2)
+        self.desktop = context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", context
+        )
+
+    def stop(self):
+        self.desktop = None
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+        if self.profile is not None:
+            self.profile.cleanup()
+            self.profile = None
+
+    def run(self, job: dict):
+        import uno
+        from com.sun.star.beans import PropertyValue
+
+        def prop(name, value):
+            return PropertyValue(Name=name, Value=value)
+
+        source = Path(job["path"])
+        doc = self.desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(str(source)), "_blank", 0, (prop("Hidden", True),)
+        )
+        if doc is None:
+            raise RuntimeError(f"LibreOffice could not open {source}")
+        try:
+            if job["op"] == "recalc":
+                doc.calculateAll()
+                doc.store()
+                return {"path": str(source)}
+            if job["op"] == "pdf":
+                export = next(
+                    (
+                        f
+                        for kind, f in _PDF_FILTERS.items()
+                        if doc.supportsService(kind)
+                    ),
+                    None,
+                )
+                if export is None:
+                    raise RuntimeError(f"no PDF export filter for {source}")
+                target = Path(job["outdir"]) / f"{source.stem}.pdf"
+                doc.storeToURL(
+                    uno.systemPathToFileUrl(str(target)), (prop("FilterName", export),)
+                )
+                return {"path": str(target)}
+            raise ValueError(f"unknown op {job['op']!r}")
+        finally:
+            doc.close(True)
+
+
+class SofficePool:
+    def __init__(self, size: int = 2):
+        self._idle = queue.Queue()
+        self._instances = [_Instance(i) for i in range(size)]
+        for instance in self._instances:
+            self._idle.put(instance)
+
+    def run(self, job: dict, timeout: float = 120) -> dict:
+        instance = self._idle.get()
+        try:
+            if instance.desktop is None:
+                instance.start()
+            result = {}
+
+            def work():
+                try:
+                    result.update(instance.run(job))
+                except Exception as e:
+                    result["error"] = f"{type(e).__name__}: {e}"
+
+            worker = threading.Thread(target=work, daemon=True)
+            worker.start()
+            worker.join(timeout)
+            if worker.is_alive():
+                instance.stop()
+                return {
+                    "error": f"LibreOffice timed out after {timeout}s",
+                    "timed_out": True,
+                }
+            if "error" in result and (
+                instance.process is None or instance.process.poll() is not None
+            ):
+                instance.stop()
+            return result
+        except Exception as e:
+            instance.stop()
+            return {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            self._idle.put(instance)
+
+    def close(self):
+        for instance in self._instances:
+            instance.stop()
+
+
+def serve_pool(size: int = 2) -> None:
+    try:
+        import uno  # noqa: F401
+    except ImportError:
+        sys.exit("soffice.py --pool needs the pyuno module (python3-uno)")
+    pool = SofficePool(size)
+    path = pool_socket_path()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                job = json.loads(self.rfile.readline())
+                reply = pool.run(job, timeout=float(job.get("timeout", 120)))
+            except (ValueError, KeyError, TypeError) as e:
+                reply = {"error": f"bad job: {e}"}
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+    with contextlib.suppress(FileNotFoundError):
+        path.unlink()
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(str(path), Handler)
+    finally:
+        os.umask(old_umask)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"LibreOffice pool of {size} listening on {path}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+        with contextlib.suppress(FileNotFoundError):
+            path.unlink()
+
+
 
 _SHIM_SO = Path(tempfile.gettempdir()) / "lo_socket_shim.so"
 
@@ -187,6 +492,8 @@ int close(int fd) {
 
 
 if __name__ == "__main__":
-    import sys
+    if sys.argv[1:2] == ["--pool"]:
+        serve_pool(int(sys.argv[2]) if len(sys.argv) > 2 else 2)
+        sys.exit(0)
     result = run_soffice(sys.argv[1:])
     sys.exit(result.returncode)
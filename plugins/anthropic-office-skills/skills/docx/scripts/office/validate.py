@@ -2,11 +2,20 @@
 Command line tool to validate Office document XML files against XSD schemas and tracked changes.
 
 Usage:
-    python validate.py <path> [--original <original_file>] [--auto-repair] [--author NAME]
+    python validate.py <path> [--original <original_file>] [--auto-repair] [--author NAME] [--jobs N] [--cache-dir DIR] [--incremental]
+    python validate.py --batch <path-or-glob>... [--jobs N] [options as above]
 
 The first argument can be either:
 - An unpacked directory containing the Office document XML files
-- A packed Office file (.docx/.pptx/.xlsx or .dotx/.potx/.xltx template) which will be unpacked to a temp directory
+- A packed Office file (.docx/.pptx/.xlsx or .dotx/.potx/.xltx template), whose parts are read
+  straight from the zip. It is only unpacked to a temp directory when --auto-repair needs to
+  rewrite parts.
+
+With --batch, any number of documents, directories or glob patterns are validated in one
+process pool that shares the compiled schemas, and one JSON line is printed per document.
+
+If validate_daemon.py is running, the run is handed to it over its Unix socket so the XSD
+schemas are already compiled. Without a server, validation runs in this process.
 
 Auto-repair fixes:
 - paraId/durableId values that exceed OOXML limits
@@ -14,16 +23,29 @@ Auto-repair fixes:
 """
 
 import argparse
+import contextlib
+import functools
+import glob
+import io
+import json
+import multiprocessing
+import os
 import sys
 import tempfile
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import defusedxml.ElementTree as ET
 from defusedxml.common import DefusedXmlException
 
 from helpers import OOXML_FAMILY, rezip, safe_extract
+from helpers.package import DirectoryPackage, ZipPackage
+from validate_daemon import run_in_daemon
 from validators import DOCXSchemaValidator, PPTXSchemaValidator, RedliningValidator
+from validators.base import preload_schemas
+from validators.parts import PARTS
+from validators.profile import Profiler
 
 WORD_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
 
@@ -33,23 +55,31 @@ def _fail(message: str):
     sys.exit(2)
 
 
-def _has_tracked_changes(unpacked_dir: Path) -> bool:
-    document = unpacked_dir / "word" / "document.xml"
-    if not document.is_file():
+def _has_tracked_changes(package) -> bool:
+    document = package.root / "word" / "document.xml"
+    if not package.is_file(document):
         return False
     try:
-        root = ET.parse(document).getroot()
+        with package.open(document) as fh:
+            root = ET.parse(fh).getroot()
     except (ET.ParseError, DefusedXmlException):
         return False  
     tracked = {f"{{{WORD_NS}}}ins", f"{{{WORD_NS}}}del"}
     return any(elem.tag in tracked for elem in root.iter())
 
 
-def main():
+def main(argv=None, use_daemon=True):
+    if use_daemon:
+        exit_code = run_in_daemon(sys.argv[1:] if argv is None else argv)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
     parser = argparse.ArgumentParser(description="Validate Office document XML files")
     parser.add_argument(
         "path",
-        help="Path to unpacked directory or packed Office file (.docx/.pptx/.xlsx or .dotx/.potx/.xltx)",
+        nargs="+",
+        help="Path to unpacked directory or packed Office file (.docx/.pptx/.xlsx or .dotx/.potx/.xltx). "
+        "With --batch: any number of files, directories or glob patterns.",
     )
     parser.add_argument(
         "--original",
@@ -79,15 +109,71 @@ def main():
         "the run as redlining work and is not used to filter. Requires "
         "--original; docx only.",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes for the per-part XSD checks. "
+        "0 uses one per CPU core. Default 1 (no worker pool). With --batch, the "
+        "number of documents validated at a time.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Where to keep the XSD errors already present in --original, so later "
+        "runs against the same original skip re-validating it. Defaults to "
+        "$XDG_CACHE_HOME/office-validate (~/.cache/office-validate).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Keep a manifest of part hashes and per-part results in the cache "
+        "directory, and on the next run of the same path re-check only the parts "
+        "whose bytes changed, plus the parts whose relationships point at them.",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Validate many documents in one run. Each path may be a file, an unpacked "
+        "document, a directory searched recursively for Office files, or a glob "
+        "pattern. Schemas are compiled once and shared, --jobs documents are "
+        "validated at a time, and one JSON line is printed per document with "
+        "its path, ok, exit_code and captured output.",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="table",
+        choices=("table", "json"),
+        default=None,
+        help="Time schema compilation, every validate_* check and each part's parse "
+        "and XSD validation, and print the report sorted slowest first to stderr, "
+        "as a table (the default) or as JSON. Implies --jobs 1 so every part is "
+        "timed in this process.",
+    )
+    parser.add_argument(
+        "--profile-out",
+        default=None,
+        metavar="FILE",
+        help="Write the --profile report to FILE instead of stderr, as JSON unless "
+        "--profile table is given. Implies --profile.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.jobs < 0:
+        _fail("--jobs must be 0 or a positive number")
+    jobs = args.jobs or os.cpu_count() or 1
+    if args.profile_out:
+        if args.batch:
+            _fail("--profile-out cannot be used with --batch")
+        args.profile = args.profile or "json"
+    if args.profile:
+        jobs = 1
 
     if args.author is not None and not args.original:
         _fail("--author requires --original")
 
-    path = Path(args.path)
-    if not path.exists():
-        _fail(f"{path} does not exist")
-
     original_file = None
     if args.original:
         original_file = Path(args.original)
@@ -96,6 +182,17 @@ def main():
         if original_file.suffix.lower() not in OOXML_FAMILY:
             _fail(f"{original_file} must be one of: {', '.join(sorted(OOXML_FAMILY))}")
 
+    if args.batch:
+        sys.exit(_validate_batch(args, original_file, jobs))
+    if len(args.path) > 1:
+        _fail("more than one path given; pass --batch to validate several documents")
+    sys.exit(_validate_path(Path(args.path[0]), original_file, args, jobs))
+
+
+def _validate_path(path: Path, original_file, args, jobs: int) -> int:
+    if not path.exists():
+        _fail(f"{path} does not exist")
+
     family = OOXML_FAMILY.get((original_file or path).suffix.lower())
     if family is None:
         _fail(
@@ -105,68 +202,181 @@ def main():
     if args.author is not None and family != "docx":
         _fail(f"--author only applies to docx files, not {family}")
 
-    packed_file = None
-    temp_dir_ctx = None
-    if path.is_file() and path.suffix.lower() in OOXML_FAMILY:
-        packed_file = path
-        temp_dir_ctx = tempfile.TemporaryDirectory()
-        unpacked_dir = Path(temp_dir_ctx.name)
-        try:
-            with zipfile.ZipFile(path, "r") as zf:
-                safe_extract(zf, unpacked_dir)
-        except (zipfile.BadZipFile, ValueError, OSError) as e:
-            _fail(f"cannot unpack {path}: {e}")
-    else:
-        if not path.is_dir():
-            _fail(f"{path} is not a directory or Office file")
-        unpacked_dir = path
-
-    match family:
-        case "docx":
-            validators = [
-                DOCXSchemaValidator(unpacked_dir, original_file, verbose=args.verbose),
-            ]
-            if args.author is not None:
-                validators.append(
-                    RedliningValidator(unpacked_dir, original_file, verbose=args.verbose)  
-                )
-            elif original_file and _has_tracked_changes(unpacked_dir):
+    # the open zip and the --auto-repair copy are released however validation ends
+    with contextlib.ExitStack() as stack:
+        packed_file = None
+        if path.is_file() and path.suffix.lower() in OOXML_FAMILY:
+            packed_file = path
+            try:
+                if args.auto_repair:
+                    temp_dir = stack.enter_context(tempfile.TemporaryDirectory())
+                    with zipfile.ZipFile(path, "r") as zf:
+                        safe_extract(zf, Path(temp_dir))
+                    package = DirectoryPackage(temp_dir)
+                else:
+                    package = ZipPackage(path)
+            except (zipfile.BadZipFile, ValueError, OSError) as e:
+                _fail(f"cannot unpack {path}: {e}")
+        else:
+            if not path.is_dir():
+                _fail(f"{path} is not a directory or Office file")
+            package = DirectoryPackage(path)
+        stack.callback(package.close)
+        unpacked_dir = package.root
+
+        match family:
+            case "docx":
+                validators = [
+                    DOCXSchemaValidator(
+                        unpacked_dir,
+                        original_file,
+                        verbose=args.verbose,
+                        jobs=jobs,
+                        cache_dir=args.cache_dir,
+                        package=package,
+                        incremental=args.incremental,
+                        packed_file=packed_file,
+                    ),
+                ]
+                if args.author is not None:
+                    validators.append(
+                        RedliningValidator(
+                            unpacked_dir, original_file, verbose=args.verbose, package=package
+                        )
+                    )
+                elif original_file and _has_tracked_changes(package):
+                    print(
+                        "Note: this document has tracked changes; they were not "
+                        "checked against the original (pass --author to check)."
+                    )
+            case "pptx":
+                validators = [
+                    PPTXSchemaValidator(
+                        unpacked_dir,
+                        original_file,
+                        verbose=args.verbose,
+                        jobs=jobs,
+                        cache_dir=args.cache_dir,
+                        package=package,
+                        incremental=args.incremental,
+                        packed_file=packed_file,
+                    ),
+                ]
+            case "xlsx":
+                exts = ", ".join(k for k, v in sorted(OOXML_FAMILY.items()) if v == "xlsx")
                 print(
-                    "Note: this document has tracked changes; they were not "
-                    "checked against the original (pass --author to check)."
+                    f"No XSD schema validation is performed for xlsx-family files ({exts}). "
+                    "For formula-error checking, use scripts/recalc.py instead."
                 )
-        case "pptx":
-            validators = [
-                PPTXSchemaValidator(unpacked_dir, original_file, verbose=args.verbose),
-            ]
-        case "xlsx":
-            exts = ", ".join(k for k, v in sorted(OOXML_FAMILY.items()) if v == "xlsx")
-            print(
-                f"No XSD schema validation is performed for xlsx-family files ({exts}). "
-                "For formula-error checking, use scripts/recalc.py instead."
-            )
-            sys.exit(0)
-        case _:
-            print(f"Error: Validation not supported for file type {family}")
-            sys.exit(1)
+                return 0
+            case _:
+                print(f"Error: Validation not supported for file type {family}")
+                return 1
+
+        profiler = None
+        if args.profile:
+            profiler = Profiler()
+            profiler.run("compile schemas", preload_schemas)
+            for v in validators:
+                profiler.attach(v)
+
+        if args.auto_repair:
+            total_repairs = sum(v.repair() for v in validators)
+            if total_repairs:
+                print(f"Auto-repaired {total_repairs} issue(s)")
+                if packed_file is not None:
+                    rezip(unpacked_dir, packed_file, original=packed_file)
+                    print(f"Wrote repaired file to {packed_file}")
 
-    if args.auto_repair:
-        total_repairs = sum(v.repair() for v in validators)
-        if total_repairs:
-            print(f"Auto-repaired {total_repairs} issue(s)")
-            if packed_file is not None:
-                rezip(unpacked_dir, packed_file)
-                print(f"Wrote repaired file to {packed_file}")
+        success = all([v.validate() for v in validators])
 
-    success = all([v.validate() for v in validators])
+        if success:
+            print("All validations PASSED!")
 
-    if temp_dir_ctx is not None:
-        temp_dir_ctx.cleanup()
+        if profiler is not None:
+            report = profiler.report(args.profile)
+            if args.profile_out:
+                Path(args.profile_out).write_text(report + "\n")
+            else:
+                print(report, file=sys.stderr)
 
-    if success:
-        print("All validations PASSED!")
+        return 0 if success else 1
 
-    sys.exit(0 if success else 1)
+
+def _batch_paths(patterns) -> list[Path]:
+    paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not matches:
+                paths.append(Path(pattern))
+            paths.extend(Path(m) for m in matches)
+            continue
+        path = Path(pattern)
+        if path.is_dir() and not (path / "[Content_Types].xml").is_file():
+            paths.extend(
+                sorted(
+                    p
+                    for p in path.rglob("*")
+                    if p.is_file()
+                    and p.suffix.lower() in OOXML_FAMILY
+                    and not p.name.startswith("~$")
+                )
+            )
+        else:
+            paths.append(path)
+    return paths
+
+
+def _validate_document(path: Path, original_file, args) -> dict:
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        try:
+            exit_code = _validate_path(path, original_file, args, 1)
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else 2
+        except Exception as e:
+            print(f"Error: {type(e).__name__}: {e}")
+            exit_code = 2
+    PARTS.clear()
+    return {
+        "path": str(path),
+        "ok": exit_code == 0,
+        "exit_code": exit_code,
+        "output": output.getvalue(),
+    }
+
+
+def _validate_batch(args, original_file, jobs: int) -> int:
+    paths = _batch_paths(args.path)
+    if not paths:
+        _fail("no documents matched")
+    preload_schemas()
+    validate = functools.partial(
+        _validate_document, original_file=original_file, args=args
+    )
+    if jobs == 1 or len(paths) == 1:
+        results = map(validate, paths)
+        executor = None
+    else:
+        methods = multiprocessing.get_all_start_methods()
+        executor = ProcessPoolExecutor(
+            max_workers=min(jobs, len(paths)),
+            mp_context=multiprocessing.get_context(
+                "fork" if "fork" in methods else None
+            ),
+            initializer=preload_schemas,
+        )
+        results = executor.map(validate, paths)
+    worst = 0
+    try:
+        for result in results:
+            print(json.dumps(result), flush=True)
+            worst = max(worst, result["exit_code"])
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return worst
 
 
 if __name__ == "__main__":
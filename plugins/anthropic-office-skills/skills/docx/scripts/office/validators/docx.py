@@ -4,15 +4,11 @@ Validator for Word document XML files against XSD schemas.
 
 import random
 import re
-import tempfile
+import time
 import zipfile
-from pathlib import Path
 
-import defusedxml.minidom
 import lxml.etree
 
-from helpers import safe_extract
-
 from .base import BaseSchemaValidator
 
 
@@ -21,6 +17,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
     WORD_2006_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
     W14_NAMESPACE = "http://schemas.microsoft.com/office/word/2010/wordml"
     W16CID_NAMESPACE = "http://schemas.microsoft.com/office/word/2016/wordml/cid"
+    W16CEX_NAMESPACE = "http://schemas.microsoft.com/office/word/2018/wordml/cex"
 
     ELEMENT_RELATIONSHIP_TYPES = {}
 
@@ -64,6 +61,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
 
         self.compare_paragraph_counts()
 
+        self._save_manifest()
         return all_valid
 
     def validate_whitespace_preservation(self):
@@ -74,29 +72,9 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 continue
 
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-
-                for elem in root.iter(f"{{{self.WORD_2006_NAMESPACE}}}t"):
-                    if elem.text:
-                        text = elem.text
-                        if re.search(r"^[ \t\n\r]", text) or re.search(
-                            r"[ \t\n\r]$", text
-                        ):
-                            xml_space_attr = f"{{{self.XML_NAMESPACE}}}space"
-                            if (
-                                xml_space_attr not in elem.attrib
-                                or elem.attrib[xml_space_attr] != "preserve"
-                            ):
-                                text_preview = (
-                                    repr(text)[:50] + "..."
-                                    if len(repr(text)) > 50
-                                    else repr(text)
-                                )
-                                errors.append(
-                                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                                    f"Line {elem.sourceline}: w:t element with whitespace missing xml:space='preserve': {text_preview}"
-                                )
-
+                errors.extend(
+                    self._cached(xml_file, "whitespace", self._whitespace_errors)
+                )
             except (lxml.etree.XMLSyntaxError, Exception) as e:
                 errors.append(
                     f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
@@ -112,42 +90,43 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 print("PASSED - All whitespace is properly preserved")
             return True
 
-    def validate_deletions(self):
+    def _whitespace_errors(self, xml_file):
         errors = []
+        root = self.parts.root(xml_file)
 
-        for xml_file in self.xml_files:
-            if xml_file.name != "document.xml":
-                continue
-
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                namespaces = {"w": self.WORD_2006_NAMESPACE}
-
-                for t_elem in root.xpath(".//w:del//w:t", namespaces=namespaces):
-                    if t_elem.text:
+        for elem in root.iter(f"{{{self.WORD_2006_NAMESPACE}}}t"):
+            if elem.text:
+                text = elem.text
+                if re.search(r"^[ \t\n\r]", text) or re.search(
+                    r"[ \t\n\r]$", text
+                ):
+                    xml_space_attr = f"{{{self.XML_NAMESPACE}}}space"
+                    if (
+                        xml_space_attr not in elem.attrib
+                        or elem.attrib[xml_space_attr] != "preserve"
+                    ):
                         text_preview = (
-                            repr(t_elem.text)[:50] + "..."
-                            if len(repr(t_elem.text)) > 50
-                            else repr(t_elem.text)
+                            repr(text)[:50] + "..."
+                            if len(repr(text)) > 50
+                            else repr(text)
                         )
                         errors.append(
                             f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                            f"Line {t_elem.sourceline}: <w:t> found within <w:del>: {text_preview}"
+                            f"Line {elem.sourceline}: w:t element with whitespace missing xml:space='preserve': {text_preview}"
                         )
+        return errors
 
-                for instr_elem in root.xpath(
-                    ".//w:del//w:instrText", namespaces=namespaces
-                ):
-                    text_preview = (
-                        repr(instr_elem.text or "")[:50] + "..."
-                        if len(repr(instr_elem.text or "")) > 50
-                        else repr(instr_elem.text or "")
-                    )
-                    errors.append(
-                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                        f"Line {instr_elem.sourceline}: <w:instrText> found within <w:del> (use <w:delInstrText>): {text_preview}"
-                    )
+    def validate_deletions(self):
+        errors = []
 
+        for xml_file in self.xml_files:
+            if xml_file.name != "document.xml":
+                continue
+
+            try:
+                errors.extend(
+                    self._cached(xml_file, "deletions", self._deletion_errors)
+                )
             except (lxml.etree.XMLSyntaxError, Exception) as e:
                 errors.append(
                     f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
@@ -163,6 +142,37 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 print("PASSED - No w:t elements found within w:del elements")
             return True
 
+    def _deletion_errors(self, xml_file):
+        errors = []
+        root = self.parts.root(xml_file)
+        namespaces = {"w": self.WORD_2006_NAMESPACE}
+
+        for t_elem in root.xpath(".//w:del//w:t", namespaces=namespaces):
+            if t_elem.text:
+                text_preview = (
+                    repr(t_elem.text)[:50] + "..."
+                    if len(repr(t_elem.text)) > 50
+                    else repr(t_elem.text)
+                )
+                errors.append(
+                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                    f"Line {t_elem.sourceline}: <w:t> found within <w:del>: {text_preview}"
+                )
+
+        for instr_elem in root.xpath(
+            ".//w:del//w:instrText", namespaces=namespaces
+        ):
+            text_preview = (
+                repr(instr_elem.text or "")[:50] + "..."
+                if len(repr(instr_elem.text or "")) > 50
+                else repr(instr_elem.text or "")
+            )
+            errors.append(
+                f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                f"Line {instr_elem.sourceline}: <w:instrText> found within <w:del> (use <w:delInstrText>): {text_preview}"
+            )
+        return errors
+
     def count_paragraphs_in_unpacked(self):
         count = 0
 
@@ -171,14 +181,16 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 continue
 
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
-                count = len(paragraphs)
+                count = self._cached(xml_file, "paragraphs", self._paragraph_count)
             except Exception as e:
                 print(f"Error counting paragraphs in unpacked document: {e}")
 
         return count
 
+    def _paragraph_count(self, xml_file):
+        root = self.parts.root(xml_file)
+        return len(root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p"))
+
     def count_paragraphs_in_original(self):
         original = self.original_file
         if original is None:
@@ -187,15 +199,11 @@ class DOCXSchemaValidator(BaseSchemaValidator):
         count = 0
 
         try:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                with zipfile.ZipFile(original, "r") as zip_ref:
-                    safe_extract(zip_ref, Path(temp_dir))
-
-                doc_xml_path = temp_dir + "/word/document.xml"
-                root = lxml.etree.parse(doc_xml_path).getroot()
+            with zipfile.ZipFile(original, "r") as zip_ref:
+                root = lxml.etree.fromstring(zip_ref.read("word/document.xml"))
 
-                paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
-                count = len(paragraphs)
+            paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
+            count = len(paragraphs)
 
         except Exception as e:
             print(f"Error counting paragraphs in original document: {e}")
@@ -210,24 +218,9 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 continue
 
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                namespaces = {"w": self.WORD_2006_NAMESPACE}
-
-                invalid_elements = root.xpath(
-                    ".//w:ins//w:delText[not(ancestor::w:del)]", namespaces=namespaces
+                errors.extend(
+                    self._cached(xml_file, "insertions", self._insertion_errors)
                 )
-
-                for elem in invalid_elements:
-                    text_preview = (
-                        repr(elem.text or "")[:50] + "..."
-                        if len(repr(elem.text or "")) > 50
-                        else repr(elem.text or "")
-                    )
-                    errors.append(
-                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                        f"Line {elem.sourceline}: <w:delText> within <w:ins>: {text_preview}"
-                    )
-
             except (lxml.etree.XMLSyntaxError, Exception) as e:
                 errors.append(
                     f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
@@ -243,6 +236,27 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 print("PASSED - No w:delText elements within w:ins elements")
             return True
 
+    def _insertion_errors(self, xml_file):
+        errors = []
+        root = self.parts.root(xml_file)
+        namespaces = {"w": self.WORD_2006_NAMESPACE}
+
+        invalid_elements = root.xpath(
+            ".//w:ins//w:delText[not(ancestor::w:del)]", namespaces=namespaces
+        )
+
+        for elem in invalid_elements:
+            text_preview = (
+                repr(elem.text or "")[:50] + "..."
+                if len(repr(elem.text or "")) > 50
+                else repr(elem.text or "")
+            )
+            errors.append(
+                f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                f"Line {elem.sourceline}: <w:delText> within <w:ins>: {text_preview}"
+            )
+        return errors
+
     def compare_paragraph_counts(self):
         new_count = self.count_paragraphs_in_unpacked()
         if self.original_file is None:
@@ -259,49 +273,12 @@ class DOCXSchemaValidator(BaseSchemaValidator):
 
     def validate_id_constraints(self):
         errors = []
-        para_id_attr = f"{{{self.W14_NAMESPACE}}}paraId"
-        durable_id_attr = f"{{{self.W16CID_NAMESPACE}}}durableId"
 
         for xml_file in self.xml_files:
             try:
-                for elem in lxml.etree.parse(str(xml_file)).iter():
-                    if val := elem.get(para_id_attr):
-                        try:
-                            if self._parse_id_value(val, base=16) >= 0x80000000:
-                                errors.append(
-                                    f"  {xml_file.name}:{elem.sourceline}: paraId={val} >= 0x80000000"
-                                )
-                        except ValueError:
-                            errors.append(
-                                f"  {xml_file.name}:{elem.sourceline}: "
-                                f"paraId={val} is not valid hex"
-                            )
-
-                    if val := elem.get(durable_id_attr):
-                        if xml_file.name == "numbering.xml":
-                            try:
-                                if self._parse_id_value(val, base=10) >= 0x7FFFFFFF:
-                                    errors.append(
-                                        f"  {xml_file.name}:{elem.sourceline}: "
-                                        f"durableId={val} >= 0x7FFFFFFF"
-                                    )
-                            except ValueError:
-                                errors.append(
-                                    f"  {xml_file.name}:{elem.sourceline}: "
-                                    f"durableId={val} must be decimal in numbering.xml"
-                                )
-                        else:
-                            try:
-                                if self._parse_id_value(val, base=16) >= 0x7FFFFFFF:
-                                    errors.append(
-                                        f"  {xml_file.name}:{elem.sourceline}: "
-                                        f"durableId={val} >= 0x7FFFFFFF"
-                                    )
-                            except ValueError:
-                                errors.append(
-                                    f"  {xml_file.name}:{elem.sourceline}: "
-                                    f"durableId={val} is not valid hex"
-                                )
+                errors.extend(
+                    self._cached(xml_file, "id_constraints", self._id_constraint_errors)
+                )
             except lxml.etree.XMLSyntaxError:
                 continue  
 
@@ -313,6 +290,51 @@ class DOCXSchemaValidator(BaseSchemaValidator):
             print("PASSED - All paraId/durableId values within constraints")
         return not errors
 
+    def _id_constraint_errors(self, xml_file):
+        errors = []
+        para_id_attr = f"{{{self.W14_NAMESPACE}}}paraId"
+        durable_id_attr = f"{{{self.W16CID_NAMESPACE}}}durableId"
+
+        for elem in self.parts.tree(xml_file).iter():
+            if val := elem.get(para_id_attr):
+                try:
+                    if self._parse_id_value(val, base=16) >= 0x80000000:
+                        errors.append(
+                            f"  {xml_file.name}:{elem.sourceline}: paraId={val} >= 0x80000000"
+                        )
+                except ValueError:
+                    errors.append(
+                        f"  {xml_file.name}:{elem.sourceline}: "
+                        f"paraId={val} is not valid hex"
+                    )
+
+            if val := elem.get(durable_id_attr):
+                if xml_file.name == "numbering.xml":
+                    try:
+                        if self._parse_id_value(val, base=10) >= 0x7FFFFFFF:
+                            errors.append(
+                                f"  {xml_file.name}:{elem.sourceline}: "
+                                f"durableId={val} >= 0x7FFFFFFF"
+                            )
+                    except ValueError:
+                        errors.append(
+                            f"  {xml_file.name}:{elem.sourceline}: "
+                            f"durableId={val} must be decimal in numbering.xml"
+                        )
+                else:
+                    try:
+                        if self._parse_id_value(val, base=16) >= 0x7FFFFFFF:
+                            errors.append(
+                                f"  {xml_file.name}:{elem.sourceline}: "
+                                f"durableId={val} >= 0x7FFFFFFF"
+                            )
+                    except ValueError:
+                        errors.append(
+                            f"  {xml_file.name}:{elem.sourceline}: "
+                            f"durableId={val} is not valid hex"
+                        )
+        return errors
+
     def validate_comment_markers(self):
         errors = []
 
@@ -330,27 +352,12 @@ class DOCXSchemaValidator(BaseSchemaValidator):
             return True
 
         try:
-            doc_root = lxml.etree.parse(str(document_xml)).getroot()
-            namespaces = {"w": self.WORD_2006_NAMESPACE}
-
-            range_starts = {
-                elem.get(f"{{{self.WORD_2006_NAMESPACE}}}id")
-                for elem in doc_root.xpath(
-                    ".//w:commentRangeStart", namespaces=namespaces
+            range_starts, range_ends, references = (
+                set(ids)
+                for ids in self._cached(
+                    document_xml, "comment_markers", self._comment_marker_ids
                 )
-            }
-            range_ends = {
-                elem.get(f"{{{self.WORD_2006_NAMESPACE}}}id")
-                for elem in doc_root.xpath(
-                    ".//w:commentRangeEnd", namespaces=namespaces
-                )
-            }
-            references = {
-                elem.get(f"{{{self.WORD_2006_NAMESPACE}}}id")
-                for elem in doc_root.xpath(
-                    ".//w:commentReference", namespaces=namespaces
-                )
-            }
+            )
 
             orphaned_ends = range_ends - range_starts
             for comment_id in sorted(
@@ -369,14 +376,10 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 )
 
             comment_ids = set()
-            if comments_xml and comments_xml.exists():
-                comments_root = lxml.etree.parse(str(comments_xml)).getroot()
-                comment_ids = {
-                    elem.get(f"{{{self.WORD_2006_NAMESPACE}}}id")
-                    for elem in comments_root.xpath(
-                        ".//w:comment", namespaces=namespaces
-                    )
-                }
+            if comments_xml and self.package.is_file(comments_xml):
+                comment_ids = set(
+                    self._cached(comments_xml, "comment_ids", self._comment_ids)
+                )
 
                 marker_ids = range_starts | range_ends | references
                 invalid_refs = marker_ids - comment_ids
@@ -401,32 +404,64 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 print("PASSED - All comment markers properly paired")
             return True
 
+    def _comment_marker_ids(self, document_xml):
+        doc_root = self.parts.root(document_xml)
+        namespaces = {"w": self.WORD_2006_NAMESPACE}
+        return [
+            list(
+                {
+                    elem.get(f"{{{self.WORD_2006_NAMESPACE}}}id")
+                    for elem in doc_root.xpath(f".//w:{tag}", namespaces=namespaces)
+                }
+            )
+            for tag in ("commentRangeStart", "commentRangeEnd", "commentReference")
+        ]
+
+    def _comment_ids(self, comments_xml):
+        comments_root = self.parts.root(comments_xml)
+        return list(
+            {
+                elem.get(f"{{{self.WORD_2006_NAMESPACE}}}id")
+                for elem in comments_root.xpath(
+                    ".//w:comment", namespaces={"w": self.WORD_2006_NAMESPACE}
+                )
+            }
+        )
+
     def repair(self) -> int:
         repairs = super().repair()
         repairs += self.repair_durableId()
         return repairs
 
     def repair_durableId(self) -> int:
-        DURABLE_ID_ATTRS = ("w16cid:durableId", "w16cex:durableId")
+        DURABLE_ID_ATTRS = (
+            f"{{{self.W16CID_NAMESPACE}}}durableId",
+            f"{{{self.W16CEX_NAMESPACE}}}durableId",
+        )
         repairs = 0
         renames: dict = {}  
+        started = time.perf_counter()
+        scanned = []
 
         for xml_file in self.xml_files:
             try:
-                content = xml_file.read_text(encoding="utf-8")
-                dom = defusedxml.minidom.parseString(content)
+                content = xml_file.read_bytes()
+                if b"durableId" not in content:
+                    continue
+                scanned.append(len(content))
+                tree = self.parts.tree(xml_file)
                 is_numbering = xml_file.name == "numbering.xml"
                 base = 10 if is_numbering else 16
                 pending = []  
                 seen_in_file = set()
                 modified = False
 
-                for elem in dom.getElementsByTagName("*"):
+                for elem in tree.iter():
                     for attr_name in DURABLE_ID_ATTRS:
-                        if not elem.hasAttribute(attr_name):
+                        durable_id = elem.get(attr_name)
+                        if durable_id is None:
                             continue
 
-                        durable_id = elem.getAttribute(attr_name)
                         try:
                             key = self._parse_id_value(durable_id, base=base)
                             needs_repair = key >= 0x7FFFFFFF
@@ -444,21 +479,26 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                                 value = renames[key]
                             new_id = str(value) if is_numbering else f"{value:08X}"
 
-                            elem.setAttribute(attr_name, new_id)
+                            elem.set(attr_name, new_id)
                             pending.append(
                                 f"  Repaired: {xml_file.name}: durableId {durable_id} → {new_id}"
                             )
                             modified = True
 
                 if modified:
-                    xml_file.write_bytes(dom.toxml(encoding="UTF-8"))
+                    try:
+                        self._write_repaired_part(xml_file, tree)
+                    except OSError as e:
+                        print(f"  Could not write repairs to {xml_file.name}: {e}")
+                        continue
                     for message in pending:
                         print(message)
                     repairs += len(pending)
 
             except Exception:
-                pass
+                self.parts.invalidate(xml_file)
 
+        self._report_repair("durableId", scanned, started)
         return repairs
 
 
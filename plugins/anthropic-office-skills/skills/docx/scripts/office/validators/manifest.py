@@ -0,0 +1,171 @@
+"""
+Manifest of per-part results for incremental validation (--incremental).
+
+An edit-validate loop usually touches one slide or one part between runs.
+The manifest remembers, for every XML part of the package, a stamp, a SHA-256
+of its bytes and the JSON-encoded results each per-part check produced on the
+last run. A part is dirty when its bytes changed, when the .rels file that
+belongs to it changed, or when a relationship of another part targets a
+changed part. Clean parts hand back their stored results without being read
+or parsed. Dirty parts are checked again and their new results are stored.
+
+Checks that look across parts (duplicate IDs, broken references, ...) still
+run every time, but they run on the stored per-part facts.
+
+One manifest is kept per (package path, validator, original, code
+fingerprint) under <cache dir>/incremental/, pruned like the baseline cache. A
+packed file extracted for --auto-repair is keyed on the packed file, not on the
+temporary directory it was extracted to.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import lxml.etree
+
+from helpers import opc_target, rels_source_part
+
+from .baseline import (
+    code_fingerprint,
+    default_cache_dir,
+    file_sha256,
+    prune_cache_dir,
+    read_cache_file,
+)
+
+PACKAGE_RELATIONSHIPS_NAMESPACE = (
+    "http://schemas.openxmlformats.org/package/2006/relationships"
+)
+
+
+class IncrementalManifest:
+
+    def __init__(self, validator):
+        self.package = validator.package
+        self.root = validator.unpacked_dir
+        key = json.dumps(
+            [
+                str(validator.packed_file or self.root),
+                type(validator).__name__,
+                file_sha256(validator.original_file) if validator.original_file else "",
+                code_fingerprint(str(validator.schemas_dir)),
+            ]
+        )
+        cache_dir = (
+            Path(validator.cache_dir) if validator.cache_dir else default_cache_dir()
+        )
+        self.path = (
+            cache_dir
+            / "incremental"
+            / f"{hashlib.sha256(key.encode()).hexdigest()[:32]}.json"
+        )
+        self._previous = self._read()
+        self._parts = {}
+        self.dirty = set()
+        self._scan(validator.xml_files)
+
+    def _read(self) -> dict:
+        return read_cache_file(self.path)
+
+    def _relative(self, xml_file) -> str:
+        return Path(xml_file).relative_to(self.root).as_posix()
+
+    def _scan(self, xml_files):
+        changed = set()
+        for xml_file in xml_files:
+            name = self._relative(xml_file)
+            stamp = list(self.package.stamp(xml_file))
+            previous = self._previous.get(name)
+            if previous and previous.get("stamp") == stamp:
+                self._parts[name] = previous
+                continue
+            digest = hashlib.sha256(self.package.read_bytes(xml_file)).hexdigest()
+            if previous and previous.get("sha256") == digest:
+                self._parts[name] = {**previous, "stamp": stamp}
+                continue
+            self._parts[name] = {"stamp": stamp, "sha256": digest, "results": {}}
+            changed.add(name)
+
+        changed |= set(self._previous) - set(self._parts)
+        self.dirty = set(changed)
+        for name in changed:
+            if name.endswith(".rels"):
+                rels_file = self.root / name
+                self.dirty.add(rels_source_part(rels_file, self.root))
+
+        for name, entry in self._parts.items():
+            if not name.endswith(".rels"):
+                continue
+            targets = entry.get("targets")
+            if targets is None or name in changed:
+                targets = self._rels_targets(self.root / name)
+                entry["targets"] = targets
+            if changed.intersection(targets):
+                self.dirty.add(rels_source_part(self.root / name, self.root))
+                self.dirty.add(name)
+
+        for name in self.dirty:
+            if name in self._parts and name not in changed:
+                self._parts[name] = {**self._parts[name], "results": {}}
+
+    def _rels_targets(self, rels_file) -> list:
+        source = rels_source_part(rels_file, self.root)
+        try:
+            with self.package.open(rels_file) as fh:
+                root = lxml.etree.parse(fh).getroot()
+        except (lxml.etree.XMLSyntaxError, OSError):
+            return []
+        targets = []
+        for rel in root.iter(f"{{{PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"):
+            try:
+                part = opc_target(
+                    rel.get("Target", ""), source, rel.get("TargetMode", "")
+                )
+            except ValueError:
+                continue
+            if part:
+                targets.append(part)
+        return targets
+
+    def has(self, xml_file, check) -> bool:
+        entry = self._parts.get(self._relative(xml_file))
+        return entry is not None and check in entry["results"]
+
+    def get(self, xml_file, check):
+        return self._parts[self._relative(xml_file)]["results"][check]
+
+    def store(self, xml_file, check, value):
+        value = json.loads(json.dumps(value, default=sorted))
+        entry = self._parts.get(self._relative(xml_file))
+        if entry is not None:
+            entry["results"][check] = value
+        return value
+
+    def result(self, xml_file, check, compute):
+        if self.has(xml_file, check):
+            return self.get(xml_file, check)
+        return self.store(xml_file, check, compute())
+
+    def save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(
+                prefix=self.path.name + ".", suffix=".tmp", dir=self.path.parent
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                    json.dump(self._parts, fh)
+                os.replace(tmp_name, self.path)
+            finally:
+                if os.path.exists(tmp_name):
+                    os.unlink(tmp_name)
+        except OSError:
+            return
+        prune_cache_dir(self.path.parent)
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
@@ -0,0 +1,102 @@
+"""
+Parsed-part cache shared by every validator in one run.
+
+Each XML part is parsed once and handed to every check that reads it. An
+entry is keyed by the part's path and its (mtime, size) stamp, so a part
+rewritten by a repair is parsed again on next use. Trees returned by tree()
+are shared: callers must not modify them. Checks that need a modified copy
+(MC-stripped, ignorable-namespace-cleaned, ...) ask derived() for one, which
+is built once from the shared tree and held alongside it. A profiler set on
+the cache is told how long each parse took.
+
+Parts of an unpacked directory go through the module-wide PARTS cache. A
+package read straight from its zip gets a cache of its own, see parts_for().
+"""
+
+import os
+import time
+import weakref
+
+import lxml.etree
+
+from helpers.package import DirectoryPackage
+
+
+class PartCache:
+
+    def __init__(self, package=None):
+        self.package = package
+        self.profiler = None
+        self._entries = {}
+
+    def _stamp(self, path):
+        if self.package is not None:
+            return self.package.stamp(path)
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def _parse(self, path):
+        started = time.perf_counter()
+        try:
+            if self.package is None:
+                return lxml.etree.parse(path)
+            with self.package.open(path) as fh:
+                return lxml.etree.parse(fh, base_url=path)
+        finally:
+            if self.profiler is not None:
+                self.profiler.add_part(path, "parse", time.perf_counter() - started)
+
+    def _entry(self, xml_file):
+        path = str(xml_file)
+        stamp = self._stamp(path)
+        entry = self._entries.get(path)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, {})
+            self._entries[path] = entry
+        return entry[1]
+
+    def tree(self, xml_file):
+        return self.derived(xml_file, None, None)
+
+    def root(self, xml_file):
+        return self.tree(xml_file).getroot()
+
+    def derived(self, xml_file, variant, build):
+        variants = self._entry(xml_file)
+        if variant not in variants:
+            try:
+                if variant is None:
+                    value = self._parse(str(xml_file))
+                else:
+                    value = build(self.tree(xml_file))
+            except Exception as e:
+                value = e
+            variants[variant] = value
+        value = variants[variant]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    def invalidate(self, xml_file):
+        self._entries.pop(str(xml_file), None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+PARTS = PartCache()
+
+_PACKAGE_PARTS = weakref.WeakKeyDictionary()
+
+
+def parts_for(package):
+    if isinstance(package, DirectoryPackage):
+        return PARTS
+    cache = _PACKAGE_PARTS.get(package)
+    if cache is None:
+        cache = _PACKAGE_PARTS[package] = PartCache(package)
+    return cache
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
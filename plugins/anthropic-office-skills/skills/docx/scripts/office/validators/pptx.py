@@ -5,7 +5,7 @@ Validator for PowerPoint presentation XML files against XSD schemas.
 import re
 from pathlib import Path
 
-from helpers import opc_target, rels_source_part, safe_extract
+from helpers import opc_target, rels_source_part
 
 from .base import BaseSchemaValidator
 
@@ -69,22 +69,23 @@ class PPTXSchemaValidator(BaseSchemaValidator):
         if not self.validate_slides():
             all_valid = False
 
+        self._save_manifest()
         return all_valid
 
     def _package_map(self) -> dict:
         wanted = []
-        wanted += list(self.unpacked_dir.glob("[[]Content_Types[]].xml"))
-        wanted += list(self.unpacked_dir.glob("ppt/presentation.xml"))
-        wanted += list(self.unpacked_dir.glob("ppt/theme/*.xml"))
-        wanted += list(self.unpacked_dir.glob("ppt/theme/_rels/*.rels"))
-        wanted += list(self.unpacked_dir.glob("ppt/charts/chart*.xml"))
+        wanted += self.package.glob("[[]Content_Types[]].xml")
+        wanted += self.package.glob("ppt/presentation.xml")
+        wanted += self.package.glob("ppt/theme/*.xml")
+        wanted += self.package.glob("ppt/theme/_rels/*.rels")
+        wanted += self.package.glob("ppt/charts/chart*.xml")
         for group in ("slideMasters", "notesMasters", "handoutMasters"):
-            wanted += list(self.unpacked_dir.glob(f"ppt/{group}/*.xml"))
-            wanted += list(self.unpacked_dir.glob(f"ppt/{group}/_rels/*.rels"))
+            wanted += self.package.glob(f"ppt/{group}/*.xml")
+            wanted += self.package.glob(f"ppt/{group}/_rels/*.rels")
         return {
-            p.relative_to(self.unpacked_dir).as_posix(): p.read_bytes()
+            p.relative_to(self.unpacked_dir).as_posix(): self.package.read_bytes(p)
             for p in wanted
-            if p.is_file()
+            if self.package.is_file(p)
         }
 
     def validate_master_theme_uniqueness(self):
@@ -121,7 +122,6 @@ class PPTXSchemaValidator(BaseSchemaValidator):
         return True
 
     def _original_slide_defects(self, schema) -> set[str]:
-        import tempfile
         import zipfile
 
         from helpers.pptx_slide import SLIDE_PART_RE, fatal_slide_errors
@@ -129,25 +129,20 @@ class PPTXSchemaValidator(BaseSchemaValidator):
         if self.original_file is None:
             return set()
 
+        try:
+            with zipfile.ZipFile(self.original_file, "r") as zf:
+                names = zf.namelist()
+        except (zipfile.BadZipFile, ValueError, OSError):
+            return set()  
+
         found: set[str] = set()
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            try:
-                with zipfile.ZipFile(self.original_file, "r") as zf:
-                    safe_extract(zf, temp_path)
-            except (zipfile.BadZipFile, ValueError, OSError):
-                return set()  
-
-            for part in sorted(temp_path.rglob("*.xml")):
-                relative = part.relative_to(temp_path).as_posix()
-                if not SLIDE_PART_RE.fullmatch(relative):
-                    continue
-                ok, errors = self._validate_single_file_xsd(
-                    part.resolve(), temp_path.resolve(), schema_path=schema
-                )
-                if ok is None or ok or not errors:
-                    continue
-                found |= set(fatal_slide_errors(set(errors)))
+        for relative in sorted(names):
+            if not SLIDE_PART_RE.fullmatch(relative):
+                continue
+            errors = self._original_errors(Path(relative), schema)
+            if errors:
+                found |= set(fatal_slide_errors(errors))
+        self._save_baseline()
         return found
 
     def validate_slides(self):
@@ -162,13 +157,19 @@ class PPTXSchemaValidator(BaseSchemaValidator):
         problems: list[str] = []
         broken: list[str] = []
 
-        for xml_file in self.xml_files:
+        slides = [
+            xml_file
+            for xml_file in self.xml_files
+            if SLIDE_PART_RE.fullmatch(xml_file.relative_to(self.unpacked_dir).as_posix())
+        ]
+        results = self._map_parts_cached(
+            "slide_xsd",
+            "_validate_single_file_xsd",
+            slides,
+            lambda f: (self.package.resolve(f), self.unpacked_dir, schema),
+        )
+        for xml_file, (ok, errors) in zip(slides, results):
             relative = xml_file.relative_to(self.unpacked_dir).as_posix()
-            if not SLIDE_PART_RE.fullmatch(relative):
-                continue
-            ok, errors = self._validate_single_file_xsd(
-                xml_file.resolve(), self.unpacked_dir.resolve(), schema_path=schema
-            )
             if ok is None or not errors:
                 continue
 
@@ -229,25 +230,10 @@ class PPTXSchemaValidator(BaseSchemaValidator):
         import lxml.etree
 
         errors = []
-        uuid_pattern = re.compile(
-            r"^[\{\(]?[0-9A-Fa-f]{8}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{12}[\}\)]?$"
-        )
 
         for xml_file in self.xml_files:
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-
-                for elem in root.iter():
-                    for attr, value in elem.attrib.items():
-                        attr_name = attr.split("}")[-1].lower()
-                        if attr_name == "id" or attr_name.endswith("id"):
-                            if self._looks_like_uuid(value):
-                                if not uuid_pattern.match(value):
-                                    errors.append(
-                                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                                        f"Line {elem.sourceline}: ID '{value}' appears to be a UUID but contains invalid hex characters"
-                                    )
-
+                errors.extend(self._cached(xml_file, "uuid_ids", self._uuid_errors))
             except (lxml.etree.XMLSyntaxError, Exception) as e:
                 errors.append(
                     f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
@@ -263,6 +249,25 @@ class PPTXSchemaValidator(BaseSchemaValidator):
                 print("PASSED - All UUID-like IDs contain valid hex values")
             return True
 
+    def _uuid_errors(self, xml_file):
+        errors = []
+        uuid_pattern = re.compile(
+            r"^[\{\(]?[0-9A-Fa-f]{8}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{12}[\}\)]?$"
+        )
+        root = self.parts.root(xml_file)
+
+        for elem in root.iter():
+            for attr, value in elem.attrib.items():
+                attr_name = attr.split("}")[-1].lower()
+                if attr_name == "id" or attr_name.endswith("id"):
+                    if self._looks_like_uuid(value):
+                        if not uuid_pattern.match(value):
+                            errors.append(
+                                f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                                f"Line {elem.sourceline}: ID '{value}' appears to be a UUID but contains invalid hex characters"
+                            )
+        return errors
+
     def _looks_like_uuid(self, value):
         clean_value = value.strip("{}()").replace("-", "")
         return len(clean_value) == 32 and all(c.isalnum() for c in clean_value)
@@ -272,7 +277,7 @@ class PPTXSchemaValidator(BaseSchemaValidator):
 
         errors = []
 
-        slide_masters = list(self.unpacked_dir.glob("ppt/slideMasters/*.xml"))
+        slide_masters = self.package.glob("ppt/slideMasters/*.xml")
 
         if not slide_masters:
             if self.verbose:
@@ -281,41 +286,11 @@ class PPTXSchemaValidator(BaseSchemaValidator):
 
         for slide_master in slide_masters:
             try:
-                root = lxml.etree.parse(str(slide_master)).getroot()
-
-                rels_file = slide_master.parent / "_rels" / f"{slide_master.name}.rels"
-
-                if not rels_file.exists():
-                    errors.append(
-                        f"  {slide_master.relative_to(self.unpacked_dir)}: "
-                        f"Missing relationships file: {rels_file.relative_to(self.unpacked_dir)}"
+                errors.extend(
+                    self._cached(
+                        slide_master, "slide_layout_ids", self._slide_layout_id_errors
                     )
-                    continue
-
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
-
-                valid_layout_rids = set()
-                for rel in rels_root.findall(
-                    f".//{{{self.PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
-                ):
-                    rel_type = rel.get("Type", "")
-                    if "slideLayout" in rel_type:
-                        valid_layout_rids.add(rel.get("Id"))
-
-                for sld_layout_id in root.findall(
-                    f".//{{{self.PRESENTATIONML_NAMESPACE}}}sldLayoutId"
-                ):
-                    r_id = sld_layout_id.get(
-                        f"{{{self.OFFICE_RELATIONSHIPS_NAMESPACE}}}id"
-                    )
-                    layout_id = sld_layout_id.get("id")
-
-                    if r_id and r_id not in valid_layout_rids:
-                        errors.append(
-                            f"  {slide_master.relative_to(self.unpacked_dir)}: "
-                            f"Line {sld_layout_id.sourceline}: sldLayoutId with id='{layout_id}' "
-                            f"references r:id='{r_id}' which is not found in slide layout relationships"
-                        )
+                )
 
             except (lxml.etree.XMLSyntaxError, Exception) as e:
                 errors.append(
@@ -335,22 +310,49 @@ class PPTXSchemaValidator(BaseSchemaValidator):
                 print("PASSED - All slide layout IDs reference valid slide layouts")
             return True
 
-    def validate_no_duplicate_slide_layouts(self):
-        import lxml.etree
+    def _slide_layout_id_errors(self, slide_master):
+        errors = []
+        rels_file = slide_master.parent / "_rels" / f"{slide_master.name}.rels"
+
+        if not self.package.is_file(rels_file):
+            return [
+                f"  {slide_master.relative_to(self.unpacked_dir)}: "
+                f"Missing relationships file: {rels_file.relative_to(self.unpacked_dir)}"
+            ]
+
+        valid_layout_rids = {
+            rel.rid
+            for rel in self._part_index(rels_file).relationships
+            if "slideLayout" in rel.type
+        }
+
+        root = self.parts.root(slide_master)
+        for sld_layout_id in root.findall(
+            f".//{{{self.PRESENTATIONML_NAMESPACE}}}sldLayoutId"
+        ):
+            r_id = sld_layout_id.get(
+                f"{{{self.OFFICE_RELATIONSHIPS_NAMESPACE}}}id"
+            )
+            layout_id = sld_layout_id.get("id")
+
+            if r_id and r_id not in valid_layout_rids:
+                errors.append(
+                    f"  {slide_master.relative_to(self.unpacked_dir)}: "
+                    f"Line {sld_layout_id.sourceline}: sldLayoutId with id='{layout_id}' "
+                    f"references r:id='{r_id}' which is not found in slide layout relationships"
+                )
+        return errors
 
+    def validate_no_duplicate_slide_layouts(self):
         errors = []
-        slide_rels_files = list(self.unpacked_dir.glob("ppt/slides/_rels/*.xml.rels"))
+        slide_rels_files = self.package.glob("ppt/slides/_rels/*.xml.rels")
 
         for rels_file in slide_rels_files:
             try:
-                root = lxml.etree.parse(str(rels_file)).getroot()
-
                 layout_rels = [
                     rel
-                    for rel in root.findall(
-                        f".//{{{self.PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
-                    )
-                    if "slideLayout" in rel.get("Type", "")
+                    for rel in self._part_index(rels_file).relationships
+                    if "slideLayout" in rel.type
                 ]
 
                 if len(layout_rels) > 1:
@@ -379,7 +381,7 @@ class PPTXSchemaValidator(BaseSchemaValidator):
         errors = []
         notes_slide_references = {}  
 
-        slide_rels_files = list(self.unpacked_dir.glob("ppt/slides/_rels/*.xml.rels"))
+        slide_rels_files = self.package.glob("ppt/slides/_rels/*.xml.rels")
 
         if not slide_rels_files:
             if self.verbose:
@@ -388,17 +390,12 @@ class PPTXSchemaValidator(BaseSchemaValidator):
 
         for rels_file in slide_rels_files:
             try:
-                root = lxml.etree.parse(str(rels_file)).getroot()
-
-                for rel in root.findall(
-                    f".//{{{self.PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
-                ):
-                    rel_type = rel.get("Type", "")
-                    if "notesSlide" in rel_type:
+                for rel in self._part_index(rels_file).relationships:
+                    if "notesSlide" in rel.type:
                         part = opc_target(
-                            rel.get("Target", ""),
+                            rel.target or "",
                             rels_source_part(rels_file, self.unpacked_dir),
-                            rel.get("TargetMode", ""),
+                            rel.target_mode or "",
                         )
                         if part:
                             slide_name = rels_file.stem.replace(
@@ -9,9 +9,10 @@ Does all of the package bookkeeping, so the deck stays valid:
     <p:sldIdLst> — at the end, or after --after SLIDE
 
 Works on an unpacked directory (during an editing session) or directly on a
-.pptx/.potx file (extracted to a temp dir, then rezipped atomically; the
-temp dir is discarded, so unpack the output if you still need to edit the
-new slide's content).
+.pptx/.potx file (edited in memory, then rezipped atomically with the
+untouched parts copied as they are; unpack the output if you still need to
+edit the new slide's content). From Python, pass an OfficePackage to chain
+several edits before one save().
 
 Usage:
     python add_slide.py unpacked/ slide2.xml                 # duplicate slide2
@@ -26,14 +27,12 @@ A duplicated slide still holds the source's content: edit ppt/slides/slideN.xml
 
 import argparse
 import re
-import shutil
 import sys
 from typing import NoReturn
-import tempfile
 import zipfile
 from pathlib import Path
 
-from office.helpers import rezip, safe_extract
+from office.helpers.package import CONTENT_TYPES, OfficePackage
 
 MINIMAL_SLIDE_XML = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <p:sld xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main">
@@ -64,6 +63,9 @@ SHARED_PART_TYPES = ("chart", "diagramData", "oleObject", "package")
 NOTES_SLIDE_TYPE_RE = re.compile(r"""Type=["'][^"']*/relationships/notesSlide["']""")
 RELATIONSHIP_RE = re.compile(r"<Relationship\b[^>]*?(?:/>|>.*?</Relationship\s*>)", re.DOTALL)
 
+PRESENTATION = "ppt/presentation.xml"
+PRESENTATION_RELS = "ppt/_rels/presentation.xml.rels"
+
 SLIDE_ID_MIN = 256
 SLIDE_ID_MAX = 2147483647
 
@@ -73,9 +75,9 @@ def _die(msg: str) -> NoReturn:
     sys.exit(1)
 
 
-def get_next_slide_number(slides_dir: Path) -> int:
-    existing = [int(m.group(1)) for f in slides_dir.glob("slide*.xml")
-                if (m := re.match(r"slide(\d+)\.xml", f.name))]
+def get_next_slide_number(package: OfficePackage) -> int:
+    existing = [int(m.group(1)) for name in package.find_parts("ppt/slides/slide*.xml")
+                if (m := re.match(r"ppt/slides/slide(\d+)\.xml", name))]
     return max(existing) + 1 if existing else 1
 
 
@@ -86,63 +88,55 @@ def parse_source(source: str) -> tuple[str, str | None]:
     return ("slide", None)
 
 
-def create_slide_from_layout(unpacked_dir: Path, layout_file: str, after: str | None = None) -> str:
-    slides_dir = unpacked_dir / "ppt" / "slides"
-    rels_dir = slides_dir / "_rels"
-    layout_path = unpacked_dir / "ppt" / "slideLayouts" / layout_file
+def create_slide_from_layout(package: OfficePackage, layout_file: str, after: str | None = None) -> str:
+    layout_part = f"ppt/slideLayouts/{layout_file}"
 
-    if not layout_path.exists():
-        _die(f"{layout_path} not found")
+    if not package.has_part(layout_part):
+        _die(f"{package.path / layout_part} not found")
 
-    next_num = get_next_slide_number(slides_dir)
+    next_num = get_next_slide_number(package)
     dest = f"slide{next_num}.xml"
-    after_rid = _precheck_registration(unpacked_dir, after, dest)
-    slides_dir.mkdir(parents=True, exist_ok=True)
+    after_rid = _precheck_registration(package, after, dest)
 
-    (slides_dir / dest).write_text(MINIMAL_SLIDE_XML, encoding="utf-8")
+    package.write_text(f"ppt/slides/{dest}", MINIMAL_SLIDE_XML)
 
-    rels_dir.mkdir(exist_ok=True)
     rels_xml = f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
   <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/slideLayout" Target="../slideLayouts/{layout_file}"/>
 </Relationships>'''
-    (rels_dir / f"{dest}.rels").write_text(rels_xml, encoding="utf-8")
+    package.write_text(f"ppt/slides/_rels/{dest}.rels", rels_xml)
 
-    _register_slide(unpacked_dir, dest, layout_file, after_rid)
+    _register_slide(package, dest, layout_file, after_rid)
     return dest
 
 
-def duplicate_slide(unpacked_dir: Path, source: str, after: str | None = None) -> str:
-    slides_dir = unpacked_dir / "ppt" / "slides"
-    rels_dir = slides_dir / "_rels"
-    source_slide = slides_dir / source
+def duplicate_slide(package: OfficePackage, source: str, after: str | None = None) -> str:
+    source_part = f"ppt/slides/{source}"
 
-    if not source_slide.exists():
-        _die(f"{source_slide} not found")
+    if not package.has_part(source_part):
+        _die(f"{package.path / source_part} not found")
 
-    next_num = get_next_slide_number(slides_dir)
+    next_num = get_next_slide_number(package)
     dest = f"slide{next_num}.xml"
-    after_rid = _precheck_registration(unpacked_dir, after, dest)
+    after_rid = _precheck_registration(package, after, dest)
 
-    shutil.copy2(source_slide, slides_dir / dest)
+    package.copy_part(source_part, f"ppt/slides/{dest}")
 
-    source_rels = rels_dir / f"{source}.rels"
+    source_rels = f"ppt/slides/_rels/{source}.rels"
     shared_parts: list[str] = []
-    if source_rels.exists():
-        dest_rels = rels_dir / f"{dest}.rels"
-        shutil.copy2(source_rels, dest_rels)
-        rels_content = dest_rels.read_text(encoding="utf-8")
+    if package.has_part(source_rels):
+        rels_content = package.read_text(source_rels)
         rels_content = RELATIONSHIP_RE.sub(
             lambda m: "" if NOTES_SLIDE_TYPE_RE.search(m.group(0)) else m.group(0),
             rels_content,
         )
-        dest_rels.write_text(rels_content, encoding="utf-8")
+        package.write_text(f"ppt/slides/_rels/{dest}.rels", rels_content)
         shared_parts = sorted({
             t for t in re.findall(r'Type="[^"]*/relationships/(\w+)"', rels_content)
             if t in SHARED_PART_TYPES
         })
 
-    _register_slide(unpacked_dir, dest, source, after_rid)
+    _register_slide(package, dest, source, after_rid)
     if shared_parts:
         print(
             f"Note: {dest} shares its {', '.join(shared_parts)} part(s) with {source} "
@@ -151,11 +145,10 @@ def duplicate_slide(unpacked_dir: Path, source: str, after: str | None = None) -
     return dest
 
 
-def _precheck_registration(unpacked_dir: Path, after: str | None, dest: str) -> str | None:
-    pres_path = unpacked_dir / "ppt" / "presentation.xml"
-    if not pres_path.exists():
-        _die(f"{pres_path} not found — is this an unpacked PPTX?")
-    xml = pres_path.read_text(encoding="utf-8")
+def _precheck_registration(package: OfficePackage, after: str | None, dest: str) -> str | None:
+    if not package.has_part(PRESENTATION):
+        _die(f"{package.path / PRESENTATION} not found — is this an unpacked PPTX?")
+    xml = package.read_text(PRESENTATION)
 
     has_slot = (
         "</p:sldIdLst>" in xml
@@ -166,12 +159,10 @@ def _precheck_registration(unpacked_dir: Path, after: str | None, dest: str) ->
         _die("presentation.xml has no <p:sldIdLst> (or <p:sldMasterIdLst> to anchor a new one)")
 
     stale = []
-    content_types = unpacked_dir / "[Content_Types].xml"
-    if content_types.exists() and f'PartName="/ppt/slides/{dest}"' in content_types.read_text(encoding="utf-8"):
+    if package.has_part(CONTENT_TYPES) and f'PartName="/ppt/slides/{dest}"' in package.read_text(CONTENT_TYPES):
         stale.append("[Content_Types].xml")
-    pres_rels = unpacked_dir / "ppt" / "_rels" / "presentation.xml.rels"
-    if pres_rels.exists() and _find_slide_relationship(
-        pres_rels.read_text(encoding="utf-8"), dest
+    if package.has_part(PRESENTATION_RELS) and _find_slide_relationship(
+        package.read_text(PRESENTATION_RELS), dest
     ):
         stale.append("presentation.xml.rels")
     if stale:
@@ -182,17 +173,17 @@ def _precheck_registration(unpacked_dir: Path, after: str | None, dest: str) ->
 
     if not after:
         return None
-    after_rid = _rid_for_slide(unpacked_dir, after)
+    after_rid = _rid_for_slide(package, after)
     if not re.search(rf'<p:sldId\b[^>]*r:id="{re.escape(after_rid)}"[^>]*>', xml):
         _die(f"{after} ({after_rid}) is not listed in <p:sldIdLst>")
     return after_rid
 
 
-def _register_slide(unpacked_dir: Path, dest: str, source_desc: str, after_rid: str | None) -> None:
-    _add_to_content_types(unpacked_dir, dest)
-    rid = _add_to_presentation_rels(unpacked_dir, dest)
-    slide_id = _get_next_slide_id(unpacked_dir)
-    pos, total = _insert_into_sld_id_lst(unpacked_dir, slide_id, rid, after_rid)
+def _register_slide(package: OfficePackage, dest: str, source_desc: str, after_rid: str | None) -> None:
+    _add_to_content_types(package, dest)
+    rid = _add_to_presentation_rels(package, dest)
+    slide_id = _get_next_slide_id(package)
+    pos, total = _insert_into_sld_id_lst(package, slide_id, rid, after_rid)
 
     print(f"Created ppt/slides/{dest} from {source_desc}")
     print(
@@ -201,33 +192,31 @@ def _register_slide(unpacked_dir: Path, dest: str, source_desc: str, after_rid:
     )
 
 
-def _add_to_content_types(unpacked_dir: Path, dest: str) -> None:
-    content_types_path = unpacked_dir / "[Content_Types].xml"
-    content_types = content_types_path.read_text(encoding="utf-8")
+def _add_to_content_types(package: OfficePackage, dest: str) -> None:
+    content_types = package.read_text(CONTENT_TYPES)
 
     new_override = f'<Override PartName="/ppt/slides/{dest}" ContentType="application/vnd.openxmlformats-officedocument.presentationml.slide+xml"/>'
 
     if f'PartName="/ppt/slides/{dest}"' not in content_types:
         content_types = content_types.replace("</Types>", f"  {new_override}\n</Types>")
-        content_types_path.write_text(content_types, encoding="utf-8")
+        package.write_text(CONTENT_TYPES, content_types)
 
 
-def _add_to_presentation_rels(unpacked_dir: Path, dest: str) -> str:
-    pres_rels_path = unpacked_dir / "ppt" / "_rels" / "presentation.xml.rels"
-    pres_rels = pres_rels_path.read_text(encoding="utf-8")
+def _add_to_presentation_rels(package: OfficePackage, dest: str) -> str:
+    pres_rels = package.read_text(PRESENTATION_RELS)
 
     existing = _find_slide_relationship(pres_rels, dest)
     if existing:
         return existing
 
-    pres_xml = (unpacked_dir / "ppt" / "presentation.xml").read_text(encoding="utf-8")
+    pres_xml = package.read_text(PRESENTATION)
     used = {int(n) for n in re.findall(r'\bId="rId(\d+)"', pres_rels)}
     used |= {int(n) for n in re.findall(r'\br:id="rId(\d+)"', pres_xml)}
     rid = f"rId{max(used) + 1 if used else 1}"
 
     new_rel = f'<Relationship Id="{rid}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide" Target="slides/{dest}"/>'
     pres_rels = pres_rels.replace("</Relationships>", f"  {new_rel}\n</Relationships>")
-    pres_rels_path.write_text(pres_rels, encoding="utf-8")
+    package.write_text(PRESENTATION_RELS, pres_rels)
 
     return rid
 
@@ -242,8 +231,8 @@ def _find_slide_relationship(pres_rels: str, slide_name: str) -> str | None:
     return None
 
 
-def _get_next_slide_id(unpacked_dir: Path) -> int:
-    pres_content = (unpacked_dir / "ppt" / "presentation.xml").read_text(encoding="utf-8")
+def _get_next_slide_id(package: OfficePackage) -> int:
+    pres_content = package.read_text(PRESENTATION)
     used = {int(m) for m in re.findall(r'<p:sldId[^>]*\bid="(\d+)"', pres_content)}
 
     candidate = max((i for i in used if i >= SLIDE_ID_MIN), default=SLIDE_ID_MIN - 1) + 1
@@ -256,10 +245,9 @@ def _get_next_slide_id(unpacked_dir: Path) -> int:
 
 
 def _insert_into_sld_id_lst(
-    unpacked_dir: Path, slide_id: int, rid: str, after_rid: str | None = None
+    package: OfficePackage, slide_id: int, rid: str, after_rid: str | None = None
 ) -> tuple[int, int]:
-    pres_path = unpacked_dir / "ppt" / "presentation.xml"
-    xml = pres_path.read_text(encoding="utf-8")
+    xml = package.read_text(PRESENTATION)
     entry = f'<p:sldId id="{slide_id}" r:id="{rid}"/>'
 
     if f'r:id="{rid}"' in xml:
@@ -287,7 +275,7 @@ def _insert_into_sld_id_lst(
     else:
         _die("presentation.xml has no <p:sldIdLst> (or <p:sldMasterIdLst> to anchor a new one)")
 
-    pres_path.write_text(xml, encoding="utf-8")
+    package.write_text(PRESENTATION, xml)
 
     lst = re.search(r"<p:sldIdLst>(.*)</p:sldIdLst>", xml, re.DOTALL)
     entries = re.findall(r"<p:sldId\b[^>]*>", lst.group(1)) if lst else []
@@ -297,31 +285,32 @@ def _insert_into_sld_id_lst(
     return position, len(entries)
 
 
-def _rid_for_slide(unpacked_dir: Path, slide_name: str) -> str:
-    pres_rels_path = unpacked_dir / "ppt" / "_rels" / "presentation.xml.rels"
-    rid = _find_slide_relationship(pres_rels_path.read_text(encoding="utf-8"), slide_name)
+def _rid_for_slide(package: OfficePackage, slide_name: str) -> str:
+    rid = _find_slide_relationship(package.read_text(PRESENTATION_RELS), slide_name)
     if not rid:
         _die(f"{slide_name} has no relationship in presentation.xml.rels")
     return rid
 
 
-def add_slide(unpacked_dir: Path, source: str, after: str | None = None) -> str:
+def add_slide(target: OfficePackage | Path, source: str, after: str | None = None) -> str:
+    if not isinstance(target, OfficePackage):
+        with OfficePackage(target) as package:
+            dest = add_slide(package, source, after)
+            package.save()
+        return dest
     source_type, layout_file = parse_source(source)
     if source_type == "layout" and layout_file is not None:
-        return create_slide_from_layout(unpacked_dir, layout_file, after)
-    return duplicate_slide(unpacked_dir, source, after)
+        return create_slide_from_layout(target, layout_file, after)
+    return duplicate_slide(target, source, after)
 
 
 def add_slide_to_package(
     package: Path, source: str, after: str | None = None, output: Path | None = None
 ) -> str:
     out = output or package
-    with tempfile.TemporaryDirectory() as tmp:
-        tmp_path = Path(tmp)
-        with zipfile.ZipFile(package) as zf:
-            safe_extract(zf, tmp_path)
-        dest = add_slide(tmp_path, source, after)
-        rezip(tmp_path, out)
+    with OfficePackage(package) as pkg:
+        dest = add_slide(pkg, source, after)
+        pkg.save(out)
     print(f"Wrote {out} — the new slide is ppt/slides/{dest} inside it (unpack to edit its content)")
     return dest
 
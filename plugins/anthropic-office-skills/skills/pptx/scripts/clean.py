@@ -13,42 +13,103 @@ This script removes:
 - Unreferenced theme files
 - Unreferenced notes slides
 - Content-Type overrides for deleted files
+
+Every .rels file is parsed once into a graph of parts. Media, embeddings,
+charts, diagrams, tags, drawings, ink, themes and notes slides are kept only
+when a relationship chain from the package root, or from any part that is never
+deleted (slides, layouts, masters, ...), reaches them, so parts that only
+reference each other go too.
 """
 
 import posixpath
 import re
 import sys
+from collections import defaultdict
 from pathlib import Path
 
+import defusedxml.ElementTree as ET
 import defusedxml.minidom
 
 from office.helpers import SLIDE_REL_TYPE, opc_target, rels_source_part
+from office.helpers.package import rels_name
+
+RELATIONSHIP_TAG = (
+    "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+)
+RESOURCE_DIRS = ("media", "embeddings", "charts", "diagrams", "tags", "drawings", "ink")
+OWNED_RELS_PATHS = {
+    f"ppt/{d}" for d in ("charts", "diagrams", "drawings", "notesSlides")
+}
+OVERRIDE_RE = re.compile(r"<Override\b[^>]*?(?:/>|>\s*</Override\s*>)")
+PART_NAME_RE = re.compile(r"""\bPartName\s*=\s*(["'])(.*?)\1""")
+
+
+class PartGraph:
+    """Every file in an unpacked package, and the parts each one's relationships resolve to."""
+
+    def __init__(self, unpacked_dir: Path):
+        self.parts = {
+            p.relative_to(unpacked_dir).as_posix()
+            for p in unpacked_dir.rglob("*")
+            if p.is_file()
+        }
+        self.rels: dict[str, str] = {}
+        self.targets: dict[str, list[tuple[str, str, str]]] = defaultdict(list)
+        for name in sorted(self.parts):
+            if (
+                not name.endswith(".rels")
+                or posixpath.basename(posixpath.dirname(name)) != "_rels"
+            ):
+                continue
+            rels_file = unpacked_dir / name
+            source_part = rels_source_part(rels_file, unpacked_dir)
+            self.rels[name] = source_part
+            for rel in ET.parse(rels_file).getroot().iter(RELATIONSHIP_TAG):
+                part = opc_target(
+                    rel.get("Target", ""), source_part, rel.get("TargetMode", "")
+                )
+                if part is not None:
+                    self.targets[source_part].append(
+                        (rel.get("Id", ""), rel.get("Type", ""), part)
+                    )
+
+    def remove(self, name: str) -> None:
+        self.parts.discard(name)
+        if name in self.rels:
+            self.targets.pop(self.rels.pop(name), None)
+
+    def reachable(self, roots) -> set[str]:
+        seen = set()
+        stack = list(roots)
+        while stack:
+            part = stack.pop()
+            if part in seen:
+                continue
+            seen.add(part)
+            stack.extend(
+                target
+                for _, _, target in self.targets.get(part, ())
+                if target not in seen
+            )
+        return seen & self.parts
 
 
-def _slide_rids(pres_rels_path: Path, unpacked_dir: Path) -> dict[str, str]:
-    source_part = rels_source_part(pres_rels_path, unpacked_dir)
-    rels_dom = defusedxml.minidom.parse(str(pres_rels_path))
-
-    rids: dict[str, str] = {}
-    for rel in rels_dom.getElementsByTagName("Relationship"):
-        if rel.getAttribute("Type") != SLIDE_REL_TYPE:
-            continue
-        part = opc_target(
-            rel.getAttribute("Target"), source_part, rel.getAttribute("TargetMode")
-        )
-        if part is not None:
-            rids[rel.getAttribute("Id")] = part
-    return rids
+def _slide_rids(graph: PartGraph) -> dict[str, str]:
+    return {
+        rid: part
+        for rid, rel_type, part in graph.targets.get("ppt/presentation.xml", ())
+        if rel_type == SLIDE_REL_TYPE
+    }
 
 
-def get_slides_in_sldidlst(unpacked_dir: Path) -> set[str]:
+def get_slides_in_sldidlst(unpacked_dir: Path, graph: PartGraph) -> set[str]:
     pres_path = unpacked_dir / "ppt" / "presentation.xml"
     pres_rels_path = unpacked_dir / "ppt" / "_rels" / "presentation.xml.rels"
 
     if not pres_path.exists() or not pres_rels_path.exists():
         return set()
 
-    rid_to_slide = _slide_rids(pres_rels_path, unpacked_dir)
+    rid_to_slide = _slide_rids(graph)
 
     pres_content = pres_path.read_text(encoding="utf-8")
     referenced_rids = set(re.findall(r'<p:sldId[^>]*r:id="([^"]+)"', pres_content))
@@ -64,7 +125,7 @@ class RefusedToClean(Exception):
     """The package does not look the way a readable package should."""
 
 
-def remove_orphaned_slides(unpacked_dir: Path) -> list[str]:
+def remove_orphaned_slides(unpacked_dir: Path, graph: PartGraph) -> list[str]:
     slides_dir = unpacked_dir / "ppt" / "slides"
     slides_rels_dir = slides_dir / "_rels"
     pres_rels_path = unpacked_dir / "ppt" / "_rels" / "presentation.xml.rels"
@@ -72,7 +133,7 @@ def remove_orphaned_slides(unpacked_dir: Path) -> list[str]:
     if not slides_dir.exists():
         return []
 
-    referenced_slides = get_slides_in_sldidlst(unpacked_dir)
+    referenced_slides = get_slides_in_sldidlst(unpacked_dir, graph)
     on_disk = sorted(slides_dir.glob("slide*.xml"))
 
     if on_disk and not any(s.name in referenced_slides for s in on_disk):
@@ -95,11 +156,13 @@ def remove_orphaned_slides(unpacked_dir: Path) -> list[str]:
         if slide_file.name not in referenced_slides:
             rel_path = slide_file.relative_to(unpacked_dir)
             slide_file.unlink()
+            graph.remove(rel_path.as_posix())
             removed.append(str(rel_path))
 
             rels_file = slides_rels_dir / f"{slide_file.name}.rels"
             if rels_file.exists():
                 rels_file.unlink()
+                graph.remove(rels_file.relative_to(unpacked_dir).as_posix())
                 removed.append(str(rels_file.relative_to(unpacked_dir)))
 
     if removed and pres_rels_path.exists():
@@ -127,7 +190,7 @@ def remove_orphaned_slides(unpacked_dir: Path) -> list[str]:
     return removed
 
 
-def remove_trash_directory(unpacked_dir: Path) -> list[str]:
+def remove_trash_directory(unpacked_dir: Path, graph: PartGraph) -> list[str]:
     trash_dir = unpacked_dir / "[trash]"
     removed = []
 
@@ -137,95 +200,69 @@ def remove_trash_directory(unpacked_dir: Path) -> list[str]:
                 rel_path = file_path.relative_to(unpacked_dir)
                 removed.append(str(rel_path))
                 file_path.unlink()
+                graph.remove(rel_path.as_posix())
         trash_dir.rmdir()
 
     return removed
 
 
-def _referenced_by(rels_files, unpacked_dir: Path) -> set:
-    referenced = set()
+def _removable(part: str) -> bool:
+    directory, name = posixpath.split(part)
+    parent, folder = posixpath.split(directory)
+    if parent != "ppt":
+        return False
+    if folder in RESOURCE_DIRS:
+        return True
+    if folder == "theme":
+        return name.startswith("theme") and name.endswith(".xml")
+    return folder == "notesSlides" and name.endswith(".xml")
 
-    for rels_file in rels_files:
-        source_part = rels_source_part(rels_file, unpacked_dir)
-        dom = defusedxml.minidom.parse(str(rels_file))
-        for rel in dom.getElementsByTagName("Relationship"):
-            part = opc_target(
-                rel.getAttribute("Target"), source_part, rel.getAttribute("TargetMode")
-            )
-            if part is not None:
-                referenced.add(Path(part))
-
-    return referenced
 
+def _removal_order(part: str) -> tuple[int, str]:
+    folder = posixpath.basename(posixpath.dirname(part))
+    return (RESOURCE_DIRS + ("theme", "notesSlides")).index(folder), part
 
-def remove_orphaned_rels_files(unpacked_dir: Path) -> list[str]:
-    resource_dirs = ["charts", "diagrams", "drawings"]
-    removed = []
-
-    for dir_name in resource_dirs:
-        rels_dir = unpacked_dir / "ppt" / dir_name / "_rels"
-        if not rels_dir.exists():
-            continue
 
-        for rels_file in rels_dir.glob("*.rels"):
-            resource_file = rels_dir.parent / rels_file.name.replace(".rels", "")
-            if not resource_file.exists():
-                rels_file.unlink()
-                removed.append(str(rels_file.relative_to(unpacked_dir)))
+def _dangling_rels(graph: PartGraph) -> list[str]:
+    return sorted(
+        name for name, owner in graph.rels.items() if owner not in graph.parts
+    )
 
-    return removed
 
+def _in_owned_rels_dir(name: str) -> bool:
+    return posixpath.dirname(posixpath.dirname(name)) in OWNED_RELS_PATHS
 
-def get_referenced_files(unpacked_dir: Path) -> set:
-    return _referenced_by(sorted(unpacked_dir.rglob("*.rels")), unpacked_dir)
 
+def remove_unreachable_files(unpacked_dir: Path, graph: PartGraph) -> list[str]:
+    removable = {part for part in graph.parts if _removable(part)}
+    roots = [""]
+    roots += (
+        part for part in graph.parts if part not in removable and part not in graph.rels
+    )
+    # a .rels left behind by a part deleted earlier still names what it references
+    for name in _dangling_rels(graph):
+        if not _in_owned_rels_dir(name):
+            roots += (
+                target for _, _, target in graph.targets.get(graph.rels[name], ())
+            )
+    keep = graph.reachable(roots)
 
-def remove_orphaned_files(unpacked_dir: Path, referenced: set) -> list[str]:
-    resource_dirs = ["media", "embeddings", "charts", "diagrams", "tags", "drawings", "ink"]
     removed = []
-
-    for dir_name in resource_dirs:
-        dir_path = unpacked_dir / "ppt" / dir_name
-        if not dir_path.exists():
-            continue
-
-        for file_path in dir_path.glob("*"):
-            if not file_path.is_file():
-                continue
-            rel_path = file_path.relative_to(unpacked_dir)
-            if rel_path not in referenced:
-                file_path.unlink()
-                removed.append(str(rel_path))
-
-    theme_dir = unpacked_dir / "ppt" / "theme"
-    if theme_dir.exists():
-        for file_path in theme_dir.glob("theme*.xml"):
-            rel_path = file_path.relative_to(unpacked_dir)
-            if rel_path not in referenced:
-                file_path.unlink()
-                removed.append(str(rel_path))
-                theme_rels = theme_dir / "_rels" / f"{file_path.name}.rels"
-                if theme_rels.exists():
-                    theme_rels.unlink()
-                    removed.append(str(theme_rels.relative_to(unpacked_dir)))
-
-    notes_dir = unpacked_dir / "ppt" / "notesSlides"
-    if notes_dir.exists():
-        for file_path in notes_dir.glob("*.xml"):
-            if not file_path.is_file():
-                continue
-            rel_path = file_path.relative_to(unpacked_dir)
-            if rel_path not in referenced:
-                file_path.unlink()
-                removed.append(str(rel_path))
-
-        notes_rels_dir = notes_dir / "_rels"
-        if notes_rels_dir.exists():
-            for file_path in notes_rels_dir.glob("*.rels"):
-                notes_file = notes_dir / file_path.name.replace(".rels", "")
-                if not notes_file.exists():
-                    file_path.unlink()
-                    removed.append(str(file_path.relative_to(unpacked_dir)))
+    for part in sorted(removable - keep, key=_removal_order):
+        (unpacked_dir / part).unlink()
+        graph.remove(part)
+        removed.append(part)
+        part_rels = rels_name(part)
+        if part_rels in graph.parts:
+            (unpacked_dir / part_rels).unlink()
+            graph.remove(part_rels)
+            removed.append(part_rels)
+
+    for name in _dangling_rels(graph):
+        if _in_owned_rels_dir(name):
+            (unpacked_dir / name).unlink()
+            graph.remove(name)
+            removed.append(name)
 
     return removed
 
@@ -235,46 +272,35 @@ def update_content_types(unpacked_dir: Path, removed_files: list[str]) -> None:
     if not ct_path.exists():
         return
 
-    dom = defusedxml.minidom.parse(str(ct_path))
-    changed = False
+    removed = set(removed_files)
 
-    for override in list(dom.getElementsByTagName("Override")):
-        part_name = override.getAttribute("PartName").lstrip("/")
-        if part_name in removed_files:
-            if override.parentNode:
-                override.parentNode.removeChild(override)
-                changed = True
+    def keep(match: re.Match) -> str:
+        name = PART_NAME_RE.search(match.group(0))
+        return "" if name and name.group(2).lstrip("/") in removed else match.group(0)
 
-    if changed:
-        with open(ct_path, "wb") as f:
-            f.write(dom.toxml(encoding="utf-8"))
+    content = ct_path.read_text(encoding="utf-8")
+    updated = OVERRIDE_RE.sub(keep, content)
+    if updated != content:
+        ct_path.write_text(updated, encoding="utf-8")
 
 
 def clean_unused_files(unpacked_dir: Path) -> list[str]:
     all_removed = []
 
-    if list(unpacked_dir.rglob("*.rels")) and not get_referenced_files(unpacked_dir):
+    graph = PartGraph(unpacked_dir)
+    if graph.rels and not any(graph.targets.values()):
         raise RefusedToClean(
             "no relationship in this package names a part we can resolve. "
             "Refusing to treat every file as unreferenced."
         )
 
-    slides_removed = remove_orphaned_slides(unpacked_dir)
+    slides_removed = remove_orphaned_slides(unpacked_dir, graph)
     all_removed.extend(slides_removed)
 
-    trash_removed = remove_trash_directory(unpacked_dir)
+    trash_removed = remove_trash_directory(unpacked_dir, graph)
     all_removed.extend(trash_removed)
 
-    while True:
-        removed_rels = remove_orphaned_rels_files(unpacked_dir)
-        referenced = get_referenced_files(unpacked_dir)
-        removed_files = remove_orphaned_files(unpacked_dir, referenced)
-
-        total_removed = removed_rels + removed_files
-        if not total_removed:
-            break
-
-        all_removed.extend(total_removed)
+    all_removed.extend(remove_unreachable_files(unpacked_dir, graph))
 
     if all_removed:
         update_content_types(unpacked_dir, all_removed)
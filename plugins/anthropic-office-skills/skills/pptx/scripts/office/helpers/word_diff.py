@@ -0,0 +1,217 @@
+"""Character word diff of two texts, without git.
+
+word_diff() returns the changed lines as
+``git diff --word-diff=plain --word-diff-regex=. -U0`` prints them: removed text
+as [-...-], added text as {+...+}, and the unchanged text around them. Blank
+lines and the hunk headers are left out.
+
+Lines are matched first, and only runs of changed lines are compared further.
+Inside a run, words are matched before characters, and characters are only
+compared inside the words that changed. So the cost follows the size of the
+edits, not the size of the document. Git compares every character of the run,
+so an edit that can be shown in more than one equally short way may be placed
+differently.
+
+Each level strips the common prefix and suffix. It then anchors on items that
+occur exactly once on both sides (patience) and runs Myers between the anchors.
+A stretch that needs more than MAX_EDITS edits is reported as replaced whole
+rather than searched further. That keeps time and memory bounded when two texts
+have little in common.
+"""
+
+from __future__ import annotations
+
+import bisect
+import itertools
+import re
+from collections import Counter
+
+MAX_EDITS = 500
+
+_WORD_RE = re.compile(r"\w+|[^\w\n]")
+_NEWLINE_RE = re.compile("\n")
+
+
+def _myers(a, alo: int, ahi: int, b, blo: int, bhi: int) -> list[tuple[int, int]]:
+    # matched (i, j) pairs of a shortest edit script, or none past MAX_EDITS
+    n, m = ahi - alo, bhi - blo
+    max_d = min(n + m, MAX_EDITS)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace = []
+    for d in range(max_d + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                trace.append(v[offset - d : offset + d + 1])
+                return _backtrack(trace, n, m, alo, blo)
+        trace.append(v[offset - d : offset + d + 1])
+    return []
+
+
+def _backtrack(trace, x: int, y: int, alo: int, blo: int) -> list[tuple[int, int]]:
+    pairs = []
+    for d in range(len(trace) - 1, 0, -1):
+        prev = trace[d - 1]
+        k = x - y
+        if k == -d or (k != d and prev[k - 1 + d - 1] < prev[k + 1 + d - 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = prev[prev_k + d - 1]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            pairs.append((alo + x, blo + y))
+        x, y = prev_x, prev_y
+    while x > 0 and y > 0:
+        x -= 1
+        y -= 1
+        pairs.append((alo + x, blo + y))
+    pairs.reverse()
+    return pairs
+
+
+def _unique_anchors(a, alo: int, ahi: int, b, blo: int, bhi: int):
+    # the longest run of items unique on both sides that appear in the same order
+    counts_a = Counter(a[alo:ahi])
+    counts_b = Counter(b[blo:bhi])
+    where_b = {b[j]: j for j in range(blo, bhi) if counts_b[b[j]] == 1}
+    candidates = [
+        (i, where_b[a[i]])
+        for i in range(alo, ahi)
+        if counts_a[a[i]] == 1 and a[i] in where_b
+    ]
+    tails, tail_index, previous = [], [], []
+    for index, (_, j) in enumerate(candidates):
+        slot = bisect.bisect_left(tails, j)
+        if slot == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[slot] = j
+            tail_index[slot] = index
+        previous.append(tail_index[slot - 1] if slot else -1)
+    anchors = []
+    index = tail_index[-1] if tail_index else -1
+    while index >= 0:
+        anchors.append(candidates[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def _matches(a, b, patience: bool = True) -> list[tuple[int, int]]:
+    pairs = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            pairs.append((alo, blo))
+            alo += 1
+            blo += 1
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+            pairs.append((ahi, bhi))
+        if alo == ahi or blo == bhi:
+            continue
+        anchors = _unique_anchors(a, alo, ahi, b, blo, bhi) if patience else []
+        if not anchors:
+            pairs.extend(_myers(a, alo, ahi, b, blo, bhi))
+            continue
+        for i, j in anchors:
+            pairs.append((i, j))
+            stack.append((alo, i, blo, j))
+            alo, blo = i + 1, j + 1
+        stack.append((alo, ahi, blo, bhi))
+    pairs.sort()
+    return pairs
+
+
+def _changes(pairs, n: int, m: int):
+    # (i1, i2, j1, j2) for every stretch between matched items
+    i = j = 0
+    for pi, pj in [*pairs, (n, m)]:
+        if pi > i or pj > j:
+            yield i, pi, j, pj
+        i, j = pi + 1, pj + 1
+
+
+def _lines(text: str) -> list[str]:
+    # like git, a last line without a newline differs from the same line with one
+    if not text:
+        return []
+    lines = [line + "\n" for line in text.split("\n")]
+    lines[-1] = lines[-1][:-1]
+    return lines
+
+
+def _words(text: str):
+    # every character but newline is a word to git here; words group them so
+    # characters are only compared inside the words that changed
+    words = []
+    for line in text.split("\n"):
+        words.extend(_WORD_RE.findall(line))
+    starts = [0, *itertools.accumulate(map(len, words))]
+    # the character at index c sits after every newline whose key is <= c
+    newlines = [match.start() for match in _NEWLINE_RE.finditer(text)]
+    keys = [offset - count for count, offset in enumerate(newlines)]
+    return "".join(words), keys, words, starts
+
+
+def _offset(keys, index: int) -> int:
+    return index + bisect.bisect_right(keys, index)
+
+
+def _markup(text: str, begin: str, end: str) -> str:
+    return "\n".join(begin + line + end if line else "" for line in text.split("\n"))
+
+
+def _hunk(minus: str, plus: str) -> str:
+    minus_chars, minus_pos, minus_words, minus_starts = _words(minus)
+    plus_chars, plus_pos, plus_words, plus_starts = _words(plus)
+
+    changes = []
+    word_pairs = _matches(minus_words, plus_words)
+    for wi1, wi2, wj1, wj2 in _changes(word_pairs, len(minus_words), len(plus_words)):
+        ci1, ci2 = minus_starts[wi1], minus_starts[wi2]
+        cj1, cj2 = plus_starts[wj1], plus_starts[wj2]
+        char_pairs = _matches(minus_chars[ci1:ci2], plus_chars[cj1:cj2], False)
+        for i1, i2, j1, j2 in _changes(char_pairs, ci2 - ci1, cj2 - cj1):
+            changes.append((ci1 + i1, ci1 + i2, cj1 + j1, cj1 + j2))
+
+    out, current = [], 0
+    for i1, i2, j1, j2 in changes:
+        if j1 < j2:
+            plus_begin = _offset(plus_pos, j1)
+            plus_end = _offset(plus_pos, j2 - 1) + 1
+        else:
+            plus_begin = plus_end = _offset(plus_pos, j1 - 1) + 1 if j1 else 0
+        out.append(_markup(plus[current:plus_begin], "", ""))
+        if i1 < i2:
+            removed = minus[_offset(minus_pos, i1) : _offset(minus_pos, i2 - 1) + 1]
+            out.append(_markup(removed, "[-", "-]"))
+        if j1 < j2:
+            out.append(_markup(plus[plus_begin:plus_end], "{+", "+}"))
+        current = plus_end
+    out.append(_markup(plus[current:], "", ""))
+    return "".join(out)
+
+
+def word_diff(original: str, modified: str) -> str | None:
+    a, b = _lines(original), _lines(modified)
+    content = []
+    for i1, i2, j1, j2 in _changes(_matches(a, b), len(a), len(b)):
+        hunk = _hunk("".join(a[i1:i2]), "".join(b[j1:j2]))
+        content.extend(line for line in hunk.split("\n") if line.strip())
+    return "\n".join(content) if content else None
@@ -2,15 +2,24 @@
 Base validator with common validation logic for document files.
 """
 
+import copy
 import re
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import NamedTuple
 
-import defusedxml.minidom
 from functools import lru_cache
 
 import lxml.etree
 
-from helpers import safe_extract
+from helpers.package import DirectoryPackage
+
+from .baseline import BaselineCache
+from .manifest import IncrementalManifest
+from .parts import parts_for
 
 
 @lru_cache(maxsize=None)
@@ -21,6 +30,47 @@ def _load_schema(schema_path: str):
         )
     return lxml.etree.XMLSchema(xsd_doc)
 
+
+def preload_schemas():
+    schemas_dir = Path(__file__).parent.parent / "schemas"
+    for relative in sorted(set(BaseSchemaValidator.SCHEMA_MAPPINGS.values())):
+        try:
+            _load_schema(str(schemas_dir / relative))
+        except (OSError, lxml.etree.LxmlError):
+            pass
+
+
+_worker_validator = None
+
+
+def _init_worker(validator_class, package, original_file, cache_dir):
+    global _worker_validator
+    _worker_validator = validator_class(
+        package.root, original_file, package=package, cache_dir=cache_dir
+    )
+
+
+def _run_in_worker(method, args):
+    # new baseline entries go back to the parent, which saves them once
+    result = getattr(_worker_validator, method)(*args)
+    return result, _worker_validator._take_baseline_entries()
+
+
+class Relationship(NamedTuple):
+    rid: str | None
+    type: str
+    target: str | None
+    target_mode: str | None
+    line: int
+
+
+class PartIndex(NamedTuple):
+    root: str
+    ids: list
+    rel_refs: list
+    relationships: list
+
+
 class BaseSchemaValidator:
 
     IGNORED_VALIDATION_ERRORS = [
@@ -70,6 +120,9 @@ class BaseSchemaValidator:
         "drawing": "ISO-IEC29500-4_2016/dml-main.xsd",
     }
 
+    TEXT_ELEMENTS = ("t", "delText", "instrText", "delInstrText")
+    TEXT_ELEMENT_PATTERN = re.compile(rb"<(?:[\w.-]+:)?(?:t|delText|instrText|delInstrText)[\s/>]")
+
     MC_NAMESPACE = "http://schemas.openxmlformats.org/markup-compatibility/2006"
     XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
 
@@ -103,16 +156,37 @@ class BaseSchemaValidator:
         "http://www.w3.org/XML/1998/namespace",
     }
 
-    def __init__(self, unpacked_dir, original_file=None, verbose=False):
-        self.unpacked_dir = Path(unpacked_dir).resolve()
+    def __init__(
+        self,
+        unpacked_dir,
+        original_file=None,
+        verbose=False,
+        parts=None,
+        jobs=1,
+        cache_dir=None,
+        package=None,
+        incremental=False,
+        packed_file=None,
+    ):
+        self.package = package if package is not None else DirectoryPackage(unpacked_dir)
+        self.unpacked_dir = self.package.root
         self.original_file = Path(original_file) if original_file else None
         self.verbose = verbose
+        self.parts = parts_for(self.package) if parts is None else parts
+        self.jobs = jobs
+        self.cache_dir = cache_dir
+        self.incremental = incremental
+        # the packed file a temporary extraction came from, for cache keys
+        self.packed_file = Path(packed_file).resolve() if packed_file else None
+        self._baseline = None
+        self._manifest = None
+        self._indexes = {}
 
         self.schemas_dir = Path(__file__).parent.parent / "schemas"
 
-        patterns = ["*.xml", "*.rels"]
+        files = self.package.files()
         self.xml_files = [
-            f for pattern in patterns for f in self.unpacked_dir.rglob(pattern)
+            f for suffix in (".xml", ".rels") for f in files if f.name.endswith(suffix)
         ]
 
         if not self.xml_files:
@@ -126,55 +200,77 @@ class BaseSchemaValidator:
 
     def repair_whitespace_preservation(self) -> int:
         repairs = 0
+        started = time.perf_counter()
+        scanned = []
 
         for xml_file in self.xml_files:
             try:
-                content = xml_file.read_text(encoding="utf-8")
-                dom = defusedxml.minidom.parseString(content)
+                content = xml_file.read_bytes()
+                if not self.TEXT_ELEMENT_PATTERN.search(content):
+                    continue
+                scanned.append(len(content))
+                tree = self.parts.tree(xml_file)
                 pending = []  
 
-                for elem in dom.getElementsByTagName("*"):
-                    local_name = elem.tagName.rsplit(":", 1)[-1]
-                    if local_name in ("t", "delText", "instrText", "delInstrText"):
-                        text = "".join(
-                            child.data
-                            for child in elem.childNodes
-                            if child.nodeType in (child.TEXT_NODE, child.CDATA_SECTION_NODE)
-                        )
-                        ws = (" ", "\t", "\n", "\r")
-                        if text and (text.startswith(ws) or text.endswith(ws)):
-                            if elem.getAttribute("xml:space") != "preserve":
-                                elem.setAttribute("xml:space", "preserve")
-                                text_preview = repr(text[:30]) + "..." if len(text) > 30 else repr(text)
-                                pending.append(f"  Repaired: {xml_file.name}: Added xml:space='preserve' to {elem.tagName}: {text_preview}")
+                for elem in tree.iter(*(f"{{*}}{name}" for name in self.TEXT_ELEMENTS)):
+                    text = (elem.text or "") + "".join(child.tail or "" for child in elem)
+                    ws = (" ", "\t", "\n", "\r")
+                    if text and (text.startswith(ws) or text.endswith(ws)):
+                        if elem.get(f"{{{self.XML_NAMESPACE}}}space") != "preserve":
+                            elem.set(f"{{{self.XML_NAMESPACE}}}space", "preserve")
+                            local_name = lxml.etree.QName(elem).localname
+                            tag_name = f"{elem.prefix}:{local_name}" if elem.prefix else local_name
+                            text_preview = repr(text[:30]) + "..." if len(text) > 30 else repr(text)
+                            pending.append(f"  Repaired: {xml_file.name}: Added xml:space='preserve' to {tag_name}: {text_preview}")
 
                 if pending:
-                    xml_file.write_bytes(dom.toxml(encoding="UTF-8"))
+                    try:
+                        self._write_repaired_part(xml_file, tree)
+                    except OSError as e:
+                        print(f"  Could not write repairs to {xml_file.name}: {e}")
+                        continue
                     for message in pending:
                         print(message)
                     repairs += len(pending)
 
             except Exception:
-                pass
+                self.parts.invalidate(xml_file)
 
+        self._report_repair("xml:space", scanned, started)
         return repairs
 
+    def _write_repaired_part(self, xml_file, tree):
+        # The tree came from self.parts and was modified in place, so the
+        # cached entry is dropped whether or not the write succeeds.
+        docinfo = tree.docinfo
+        try:
+            tree.write(
+                str(xml_file),
+                encoding=docinfo.encoding or "UTF-8",
+                xml_declaration=True,
+                standalone=docinfo.standalone,
+            )
+        finally:
+            self.parts.invalidate(xml_file)
+
+    def _report_repair(self, name, scanned, started):
+        if not self.verbose:
+            return
+        elapsed = time.perf_counter() - started
+        megabytes = sum(scanned) / 1e6
+        rate = megabytes / elapsed if elapsed > 0 else 0.0
+        print(
+            f"Repair {name}: parsed {len(scanned)} of {len(self.xml_files)} parts "
+            f"({megabytes:.2f} MB) in {elapsed:.3f}s, {rate:.1f} MB/s"
+        )
+
     def validate_xml(self):
         errors = []
 
         for xml_file in self.xml_files:
-            try:
-                lxml.etree.parse(str(xml_file))
-            except lxml.etree.XMLSyntaxError as e:
-                errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                    f"Line {e.lineno}: {e.msg}"
-                )
-            except Exception as e:
-                errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                    f"Unexpected error: {str(e)}"
-                )
+            error = self._cached(xml_file, "xml", self._parse_error)
+            if error:
+                errors.append(f"  {xml_file.relative_to(self.unpacked_dir)}: {error}")
 
         if errors:
             print(f"FAILED - Found {len(errors)} XML violations:")
@@ -191,18 +287,9 @@ class BaseSchemaValidator:
 
         for xml_file in self.xml_files:
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                declared = set(root.nsmap.keys()) - {None}  
-
-                for attr_val in [
-                    v for k, v in root.attrib.items() if k.endswith("Ignorable")
-                ]:
-                    undeclared = set(attr_val.split()) - declared
-                    errors.extend(
-                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                        f"Namespace '{ns}' in Ignorable but not declared"
-                        for ns in undeclared
-                    )
+                errors.extend(
+                    self._cached(xml_file, "namespaces", self._namespace_errors)
+                )
             except lxml.etree.XMLSyntaxError:
                 continue
 
@@ -215,82 +302,69 @@ class BaseSchemaValidator:
             print("PASSED - All namespace prefixes properly declared")
         return True
 
+    def _parse_error(self, xml_file):
+        try:
+            self.parts.tree(xml_file)
+        except lxml.etree.XMLSyntaxError as e:
+            return f"Line {e.lineno}: {e.msg}"
+        except Exception as e:
+            return f"Unexpected error: {str(e)}"
+        return None
+
+    def _namespace_errors(self, xml_file):
+        errors = []
+        root = self.parts.root(xml_file)
+        declared = set(root.nsmap.keys()) - {None}  
+
+        for attr_val in [
+            v for k, v in root.attrib.items() if k.endswith("Ignorable")
+        ]:
+            undeclared = set(attr_val.split()) - declared
+            errors.extend(
+                f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                f"Namespace '{ns}' in Ignorable but not declared"
+                for ns in undeclared
+            )
+        return errors
+
     def validate_unique_ids(self):
         errors = []
         global_ids = {}  
 
         for xml_file in self.xml_files:
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
                 file_ids = {}  
 
-                mc_elements = root.xpath(
-                    ".//mc:AlternateContent", namespaces={"mc": self.MC_NAMESPACE}
-                )
-                for elem in mc_elements:
-                    elem.getparent().remove(elem)
-
-                for elem in root.iter():
-                    if not hasattr(elem, "tag") or callable(elem.tag):
-                        continue
-                    tag = (
-                        elem.tag.split("}")[-1].lower()
-                        if "}" in elem.tag
-                        else elem.tag.lower()
-                    )
-
-                    if tag in self.UNIQUE_ID_REQUIREMENTS:
-                        in_excluded_container = any(
-                            ancestor.tag.split("}")[-1].lower() in self.EXCLUDED_ID_CONTAINERS
-                            for ancestor in elem.iterancestors()
-                        )
-                        if in_excluded_container:
-                            continue
-
-                        attr_name, scope = self.UNIQUE_ID_REQUIREMENTS[tag]
+                for tag, attr_name, id_value, line in self._part_index(xml_file).ids:
+                    scope = self.UNIQUE_ID_REQUIREMENTS[tag][1]
+                    if scope == "global":
+                        if id_value in global_ids:
+                            prev_file, prev_line, prev_tag = global_ids[id_value]
+                            errors.append(
+                                f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                                f"Line {line}: Global ID '{id_value}' in <{tag}> "
+                                f"already used in {prev_file} at line {prev_line} in <{prev_tag}>"
+                            )
+                        else:
+                            global_ids[id_value] = (
+                                xml_file.relative_to(self.unpacked_dir),
+                                line,
+                                tag,
+                            )
+                    elif scope == "file":
+                        key = (tag, attr_name)
+                        if key not in file_ids:
+                            file_ids[key] = {}
 
-                        id_value = None
-                        for attr, value in elem.attrib.items():
-                            attr_local = (
-                                attr.split("}")[-1].lower()
-                                if "}" in attr
-                                else attr.lower()
+                        if id_value in file_ids[key]:
+                            prev_line = file_ids[key][id_value]
+                            errors.append(
+                                f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                                f"Line {line}: Duplicate {attr_name}='{id_value}' in <{tag}> "
+                                f"(first occurrence at line {prev_line})"
                             )
-                            if attr_local == attr_name:
-                                id_value = value
-                                break
-
-                        if id_value is not None:
-                            if scope == "global":
-                                if id_value in global_ids:
-                                    prev_file, prev_line, prev_tag = global_ids[
-                                        id_value
-                                    ]
-                                    errors.append(
-                                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                                        f"Line {elem.sourceline}: Global ID '{id_value}' in <{tag}> "
-                                        f"already used in {prev_file} at line {prev_line} in <{prev_tag}>"
-                                    )
-                                else:
-                                    global_ids[id_value] = (
-                                        xml_file.relative_to(self.unpacked_dir),
-                                        elem.sourceline,
-                                        tag,
-                                    )
-                            elif scope == "file":
-                                key = (tag, attr_name)
-                                if key not in file_ids:
-                                    file_ids[key] = {}
-
-                                if id_value in file_ids[key]:
-                                    prev_line = file_ids[key][id_value]
-                                    errors.append(
-                                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                                        f"Line {elem.sourceline}: Duplicate {attr_name}='{id_value}' in <{tag}> "
-                                        f"(first occurrence at line {prev_line})"
-                                    )
-                                else:
-                                    file_ids[key][id_value] = elem.sourceline
+                        else:
+                            file_ids[key][id_value] = line
 
             except (lxml.etree.XMLSyntaxError, Exception) as e:
                 errors.append(
@@ -310,7 +384,8 @@ class BaseSchemaValidator:
     def validate_file_references(self):
         errors = []
 
-        rels_files = list(self.unpacked_dir.rglob("*.rels"))
+        package_files = self.package.files()
+        rels_files = [f for f in package_files if f.name.endswith(".rels")]
 
         if not rels_files:
             if self.verbose:
@@ -318,13 +393,12 @@ class BaseSchemaValidator:
             return True
 
         all_files = []
-        for file_path in self.unpacked_dir.rglob("*"):
+        for file_path in package_files:
             if (
-                file_path.is_file()
-                and file_path.name != "[Content_Types].xml"
+                file_path.name != "[Content_Types].xml"
                 and not file_path.name.endswith(".rels")
             ):  
-                all_files.append(file_path.resolve())
+                all_files.append(self.package.resolve(file_path))
 
         all_referenced_files = set()
 
@@ -335,19 +409,16 @@ class BaseSchemaValidator:
 
         for rels_file in rels_files:
             try:
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
+                relationships = self._part_index(rels_file).relationships
 
                 rels_dir = rels_file.parent
 
                 referenced_files = set()
                 broken_refs = []
 
-                for rel in rels_root.findall(
-                    ".//ns:Relationship",
-                    namespaces={"ns": self.PACKAGE_RELATIONSHIPS_NAMESPACE},
-                ):
-                    target = rel.get("Target")
-                    if rel.get("TargetMode") == "External":
+                for rel in relationships:
+                    target = rel.target
+                    if rel.target_mode == "External":
                         continue
                     if target and not target.startswith(
                         ("http", "mailto:")
@@ -361,14 +432,14 @@ class BaseSchemaValidator:
                             target_path = base_dir / target
 
                         try:
-                            target_path = target_path.resolve()
-                            if target_path.exists() and target_path.is_file():
+                            target_path = self.package.resolve(target_path)
+                            if self.package.is_file(target_path):
                                 referenced_files.add(target_path)
                                 all_referenced_files.add(target_path)
                             else:
-                                broken_refs.append((target, rel.sourceline))
+                                broken_refs.append((target, rel.line))
                         except (OSError, ValueError):
-                            broken_refs.append((target, rel.sourceline))
+                            broken_refs.append((target, rel.line))
 
                 if broken_refs:
                     rel_path = rels_file.relative_to(self.unpacked_dir)
@@ -406,8 +477,6 @@ class BaseSchemaValidator:
             return True
 
     def validate_all_relationship_ids(self):
-        import lxml.etree
-
         errors = []
 
         for xml_file in self.xml_files:
@@ -417,23 +486,20 @@ class BaseSchemaValidator:
             rels_dir = xml_file.parent / "_rels"
             rels_file = rels_dir / f"{xml_file.name}.rels"
 
-            if not rels_file.exists():
+            if not self.package.is_file(rels_file):
                 continue
 
             try:
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
                 rid_to_type = {}
 
-                for rel in rels_root.findall(
-                    f".//{{{self.PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
-                ):
-                    rid = rel.get("Id")
-                    rel_type = rel.get("Type", "")
+                for rel in self._part_index(rels_file).relationships:
+                    rid = rel.rid
+                    rel_type = rel.type
                     if rid:
                         if rid in rid_to_type:
                             rels_rel_path = rels_file.relative_to(self.unpacked_dir)
                             errors.append(
-                                f"  {rels_rel_path}: Line {rel.sourceline}: "
+                                f"  {rels_rel_path}: Line {rel.line}: "
                                 f"Duplicate relationship ID '{rid}' (IDs must be unique)"
                             )
                         type_name = (
@@ -441,40 +507,28 @@ class BaseSchemaValidator:
                         )
                         rid_to_type[rid] = type_name
 
-                xml_root = lxml.etree.parse(str(xml_file)).getroot()
-
-                r_ns = self.OFFICE_RELATIONSHIPS_NAMESPACE
-                rid_attrs_to_check = ["id", "embed", "link"]
-                for elem in xml_root.iter():
-                    if not hasattr(elem, "tag") or callable(elem.tag):
-                        continue
-                    for attr_name in rid_attrs_to_check:
-                        rid_attr = elem.get(f"{{{r_ns}}}{attr_name}")
-                        if not rid_attr:
-                            continue
-                        xml_rel_path = xml_file.relative_to(self.unpacked_dir)
-                        elem_name = (
-                            elem.tag.split("}")[-1] if "}" in elem.tag else elem.tag
+                xml_rel_path = xml_file.relative_to(self.unpacked_dir)
+                for elem_name, attr_name, rid_attr, line in self._part_index(
+                    xml_file
+                ).rel_refs:
+                    if rid_attr not in rid_to_type:
+                        errors.append(
+                            f"  {xml_rel_path}: Line {line}: "
+                            f"<{elem_name}> r:{attr_name} references non-existent relationship '{rid_attr}' "
+                            f"(valid IDs: {', '.join(sorted(rid_to_type.keys())[:5])}{'...' if len(rid_to_type) > 5 else ''})"
                         )
-
-                        if rid_attr not in rid_to_type:
-                            errors.append(
-                                f"  {xml_rel_path}: Line {elem.sourceline}: "
-                                f"<{elem_name}> r:{attr_name} references non-existent relationship '{rid_attr}' "
-                                f"(valid IDs: {', '.join(sorted(rid_to_type.keys())[:5])}{'...' if len(rid_to_type) > 5 else ''})"
-                            )
-                        elif attr_name == "id" and self.ELEMENT_RELATIONSHIP_TYPES:
-                            expected_type = self._get_expected_relationship_type(
-                                elem_name
-                            )
-                            if expected_type:
-                                actual_type = rid_to_type[rid_attr]
-                                if expected_type not in actual_type.lower():
-                                    errors.append(
-                                        f"  {xml_rel_path}: Line {elem.sourceline}: "
-                                        f"<{elem_name}> references '{rid_attr}' which points to '{actual_type}' "
-                                        f"but should point to a '{expected_type}' relationship"
-                                    )
+                    elif attr_name == "id" and self.ELEMENT_RELATIONSHIP_TYPES:
+                        expected_type = self._get_expected_relationship_type(
+                            elem_name
+                        )
+                        if expected_type:
+                            actual_type = rid_to_type[rid_attr]
+                            if expected_type not in actual_type.lower():
+                                errors.append(
+                                    f"  {xml_rel_path}: Line {line}: "
+                                    f"<{elem_name}> references '{rid_attr}' which points to '{actual_type}' "
+                                    f"but should point to a '{expected_type}' relationship"
+                                )
 
             except Exception as e:
                 xml_rel_path = xml_file.relative_to(self.unpacked_dir)
@@ -491,6 +545,107 @@ class BaseSchemaValidator:
                 print("PASSED - All relationship ID references are valid")
             return True
 
+    def _incremental(self):
+        if self.incremental and self._manifest is None:
+            self._manifest = IncrementalManifest(self)
+        return self._manifest
+
+    def _save_manifest(self):
+        if self._manifest is not None:
+            self._manifest.save()
+
+    def _cached(self, xml_file, check, compute):
+        manifest = self._incremental()
+        if manifest is None:
+            return compute(xml_file)
+        return manifest.result(xml_file, check, lambda: compute(xml_file))
+
+    def _map_parts_cached(self, check, method, files, args_for):
+        manifest = self._incremental()
+        if manifest is None:
+            return self._map_parts(method, (args_for(f) for f in files))
+
+        missing = [f for f in files if not manifest.has(f, check)]
+        results = self._map_parts(method, (args_for(f) for f in missing))
+        for xml_file, result in zip(missing, results):
+            manifest.store(xml_file, check, result)
+        return [manifest.get(f, check) for f in files]
+
+    def _part_index(self, xml_file):
+        def build(xml_file):
+            return self.parts.derived(
+                xml_file, ("index", type(self).__name__), self._build_part_index
+            )
+
+        if self._incremental() is None:
+            return build(xml_file)
+        key = str(xml_file)
+        if key not in self._indexes:
+            root, ids, rel_refs, relationships = self._cached(xml_file, "index", build)
+            self._indexes[key] = PartIndex(
+                root,
+                [tuple(i) for i in ids],
+                [tuple(r) for r in rel_refs],
+                [Relationship(*r) for r in relationships],
+            )
+        return self._indexes[key]
+
+    def _build_part_index(self, xml_doc):
+        alternate_content = f"{{{self.MC_NAMESPACE}}}AlternateContent"
+        relationship = f"{{{self.PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
+        r_ns = self.OFFICE_RELATIONSHIPS_NAMESPACE
+        root_tag = xml_doc.getroot().tag
+        index = PartIndex(root_tag.split("}")[-1], [], [], [])
+        mc_depth = excluded_depth = 0
+
+        for event, elem in lxml.etree.iterwalk(xml_doc, events=("start", "end")):
+            if callable(elem.tag):
+                continue
+            name = elem.tag.split("}")[-1]
+            tag = name.lower()
+
+            if event == "end":
+                if elem.tag == alternate_content:
+                    mc_depth -= 1
+                if tag in self.EXCLUDED_ID_CONTAINERS:
+                    excluded_depth -= 1
+                continue
+
+            for attr_name in ("id", "embed", "link"):
+                rid = elem.get(f"{{{r_ns}}}{attr_name}")
+                if rid:
+                    index.rel_refs.append((name, attr_name, rid, elem.sourceline))
+
+            if elem.tag == relationship and elem.getparent() is not None:
+                index.relationships.append(
+                    Relationship(
+                        elem.get("Id"),
+                        elem.get("Type", ""),
+                        elem.get("Target"),
+                        elem.get("TargetMode"),
+                        elem.sourceline,
+                    )
+                )
+
+            if elem.tag == alternate_content:
+                mc_depth += 1
+
+            if (
+                tag in self.UNIQUE_ID_REQUIREMENTS
+                and not mc_depth
+                and not excluded_depth
+            ):
+                attr_name = self.UNIQUE_ID_REQUIREMENTS[tag][0]
+                for attr, value in elem.attrib.items():
+                    if attr.split("}")[-1].lower() == attr_name:
+                        index.ids.append((tag, attr_name, value, elem.sourceline))
+                        break
+
+            if tag in self.EXCLUDED_ID_CONTAINERS:
+                excluded_depth += 1
+
+        return index
+
     def _get_expected_relationship_type(self, element_name):
         elem_lower = element_name.lower()
 
@@ -518,12 +673,12 @@ class BaseSchemaValidator:
         errors = []
 
         content_types_file = self.unpacked_dir / "[Content_Types].xml"
-        if not content_types_file.exists():
+        if not self.package.is_file(content_types_file):
             print("FAILED - [Content_Types].xml file not found")
             return False
 
         try:
-            root = lxml.etree.parse(str(content_types_file)).getroot()
+            root = self.parts.root(content_types_file)
             declared_parts = set()
             declared_extensions = set()
 
@@ -563,8 +718,7 @@ class BaseSchemaValidator:
                 "emf": "image/x-emf",
             }
 
-            all_files = list(self.unpacked_dir.rglob("*"))
-            all_files = [f for f in all_files if f.is_file()]
+            all_files = self.package.files()
 
             for xml_file in self.xml_files:
                 path_str = str(xml_file.relative_to(self.unpacked_dir)).replace(
@@ -578,8 +732,7 @@ class BaseSchemaValidator:
                     continue
 
                 try:
-                    root_tag = lxml.etree.parse(str(xml_file)).getroot().tag
-                    root_name = root_tag.split("}")[-1] if "}" in root_tag else root_tag
+                    root_name = self._part_index(xml_file).root
 
                     if root_name in declarable_roots and path_str not in declared_parts:
                         errors.append(
@@ -621,8 +774,8 @@ class BaseSchemaValidator:
             return True
 
     def validate_file_against_xsd(self, xml_file, verbose=False):
-        xml_file = Path(xml_file).resolve()
-        unpacked_dir = self.unpacked_dir.resolve()
+        xml_file = self.package.resolve(xml_file)
+        unpacked_dir = self.unpacked_dir
 
         is_valid, current_errors = self._validate_single_file_xsd(
             xml_file, unpacked_dir
@@ -658,17 +811,43 @@ class BaseSchemaValidator:
                 )
             return True, set()
 
+    def _map_parts(self, method, arg_lists):
+        arg_lists = list(arg_lists)
+        if self.jobs <= 1 or len(arg_lists) < 2:
+            results = [getattr(self, method)(*args) for args in arg_lists]
+            self._save_baseline()
+            return results
+
+        workers = min(self.jobs, len(arg_lists))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(type(self), self.package, self.original_file, self.cache_dir),
+        ) as pool:
+            results = []
+            for result, entries in pool.map(
+                _run_in_worker,
+                [method] * len(arg_lists),
+                arg_lists,
+                chunksize=max(1, len(arg_lists) // (workers * 4)),
+            ):
+                results.append(result)
+                for key, errors in entries.items():
+                    self._original_baseline().put(key, errors)
+        self._save_baseline()
+        return results
+
     def validate_against_xsd(self):
         new_errors = []
         original_error_count = 0
         valid_count = 0
         skipped_count = 0
 
-        for xml_file in self.xml_files:
+        results = self._map_parts_cached(
+            "xsd", "validate_file_against_xsd", self.xml_files, lambda f: (f, False)
+        )
+        for xml_file, (is_valid, new_file_errors) in zip(self.xml_files, results):
             relative_path = str(xml_file.relative_to(self.unpacked_dir))
-            is_valid, new_file_errors = self.validate_file_against_xsd(
-                xml_file, verbose=False
-            )
 
             if is_valid is None:
                 skipped_count += 1
@@ -726,8 +905,7 @@ class BaseSchemaValidator:
         return None
 
     def _clean_ignorable_namespaces(self, xml_doc):
-        xml_string = lxml.etree.tostring(xml_doc, encoding="unicode")
-        xml_copy = lxml.etree.fromstring(xml_string)
+        xml_copy = copy.deepcopy(xml_doc.getroot())
 
         for elem in xml_copy.iter():
             attrs_to_remove = []
@@ -783,20 +961,24 @@ class BaseSchemaValidator:
         try:
             schema = _load_schema(str(schema_path))
 
-            with open(xml_file, "r") as f:
-                xml_doc = lxml.etree.parse(f)
-
-            xml_doc, _ = self._remove_template_tags_from_text_nodes(xml_doc)
-            xml_doc = self._preprocess_for_mc_ignorable(xml_doc)
-
             relative_path = xml_file.relative_to(base_path)
-            if (
-                relative_path.parts
-                and relative_path.parts[0] in self.MAIN_CONTENT_FOLDERS
-            ):
-                xml_doc = self._clean_ignorable_namespaces(xml_doc)
 
-            xml_doc = self._preprocess_for_schema(xml_doc, relative_path)
+            def prepare(xml_doc):
+                xml_doc, _ = self._remove_template_tags_from_text_nodes(xml_doc)
+                xml_doc = self._preprocess_for_mc_ignorable(xml_doc)
+                if (
+                    relative_path.parts
+                    and relative_path.parts[0] in self.MAIN_CONTENT_FOLDERS
+                ):
+                    xml_doc = self._clean_ignorable_namespaces(xml_doc)
+                return self._preprocess_for_schema(xml_doc, relative_path)
+
+            if Path(base_path) == self.unpacked_dir:
+                xml_doc = self.parts.derived(
+                    xml_file, ("schema-ready", type(self).__name__), prepare
+                )
+            else:
+                xml_doc = prepare(lxml.etree.parse(str(xml_file)))
 
             if schema.validate(xml_doc):
                 return True, set()
@@ -813,38 +995,64 @@ class BaseSchemaValidator:
         if self.original_file is None:
             return set()
 
-        import tempfile
-        import zipfile
+        xml_file = self.package.resolve(xml_file)
+        relative_path = xml_file.relative_to(self.unpacked_dir)
+        return self._original_errors(relative_path, schema_path)
 
-        xml_file = Path(xml_file).resolve()
-        unpacked_dir = self.unpacked_dir.resolve()
-        relative_path = xml_file.relative_to(unpacked_dir)
+    def _original_baseline(self):
+        if self._baseline is None:
+            self._baseline = BaselineCache(
+                self.original_file, self.schemas_dir, self.cache_dir
+            )
+        return self._baseline
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
+    def _save_baseline(self):
+        if self._baseline is not None:
+            self._baseline.save()
 
-            try:
-                with zipfile.ZipFile(self.original_file, "r") as zip_ref:
-                    safe_extract(zip_ref, temp_path)
-            except (zipfile.BadZipFile, ValueError, OSError):
-                return set()
+    def _take_baseline_entries(self) -> dict:
+        return self._baseline.take_pending() if self._baseline is not None else {}
 
-            original_xml_file = temp_path / relative_path
+    def _original_errors(self, relative_path, schema_path=None):
+        schema = (
+            Path(schema_path).relative_to(self.schemas_dir).as_posix()
+            if schema_path
+            else ""
+        )
+        key = f"{type(self).__name__}|{schema}|{relative_path.as_posix()}"
+        baseline = self._original_baseline()
+        errors = baseline.get(key)
+        if errors is not None:
+            return errors
+
+        try:
+            with zipfile.ZipFile(self.original_file, "r") as zip_ref:
+                data = zip_ref.read(relative_path.as_posix())
+        except KeyError:
+            data = None
+        except (zipfile.BadZipFile, ValueError, OSError):
+            return set()
 
-            if not original_xml_file.exists():
-                return set()
+        errors = set()
+        if data is not None:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                temp_path = Path(temp_dir)
+                original_xml_file = temp_path / relative_path
+                original_xml_file.parent.mkdir(parents=True, exist_ok=True)
+                original_xml_file.write_bytes(data)
+                _, errors = self._validate_single_file_xsd(
+                    original_xml_file, temp_path, schema_path=schema_path
+                )
+            errors = errors or set()
 
-            is_valid, errors = self._validate_single_file_xsd(
-                original_xml_file, temp_path, schema_path=schema_path
-            )
-            return errors if errors else set()
+        baseline.put(key, errors)
+        return errors
 
     def _remove_template_tags_from_text_nodes(self, xml_doc):
         warnings = []
         template_pattern = re.compile(r"\{\{[^}]*\}\}")
 
-        xml_string = lxml.etree.tostring(xml_doc, encoding="unicode")
-        xml_copy = lxml.etree.fromstring(xml_string)
+        xml_copy = copy.deepcopy(xml_doc.getroot())
 
         def process_text_content(text, content_type):
             if not text:
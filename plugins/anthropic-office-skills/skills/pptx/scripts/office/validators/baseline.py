@@ -0,0 +1,136 @@
+"""
+Persistent cache of the XSD errors an original document already has.
+
+Validating an edit against --original means subtracting the original's own
+schema errors from the edit's. Those errors depend only on the original's
+bytes, the schema set and the validator code, so they are stored on disk and
+reused by every later run against the same original. One JSON file is kept
+per (original SHA-256, fingerprint of schemas and validator sources) pair:
+
+    <cache dir>/baseline/<sha256>-<fingerprint>.json
+
+Each file maps "<validator>|<schema>|<part>" to the sorted error list that
+part produced. A part missing from the original is stored as an empty list.
+
+A file is touched whenever it is read. On every save, files of the same kind
+unused for MAX_AGE_DAYS are removed, and only the MAX_FILES most recently used
+are kept.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+
+CACHE_VERSION = 1
+MAX_FILES = 200
+MAX_AGE_DAYS = 30
+
+
+def default_cache_dir() -> Path:
+    root = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(root) / "office-validate"
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_cache_file(path: Path) -> dict:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        os.utime(path)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def prune_cache_dir(directory: Path) -> None:
+    # oldest first; a file another run is reading may go, which only costs a miss
+    try:
+        entries = []
+        for path in directory.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+    except OSError:
+        return
+    entries.sort()
+    cutoff = time.time() - MAX_AGE_DAYS * 86400
+    for index, (mtime, path) in enumerate(entries):
+        if mtime >= cutoff and index >= len(entries) - MAX_FILES:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+@lru_cache(maxsize=None)
+def code_fingerprint(schemas_dir: str) -> str:
+    digest = hashlib.sha256(str(CACHE_VERSION).encode())
+    sources = sorted(Path(schemas_dir).rglob("*.xsd"))
+    sources += sorted(Path(__file__).parent.glob("*.py"))
+    for path in sources:
+        digest.update(path.name.encode() + b"\0" + path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class BaselineCache:
+
+    def __init__(self, original_file, schemas_dir, cache_dir=None):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.path = (
+            self.cache_dir
+            / "baseline"
+            / f"{file_sha256(original_file)}-{code_fingerprint(str(schemas_dir))}.json"
+        )
+        self._entries = self._read()
+        self._pending = {}
+
+    def _read(self) -> dict:
+        return read_cache_file(self.path)
+
+    def get(self, key):
+        errors = self._entries.get(key)
+        return None if errors is None else set(errors)
+
+    def put(self, key, errors) -> None:
+        self._entries[key] = self._pending[key] = sorted(errors)
+
+    def take_pending(self) -> dict:
+        pending, self._pending = self._pending, {}
+        return pending
+
+    def save(self) -> None:
+        if not self._pending:
+            return
+        merged = {**self._read(), **self._pending}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(
+                prefix=self.path.name + ".", suffix=".tmp", dir=self.path.parent
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                    json.dump(merged, fh)
+                os.replace(tmp_name, self.path)
+            finally:
+                if os.path.exists(tmp_name):
+                    os.unlink(tmp_name)
+        except OSError:
+            return
+        self._pending = {}
+        prune_cache_dir(self.path.parent)
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
@@ -4,8 +4,17 @@ Creates a grid layout of slide thumbnails for quick visual analysis.
 Labels each thumbnail with its XML filename (e.g., slide1.xml).
 Hidden slides are shown with a placeholder pattern.
 
+Rendered slides are cached under $XDG_CACHE_HOME/pptx-thumbnails, keyed by a
+hash of each slide part and the layout, master, theme and media it depends on,
+of presentation.xml without its slide list and the parts only it reaches
+(default text styles, embedded fonts), and of the LibreOffice build.
+A repeat run renders only the slides whose key changed: they are cut into a
+reduced copy of the deck and converted alone. If a changed slide shows a slide
+number, which depends on its position, the whole deck is converted instead.
+Slides that show a date field are never cached, so they always show today's.
+
 Usage:
-    python thumbnail.py input.pptx [output_prefix] [--cols N]
+    python thumbnail.py input.pptx [output_prefix] [--cols N] [--cache-dir DIR] [--no-cache]
 
 Examples:
     python thumbnail.py presentation.pptx
@@ -16,17 +25,23 @@ Examples:
 """
 
 import argparse
+import hashlib
+import os
 import posixpath
+import re
+import shutil
 import subprocess
 import sys
 import tempfile
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import defusedxml.minidom
+import lxml.etree
 from defusedxml import ElementTree
 from office.helpers import SLIDE_REL_TYPE, opc_target
-from office.soffice import run_soffice
+from office.soffice import pool_request, run_soffice
 from PIL import Image, ImageDraw, ImageFont
 
 
@@ -39,6 +54,16 @@ GRID_PADDING = 20
 BORDER_WIDTH = 2
 FONT_SIZE_RATIO = 0.10
 LABEL_PADDING_RATIO = 0.4
+CACHE_VERSION = 1
+
+PRESENTATION_NS = "http://schemas.openxmlformats.org/presentationml/2006/main"
+DRAWING_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+SKIPPED_DEPENDENCIES = {"slide", "notesSlide", "notesMaster", "handoutMaster"}
+# masters are hashed through the slides using them; view state is never drawn
+DECK_SKIPPED_DEPENDENCIES = SKIPPED_DEPENDENCIES | {"slideMaster", "viewProps"}
+PRESENTATION = "ppt/presentation.xml"
+SAFE_PARSER = lxml.etree.XMLParser(resolve_entities=False, no_network=True)
 
 
 def main():
@@ -58,6 +83,16 @@ def main():
         default=DEFAULT_COLS,
         help=f"Number of columns (default: {DEFAULT_COLS}, max: {MAX_COLS})",
     )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Where rendered slides are kept, keyed by a hash of each slide and the "
+        "layout, master, theme and media it uses, so unchanged slides are not "
+        "rendered again (default: $XDG_CACHE_HOME/pptx-thumbnails).",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Render every slide, ignoring the cache"
+    )
 
     args = parser.parse_args()
 
@@ -77,7 +112,13 @@ def main():
 
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
-            visible_images = convert_to_images(input_path, temp_path)
+            if args.no_cache:
+                visible_images = convert_to_images(input_path, temp_path)
+            else:
+                cache_dir = Path(args.cache_dir) if args.cache_dir else default_cache_dir()
+                visible_images = render_with_cache(
+                    input_path, slide_info, temp_path, cache_dir
+                )
 
             if not visible_images and not any(s["hidden"] for s in slide_info):
                 print("Error: No slides found", file=sys.stderr)
@@ -133,7 +174,12 @@ def get_slide_info(pptx_path: Path) -> list[dict]:
             part = rid_to_part.get(sld_id.getAttribute("r:id"))
             if part is not None and part in present:
                 slides.append(
-                    {"name": posixpath.basename(part), "hidden": _is_hidden(zf, part)}
+                    {
+                        "name": posixpath.basename(part),
+                        "part": part,
+                        "rid": sld_id.getAttribute("r:id"),
+                        "hidden": _is_hidden(zf, part),
+                    }
                 )
 
         return slides
@@ -188,33 +234,237 @@ def create_hidden_placeholder(size: tuple[int, int]) -> Image.Image:
 def convert_to_images(pptx_path: Path, temp_dir: Path) -> list[Path]:
     pdf_path = temp_dir / f"{pptx_path.stem}.pdf"
 
-    result = run_soffice(
-        ["--headless", "--convert-to", "pdf", "--outdir", str(temp_dir), str(pptx_path)],
-        capture_output=True,
-        text=True,
+    pooled = pool_request(
+        {"op": "pdf", "path": str(pptx_path.absolute()), "outdir": str(temp_dir.absolute())}
     )
-    if result.returncode != 0 or not pdf_path.exists():
-        detail = (result.stderr or result.stdout or "").strip()
-        raise RuntimeError(f"PDF conversion failed: {detail}" if detail else "PDF conversion failed")
-
-    result = subprocess.run(
-        [
-            "pdftoppm",
-            "-jpeg",
-            "-r",
-            str(CONVERSION_DPI),
-            str(pdf_path),
-            str(temp_dir / "slide"),
-        ],
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0:
+    if pooled is None or "error" in pooled or not pdf_path.exists():
+        result = run_soffice(
+            ["--headless", "--convert-to", "pdf", "--outdir", str(temp_dir), str(pptx_path)],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0 or not pdf_path.exists():
+            detail = (result.stderr or result.stdout or "").strip()
+            raise RuntimeError(f"PDF conversion failed: {detail}" if detail else "PDF conversion failed")
+
+    shards = _page_shards(pdf_path)
+    procs = [
+        subprocess.Popen(
+            ["pdftoppm", "-jpeg", "-r", str(CONVERSION_DPI)]
+            + (["-f", str(first), "-l", str(last)] if first else [])
+            + [str(pdf_path), str(temp_dir / "slide")],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        for first, last in shards
+    ]
+    if any(proc.wait() != 0 for proc in procs):
         raise RuntimeError("Image conversion failed")
 
     return sorted(temp_dir.glob("slide-*.jpg"))
 
 
+def _page_shards(pdf_path: Path) -> list[tuple[int, int]]:
+    try:
+        info = subprocess.run(
+            ["pdfinfo", str(pdf_path)], capture_output=True, text=True, check=True
+        ).stdout
+        pages = int(re.search(r"^Pages:\s+(\d+)", info, re.MULTILINE).group(1))
+    except (OSError, subprocess.CalledProcessError, AttributeError, ValueError):
+        return [(0, 0)]
+    workers = min(os.cpu_count() or 1, pages)
+    if workers <= 1:
+        return [(0, 0)]
+    bounds = [pages * i // workers for i in range(workers + 1)]
+    return [(bounds[i] + 1, bounds[i + 1]) for i in range(workers)]
+
+
+def default_cache_dir() -> Path:
+    root = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(root) / "pptx-thumbnails"
+
+
+def slide_keys(pptx_path: Path, slide_info: list[dict]) -> dict[str, str]:
+    with zipfile.ZipFile(pptx_path, "r") as zf:
+        present = set(zf.namelist())
+        prefix = (
+            f"{CACHE_VERSION}:{CONVERSION_DPI}:{soffice_version()}:"
+            f"{_deck_key(zf, present)}:"
+        ).encode()
+
+        keys = {}
+        field_parts = {}
+        for position, info in enumerate(slide_info, 1):
+            digest = hashlib.sha256(prefix)
+            numbered = dated = False
+            seen = set()
+            pending = [info["part"]]
+            while pending:
+                part = pending.pop()
+                if part in seen or part not in present:
+                    continue
+                seen.add(part)
+                data = zf.read(part)
+                digest.update(part.encode() + b"\0" + data)
+                if not numbered and b'type="slidenum"' in data:
+                    if (part, "slidenum") not in field_parts:
+                        field_parts[part, "slidenum"] = _shows_field(
+                            data, part == info["part"], "slidenum"
+                        )
+                    numbered = field_parts[part, "slidenum"]
+                if not dated and b'type="datetime' in data:
+                    if (part, "datetime") not in field_parts:
+                        field_parts[part, "datetime"] = _shows_field(
+                            data, part == info["part"], "datetime"
+                        )
+                    dated = field_parts[part, "datetime"]
+                rels_data, targets = _related(zf, present, part, SKIPPED_DEPENDENCIES)
+                digest.update(rels_data)
+                pending.extend(targets)
+            info["numbered"] = numbered
+            info["dated"] = dated
+            if numbered:
+                digest.update(f"position:{position}".encode())
+            keys[info["part"]] = digest.hexdigest()
+        return keys
+
+
+def _related(
+    zf: zipfile.ZipFile, present: set[str], part: str, skipped: set[str]
+) -> tuple[bytes, list[str]]:
+    folder, name = posixpath.split(part)
+    rels = posixpath.join(folder, "_rels", name + ".rels")
+    if rels not in present:
+        return b"", []
+    rels_data = zf.read(rels)
+    targets = []
+    for rel in ElementTree.fromstring(rels_data):
+        if rel.get("Type", "").rsplit("/", 1)[-1] in skipped:
+            continue
+        try:
+            target = opc_target(rel.get("Target", ""), part, rel.get("TargetMode", ""))
+        except ValueError:
+            continue
+        if target:
+            targets.append(target)
+    return rels_data, targets
+
+
+def _deck_key(zf: zipfile.ZipFile, present: set[str]) -> str:
+    # Adding, removing or reordering slides leaves the key alone; slides that
+    # show their number add their position themselves.
+    root = lxml.etree.fromstring(zf.read(PRESENTATION), SAFE_PARSER)
+    for slide_list in root.findall(f"{{{PRESENTATION_NS}}}sldIdLst"):
+        root.remove(slide_list)
+    digest = hashlib.sha256(lxml.etree.tostring(root))
+    seen = set()
+    pending = _related(zf, present, PRESENTATION, DECK_SKIPPED_DEPENDENCIES)[1]
+    while pending:
+        part = pending.pop()
+        if part in seen or part not in present:
+            continue
+        seen.add(part)
+        digest.update(part.encode() + b"\0" + zf.read(part))
+        rels_data, targets = _related(zf, present, part, DECK_SKIPPED_DEPENDENCIES)
+        digest.update(rels_data)
+        pending.extend(targets)
+    return digest.hexdigest()
+
+
+def soffice_version() -> str:
+    # versionrc names the LibreOffice build: program/ on Linux and Windows,
+    # Contents/Resources/ on macOS. Its stamp stands in when it is missing.
+    binary = shutil.which("soffice")
+    if binary is None:
+        return ""
+    program = Path(binary).resolve().parent
+    for versionrc in (
+        program / "versionrc",
+        program / "version.ini",
+        program.parent / "Resources" / "versionrc",
+    ):
+        if versionrc.is_file():
+            return hashlib.sha256(versionrc.read_bytes()).hexdigest()[:16]
+    stat = Path(binary).resolve().stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _shows_field(data: bytes, is_slide: bool, field_type: str) -> bool:
+    # field_type matches slidenum, or every datetime1..datetime13 format.
+    if is_slide:
+        return True
+    # A layout or master slide-number or date placeholder is only drawn through
+    # the slide's own placeholder; a plain text box carrying the field is drawn as is.
+    root = ElementTree.fromstring(data)
+    for shape in root.iter(f"{{{PRESENTATION_NS}}}sp"):
+        if shape.find(f".//{{{PRESENTATION_NS}}}nvPr/{{{PRESENTATION_NS}}}ph") is not None:
+            continue
+        for field in shape.iter(f"{{{DRAWING_NS}}}fld"):
+            if field.get("type", "").startswith(field_type):
+                return True
+    return False
+
+
+def render_with_cache(
+    pptx_path: Path, slide_info: list[dict], temp_dir: Path, cache_dir: Path
+) -> list[Path]:
+    keys = slide_keys(pptx_path, slide_info)
+    visible = [info for info in slide_info if not info["hidden"]]
+    cached = {info["part"]: cache_dir / f"{keys[info['part']]}.jpg" for info in visible}
+    stale = [
+        info for info in visible if info["dated"] or not cached[info["part"]].exists()
+    ]
+    rendered = {}
+
+    if stale and len(stale) < len(visible) and not any(i["numbered"] for i in stale):
+        partial_dir = temp_dir / "partial"
+        partial_dir.mkdir()
+        partial_deck = partial_dir / pptx_path.name
+        write_partial_deck(pptx_path, {info["rid"] for info in stale}, partial_deck)
+        images = convert_to_images(partial_deck, partial_dir)
+        if len(images) == len(stale):
+            for info, image in zip(stale, images):
+                rendered[info["part"]] = image
+            stale = []
+
+    if stale:
+        images = convert_to_images(pptx_path, temp_dir)
+        if len(images) != len(visible):
+            return images
+        for info, image in zip(visible, images):
+            rendered[info["part"]] = image
+
+    for info in visible:
+        if info["part"] in rendered and not info["dated"]:
+            _store(rendered[info["part"]], cached[info["part"]])
+    return [rendered.get(info["part"], cached[info["part"]]) for info in visible]
+
+
+def write_partial_deck(pptx_path: Path, keep_rids: set[str], out_path: Path) -> None:
+    with zipfile.ZipFile(pptx_path, "r") as src, zipfile.ZipFile(out_path, "w") as dst:
+        for item in src.infolist():
+            data = src.read(item)
+            if item.filename == "ppt/presentation.xml":
+                root = lxml.etree.fromstring(data, SAFE_PARSER)
+                for sld_id in root.iter(f"{{{PRESENTATION_NS}}}sldId"):
+                    if sld_id.get(f"{{{RELATIONSHIPS_NS}}}id") not in keep_rids:
+                        sld_id.getparent().remove(sld_id)
+                data = lxml.etree.tostring(
+                    root, xml_declaration=True, encoding="UTF-8", standalone=True
+                )
+            dst.writestr(item, data)
+
+
+def _store(image: Path, target: Path) -> None:
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        shutil.copyfile(image, tmp)
+        os.replace(tmp, target)
+    except OSError:
+        pass
+
+
 def create_grids(
     slides: list[tuple[Path, str]],
     cols: int,
@@ -268,27 +518,28 @@ def create_grid(
     except Exception:
         font = ImageFont.load_default()
 
-    for i, (img_path, slide_name) in enumerate(slides):
-        row, col = i // cols, i % cols
-        x = col * width + (col + 1) * GRID_PADDING
-        y_base = (
-            row * (height + font_size + label_padding * 2) + (row + 1) * GRID_PADDING
-        )
+    with ThreadPoolExecutor() as pool:
+        tiles = pool.map(lambda slide: _load_tile(slide[0], width, height), slides)
 
-        label = slide_name
-        bbox = draw.textbbox((0, 0), label, font=font)
-        text_w = bbox[2] - bbox[0]
-        draw.text(
-            (x + (width - text_w) // 2, y_base + label_padding),
-            label,
-            fill="black",
-            font=font,
-        )
+        for i, ((_, slide_name), img) in enumerate(zip(slides, tiles)):
+            row, col = i // cols, i % cols
+            x = col * width + (col + 1) * GRID_PADDING
+            y_base = (
+                row * (height + font_size + label_padding * 2) + (row + 1) * GRID_PADDING
+            )
 
-        y_thumbnail = y_base + label_padding + font_size + label_padding
+            label = slide_name
+            bbox = draw.textbbox((0, 0), label, font=font)
+            text_w = bbox[2] - bbox[0]
+            draw.text(
+                (x + (width - text_w) // 2, y_base + label_padding),
+                label,
+                fill="black",
+                font=font,
+            )
+
+            y_thumbnail = y_base + label_padding + font_size + label_padding
 
-        with Image.open(img_path) as img:
-            img.thumbnail((width, height), Image.Resampling.LANCZOS)
             w, h = img.size
             tx = x + (width - w) // 2
             ty = y_thumbnail + (height - h) // 2
@@ -307,5 +558,11 @@ def create_grid(
     return grid
 
 
+def _load_tile(img_path: Path, width: int, height: int) -> Image.Image:
+    with Image.open(img_path) as img:
+        img.thumbnail((width, height), Image.Resampling.LANCZOS)
+        return img.copy()
+
+
 if __name__ == "__main__":
     main()
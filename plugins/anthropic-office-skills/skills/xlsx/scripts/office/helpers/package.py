@@ -0,0 +1,385 @@
+"""Access to an OOXML package, unpacked on disk or still zipped.
+
+Validators address parts by lexical paths under ``package.root``. For a
+directory that is the directory itself. For a zip it is the zip's own path, so
+``root / "word/document.xml"`` names a member. Nothing is extracted: members
+are read straight out of the archive when a check asks for them. Only repairs
+need real files, and validate.py extracts for those.
+
+Editing scripts use OfficePackage instead. It addresses parts by name
+("word/document.xml"), keeps the parts it has read, written or parsed in
+memory, and writes the package back once in save(). Several edits in a row,
+and a validator run over the result, share one in-memory copy.
+"""
+
+
+from __future__ import annotations
+
+import fnmatch
+import io
+import os
+import posixpath
+import stat
+import time
+import zipfile
+import zlib
+from pathlib import Path, PurePosixPath
+from typing import NamedTuple
+
+import defusedxml.minidom
+
+from . import atomic_zip, copy_member, opc_target
+
+CONTENT_TYPES = "[Content_Types].xml"
+
+
+def _glob_match(relative: str, pattern: str) -> bool:
+    parts = relative.split("/")
+    pattern_parts = pattern.split("/")
+    return len(parts) == len(pattern_parts) and all(
+        fnmatch.fnmatchcase(part, pat) for part, pat in zip(parts, pattern_parts)
+    )
+
+
+class DirectoryPackage:
+    def __init__(self, root):
+        self.root = Path(root).resolve()
+
+    def __reduce__(self):
+        return (type(self), (self.root,))
+
+    def files(self) -> list[Path]:
+        return [p for p in self.root.rglob("*") if p.is_file()]
+
+    def glob(self, pattern: str) -> list[Path]:
+        return list(self.root.glob(pattern))
+
+    def resolve(self, path: Path) -> Path:
+        return Path(path).resolve()
+
+    def is_file(self, path: Path) -> bool:
+        return Path(path).is_file()
+
+    def stamp(self, path: Path) -> tuple[int, int]:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def open(self, path: Path):
+        return open(path, "rb")
+
+    def read_bytes(self, path: Path) -> bytes:
+        return Path(path).read_bytes()
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ZipPackage:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.root = self.path.resolve()
+        self._zip = zipfile.ZipFile(self.path, "r")
+        self._members: dict[str, zipfile.ZipInfo] = {}
+        try:
+            for info in self._zip.infolist():
+                if stat.S_ISLNK(info.external_attr >> 16):
+                    raise ValueError(
+                        f"symlink archive entry not allowed: {info.filename!r}"
+                    )
+                name = posixpath.normpath(info.filename)
+                if name.startswith(("/", "../")) or name == "..":
+                    raise ValueError(f"unsafe archive entry: {info.filename!r}")
+                if not info.is_dir():
+                    self._members[name] = info
+        except ValueError:
+            self._zip.close()
+            raise
+
+    def __reduce__(self):
+        return (type(self), (self.path,))
+
+    def _name(self, path: Path) -> str:
+        try:
+            return PurePosixPath(Path(path).relative_to(self.root)).as_posix()
+        except ValueError:
+            return ""
+
+    def _info(self, path: Path) -> zipfile.ZipInfo:
+        info = self._members.get(self._name(path))
+        if info is None:
+            raise FileNotFoundError(f"{path}: no such part in {self.path}")
+        return info
+
+    def files(self) -> list[Path]:
+        return [self.root / name for name in self._members]
+
+    def glob(self, pattern: str) -> list[Path]:
+        return [
+            self.root / name for name in self._members if _glob_match(name, pattern)
+        ]
+
+    def resolve(self, path: Path) -> Path:
+        return Path(os.path.normpath(path))
+
+    def is_file(self, path: Path) -> bool:
+        return self._name(path) in self._members
+
+    def stamp(self, path: Path) -> tuple[int, int]:
+        info = self._info(path)
+        return (info.CRC, info.file_size)
+
+    def open(self, path: Path):
+        return self._zip.open(self._info(path))
+
+    def read_bytes(self, path: Path) -> bytes:
+        return self._zip.read(self._info(path))
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Relationship(NamedTuple):
+    id: str
+    type: str
+    target: str
+    part: str | None
+
+
+def rels_name(part: str) -> str:
+    directory, name = posixpath.split(part)
+    return posixpath.join(directory, "_rels", f"{name}.rels")
+
+
+class OfficePackage:
+    """An OOXML package being edited, held in memory until save().
+
+    Opens an unpacked directory or a packed file. Parts are read from disk or
+    the zip the first time they are asked for, parsed DOMs are cached, and
+    save() writes back only what changed: the changed files, for a directory,
+    or a new zip whose untouched members are copied still compressed.
+
+    It also answers the read interface validators use (files, glob, open, ...),
+    so a package can be validated before it is saved.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.root = self.path.resolve()
+        if self.path.is_dir():
+            self._source = DirectoryPackage(self.path)
+        else:
+            self._source = ZipPackage(self.path)
+        self._open()
+
+    def _open(self) -> None:
+        self._names = {
+            PurePosixPath(p.relative_to(self._source.root)).as_posix()
+            for p in self._source.files()
+        }
+        self._parts: dict[str, bytes] = {}
+        self._doms: dict[str, object] = {}
+        self._dirty_doms: set[str] = set()
+        self.modified: set[str] = set()
+
+    @property
+    def packed(self) -> bool:
+        return isinstance(self._source, ZipPackage)
+
+    def part_names(self) -> list[str]:
+        return sorted(self._names)
+
+    def has_part(self, name: str) -> bool:
+        return name in self._names
+
+    def find_parts(self, pattern: str) -> list[str]:
+        return [name for name in self.part_names() if _glob_match(name, pattern)]
+
+    def read_part(self, name: str) -> bytes:
+        if name in self._parts:
+            return self._parts[name]
+        if name in self._dirty_doms:
+            # serialized once per write_dom, which drops the bytes again
+            data = self._parts[name] = self._doms[name].toxml(encoding="UTF-8")
+            return data
+        if name not in self._names:
+            raise FileNotFoundError(f"{name}: no such part in {self.path}")
+        return self._source.read_bytes(self._source.root / name)
+
+    def read_text(self, name: str) -> str:
+        return self.read_part(name).decode("utf-8")
+
+    def write_part(self, name: str, data: bytes) -> None:
+        self._parts[name] = data
+        self._doms.pop(name, None)
+        self._dirty_doms.discard(name)
+        self._names.add(name)
+        self.modified.add(name)
+
+    def write_text(self, name: str, text: str) -> None:
+        self.write_part(name, text.encode("utf-8"))
+
+    def copy_part(self, source: str, dest: str) -> None:
+        self.write_part(dest, self.read_part(source))
+
+    def delete_part(self, name: str) -> None:
+        self._names.discard(name)
+        self._parts.pop(name, None)
+        self._doms.pop(name, None)
+        self._dirty_doms.discard(name)
+        self.modified.add(name)
+
+    def dom(self, name: str):
+        # The same Document is returned until the part is rewritten; after
+        # changing it in place, call write_dom(name) to keep the change.
+        if name not in self._doms:
+            self._doms[name] = defusedxml.minidom.parseString(self.read_part(name))
+        return self._doms[name]
+
+    def discard_dom(self, name: str) -> None:
+        # Drops unsaved changes made in place to the cached DOM.
+        if name not in self._dirty_doms:
+            self._doms.pop(name, None)
+
+    def write_dom(self, name: str) -> None:
+        self._parts.pop(name, None)
+        self._dirty_doms.add(name)
+        self.modified.add(name)
+
+    def relationships(self, part: str) -> list[Relationship]:
+        rels = rels_name(part)
+        if not self.has_part(rels):
+            return []
+        relationships = []
+        for rel in self.dom(rels).getElementsByTagName("Relationship"):
+            target = rel.getAttribute("Target")
+            try:
+                resolved = opc_target(target, part, rel.getAttribute("TargetMode"))
+            except ValueError:
+                resolved = None
+            relationships.append(
+                Relationship(
+                    rel.getAttribute("Id"), rel.getAttribute("Type"), target, resolved
+                )
+            )
+        return relationships
+
+    def add_relationship(self, part: str, rel_type: str, target: str) -> str:
+        dom = self.dom(rels_name(part))
+        numbers = [0]
+        for rel in dom.getElementsByTagName("Relationship"):
+            rid = rel.getAttribute("Id")
+            if rid.startswith("rId") and rid[3:].isdigit():
+                numbers.append(int(rid[3:]))
+        rid = f"rId{max(numbers) + 1}"
+        rel = dom.createElement("Relationship")
+        rel.setAttribute("Id", rid)
+        rel.setAttribute("Type", rel_type)
+        rel.setAttribute("Target", target)
+        dom.documentElement.appendChild(rel)
+        self.write_dom(rels_name(part))
+        return rid
+
+    def content_type_overrides(self) -> dict[str, str]:
+        return {
+            o.getAttribute("PartName"): o.getAttribute("ContentType")
+            for o in self.dom(CONTENT_TYPES).getElementsByTagName("Override")
+        }
+
+    def add_override(self, part_name: str, content_type: str) -> None:
+        dom = self.dom(CONTENT_TYPES)
+        override = dom.createElement("Override")
+        override.setAttribute("PartName", part_name)
+        override.setAttribute("ContentType", content_type)
+        dom.documentElement.appendChild(override)
+        self.write_dom(CONTENT_TYPES)
+
+    def save(self, out=None) -> None:
+        out = self.root if out is None else Path(out).resolve()
+        if out == self.root and not self.packed:
+            for name in sorted(self.modified):
+                path = self.root / name
+                if name in self._names:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    path.write_bytes(self.read_part(name))
+                elif path.is_file():
+                    path.unlink()
+        else:
+            names = self.part_names()
+            if CONTENT_TYPES in names:
+                names.remove(CONTENT_TYPES)
+                names.insert(0, CONTENT_TYPES)
+            with atomic_zip(out) as zf:
+                for name in names:
+                    if self.packed and name not in self.modified:
+                        copy_member(self._source._zip, self._source._members[name], zf)
+                        continue
+                    info = zipfile.ZipInfo(name, time.localtime()[:6])
+                    info.external_attr = 0o644 << 16
+                    if name == CONTENT_TYPES:
+                        info.compress_type = zipfile.ZIP_STORED
+                    else:
+                        info.compress_type = zipfile.ZIP_DEFLATED
+                    zf.writestr(info, self.read_part(name))
+        if out == self.root:
+            doms = {
+                name: self._doms[name] for name in self._doms if name in self._names
+            }
+            self._source.close()
+            self._source = type(self._source)(self.path)
+            self._open()
+            self._doms = doms
+
+    def _name(self, path: Path) -> str:
+        try:
+            return PurePosixPath(Path(path).relative_to(self.root)).as_posix()
+        except ValueError:
+            return ""
+
+    def files(self) -> list[Path]:
+        return [self.root / name for name in self.part_names()]
+
+    def glob(self, pattern: str) -> list[Path]:
+        return [self.root / name for name in self.find_parts(pattern)]
+
+    def resolve(self, path: Path) -> Path:
+        return Path(os.path.normpath(path))
+
+    def is_file(self, path: Path) -> bool:
+        return self.has_part(self._name(path))
+
+    def stamp(self, path: Path) -> tuple[int, int]:
+        name = self._name(path)
+        if name not in self.modified:
+            return self._source.stamp(self._source.root / name)
+        data = self.read_part(name)
+        return (zlib.crc32(data), len(data))
+
+    def open(self, path: Path):
+        name = self._name(path)
+        if name not in self.modified:
+            return self._source.open(self._source.root / name)
+        return io.BytesIO(self.read_part(name))
+
+    def read_bytes(self, path: Path) -> bytes:
+        return self.read_part(self._name(path))
+
+    def close(self) -> None:
+        self._source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
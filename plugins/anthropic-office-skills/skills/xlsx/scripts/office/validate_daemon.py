@@ -0,0 +1,207 @@
+"""
+Long-lived validation server that keeps the compiled XSD schemas warm.
+
+Compiling the ISO-IEC29500 schema set (wml.xsd, pml.xsd, dml-main.xsd and
+their imports) takes longer than validating a typical document. lxml cannot
+write a compiled XMLSchema to disk, so instead this server compiles every
+schema once and then forks a child per request. The child inherits the warm
+schemas, runs validate.py's main() on the client's arguments and sends back
+what it printed and its exit code.
+
+Usage:
+    python validate_daemon.py [--socket PATH]     # serve until interrupted
+    python validate_daemon.py --stop [--socket PATH]
+
+validate.py connects to the socket on its own whenever it exists, and
+validates in-process when no server answers. The server exits by itself,
+telling the client to fall back, once the validator sources or schemas on
+disk change. The docx, pptx and xlsx skills each ship a copy of this
+directory; every copy gets its own socket, and a server only serves requests
+from its own copy.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+from pathlib import Path
+
+SOCKET_ENV = "OFFICE_VALIDATE_SOCKET"
+OFFICE_DIR = Path(__file__).resolve().parent
+
+
+def socket_path() -> Path:
+    if os.environ.get(SOCKET_ENV):
+        return Path(os.environ[SOCKET_ENV])
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    # the docx, pptx and xlsx skills each ship a copy of this directory
+    copy = hashlib.sha256(str(OFFICE_DIR).encode()).hexdigest()[:12]
+    return Path(runtime_dir) / f"office-validate-{os.getuid()}-{copy}.sock"
+
+
+def _sources_stamp() -> list:
+    sources = [OFFICE_DIR / "validate.py", OFFICE_DIR / "validate_daemon.py"]
+    for pattern in ("validators/*.py", "helpers/*.py", "schemas/**/*.xsd"):
+        sources += OFFICE_DIR.glob(pattern)
+    stamp = []
+    for path in sorted(sources):
+        st = os.stat(path)
+        stamp.append([str(path), st.st_mtime_ns, st.st_size])
+    return stamp
+
+
+def run_in_daemon(argv) -> int | None:
+    path = socket_path()
+    try:
+        if path.lstat().st_uid != os.getuid():
+            return None
+    except OSError:
+        return None
+    request = {
+        "argv": list(argv),
+        "cwd": os.getcwd(),
+        "env": dict(os.environ),
+        "office_dir": str(OFFICE_DIR),
+    }
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(path))
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            with sock.makefile("rb") as fh:
+                reply = json.loads(fh.readline() or b"null")
+    except (OSError, ValueError):
+        return None
+    if not isinstance(reply, dict) or "exit_code" not in reply:
+        return None
+    sys.stdout.write(reply["stdout"])
+    sys.stdout.flush()
+    sys.stderr.write(reply["stderr"])
+    sys.stderr.flush()
+    return reply["exit_code"]
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+        if request.get("stop"):
+            self._reply({"stopped": True})
+            os.kill(self.server.pid, signal.SIGTERM)
+            return
+        if request.get("office_dir") != str(OFFICE_DIR):
+            self._reply({"error": f"server runs the validator in {OFFICE_DIR}"})
+            return
+        if _sources_stamp() != self.server.sources:
+            self._reply({"error": "validator sources changed, server stopped"})
+            os.kill(self.server.pid, signal.SIGTERM)
+            return
+
+        import validate
+
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                validate.main(request["argv"], use_daemon=False)
+                exit_code = 0
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else 1
+            except Exception as e:
+                print(f"Error: {type(e).__name__}: {e}", file=sys.stderr)
+                exit_code = 2
+        self._reply(
+            {
+                "stdout": stdout.getvalue(),
+                "stderr": stderr.getvalue(),
+                "exit_code": exit_code,
+            }
+        )
+
+    def _reply(self, reply):
+        self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+
+class ValidationServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    def __init__(self, path):
+        self.path = Path(path)
+        self.pid = os.getpid()
+        self.sources = _sources_stamp()
+        with contextlib.suppress(FileNotFoundError):
+            self.path.unlink()
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(str(self.path), _Handler)
+        finally:
+            os.umask(old_umask)
+
+    def server_close(self):
+        super().server_close()
+        if os.getpid() == self.pid:
+            with contextlib.suppress(FileNotFoundError):
+                self.path.unlink()
+
+
+def serve(path) -> None:
+    from validators.base import preload_schemas
+
+    preload_schemas()
+    with ValidationServer(path) as server:
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        print(f"Validation server listening on {path}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def stop(path) -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(path))
+            sock.sendall(b'{"stop": true}\n')
+            sock.shutdown(socket.SHUT_WR)
+            sock.recv(1)
+    except OSError:
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve validate.py requests with the XSD schemas kept compiled"
+    )
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help=f"Unix socket to listen on. Defaults to ${SOCKET_ENV}, else "
+        "office-validate-<uid>-<hash of this directory>.sock in $XDG_RUNTIME_DIR "
+        "or the temp directory.",
+    )
+    parser.add_argument(
+        "--stop", action="store_true", help="Stop the server listening on the socket"
+    )
+    args = parser.parse_args()
+    path = Path(args.socket) if args.socket else socket_path()
+
+    if args.stop:
+        if not stop(path):
+            print(f"No validation server is listening on {path}", file=sys.stderr)
+            sys.exit(1)
+        return
+    serve(path)
+
+
+if __name__ == "__main__":
+    main()
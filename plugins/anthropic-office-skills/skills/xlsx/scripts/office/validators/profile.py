@@ -0,0 +1,138 @@
+"""
+Timing report for validate.py --profile.
+
+A Profiler is attached to each validator before it runs. It wraps validate(),
+repair() and every validate_* method, plus the original-baseline lookup, and adds up
+the wall time and calls of each. Times are inclusive: a check that calls
+another check counts the inner one's time too. The parsed-part cache reports
+every parse and the XSD step reports every part it validates, so the report
+also lists parse and XSD seconds per part, slowest first. Parts of the
+original document validated for the baseline are marked "(original)".
+"""
+
+import functools
+import json
+import time
+from pathlib import Path
+
+TABLE_PART_ROWS = 25
+
+
+class Profiler:
+
+    WRAPPED = ("validate", "repair", "_original_errors")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.checks = {}
+        self.parts = {}
+        self.roots = []
+
+    def attach(self, validator):
+        self.roots.append(Path(validator.unpacked_dir))
+        cls = type(validator).__name__
+        for name in dir(type(validator)):
+            if name in self.WRAPPED or name.startswith("validate_"):
+                method = getattr(validator, name)
+                if callable(method):
+                    setattr(validator, name, self._timed(f"{cls}.{name}", method))
+        if hasattr(validator, "_validate_single_file_xsd"):
+            validator._validate_single_file_xsd = self._timed_xsd(
+                validator, validator._validate_single_file_xsd
+            )
+        if hasattr(validator, "parts"):
+            validator.parts.profiler = self
+
+    def run(self, name, function, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self.add_check(name, time.perf_counter() - started)
+
+    def add_check(self, name, seconds):
+        calls, total = self.checks.get(name, (0, 0.0))
+        self.checks[name] = (calls + 1, total + seconds)
+
+    def add_part(self, path, kind, seconds):
+        times = self.parts.setdefault(self.part_name(path), {"parse": 0.0, "xsd": 0.0})
+        times[kind] += seconds
+
+    def part_name(self, path):
+        path = Path(path)
+        for root in self.roots:
+            try:
+                return path.relative_to(root).as_posix()
+            except ValueError:
+                continue
+        return str(path)
+
+    def _timed(self, name, method):
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            return self.run(name, method, *args, **kwargs)
+
+        return timed
+
+    def _timed_xsd(self, validator, method):
+        @functools.wraps(method)
+        def timed(xml_file, base_path, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(xml_file, base_path, *args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - started
+                if Path(base_path) == Path(validator.unpacked_dir):
+                    self.add_part(xml_file, "xsd", seconds)
+                else:
+                    relative = Path(xml_file).relative_to(base_path).as_posix()
+                    self.add_part(f"{relative} (original)", "xsd", seconds)
+
+        return timed
+
+    def report(self, fmt="table") -> str:
+        total = time.perf_counter() - self.started
+        checks = sorted(self.checks.items(), key=lambda item: -item[1][1])
+        parts = sorted(
+            self.parts.items(), key=lambda item: -(item[1]["parse"] + item[1]["xsd"])
+        )
+        if fmt == "json":
+            return json.dumps(
+                {
+                    "total_seconds": round(total, 6),
+                    "checks": [
+                        {"check": name, "calls": calls, "seconds": round(seconds, 6)}
+                        for name, (calls, seconds) in checks
+                    ],
+                    "parts": [
+                        {
+                            "part": name,
+                            "parse_seconds": round(times["parse"], 6),
+                            "xsd_seconds": round(times["xsd"], 6),
+                        }
+                        for name, times in parts
+                    ],
+                },
+                indent=2,
+            )
+
+        lines = [f"Profile: {total:.3f}s total", "Checks (inclusive, slowest first):"]
+        for name, (calls, seconds) in checks:
+            lines.append(f"  {seconds:9.3f}s  {calls:5d}x  {name}")
+        if parts:
+            lines.append("Parts (slowest first):")
+            lines.append(f"  {'parse':>9}   {'xsd':>9}   part")
+            for name, times in parts[:TABLE_PART_ROWS]:
+                lines.append(
+                    f"  {times['parse']:9.3f}s  {times['xsd']:9.3f}s  {name}"
+                )
+            if len(parts) > TABLE_PART_ROWS:
+                lines.append(
+                    f"  ... {len(parts) - TABLE_PART_ROWS} more part(s), "
+                    "see --profile json"
+                )
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
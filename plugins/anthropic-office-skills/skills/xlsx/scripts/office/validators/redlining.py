@@ -11,21 +11,21 @@ Only the document body is compared. Headers, footers, footnotes and endnotes
 are separate parts and are not checked.
 """
 
-import subprocess
-import tempfile
-import zipfile
 from pathlib import Path
 
 import defusedxml.ElementTree as ET
 from defusedxml.common import DefusedXmlException
 
-from helpers import rendered_text, safe_extract
+from helpers import rendered_text
+from helpers.package import DirectoryPackage, ZipPackage
+from helpers.word_diff import word_diff
 
 
 class RedliningValidator:
 
-    def __init__(self, unpacked_dir, original_docx, verbose=False):
-        self.unpacked_dir = Path(unpacked_dir)
+    def __init__(self, unpacked_dir, original_docx, verbose=False, package=None):
+        self.package = package if package is not None else DirectoryPackage(unpacked_dir)
+        self.unpacked_dir = self.package.root
         self.original_docx = Path(original_docx)
         self.verbose = verbose
         self.namespaces = {
@@ -37,32 +37,29 @@ class RedliningValidator:
 
     def validate(self):
         modified_file = self.unpacked_dir / "word" / "document.xml"
-        if not modified_file.exists():
+        if not self.package.is_file(modified_file):
             print(f"FAILED - Modified document.xml not found at {modified_file}")
             return False
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            try:
-                with zipfile.ZipFile(self.original_docx, "r") as zip_ref:
-                    safe_extract(zip_ref, temp_path)
-            except Exception as e:
-                print(f"FAILED - Error unpacking original docx: {e}")
-                return False
+        try:
+            original = ZipPackage(self.original_docx)
+        except Exception as e:
+            print(f"FAILED - Error unpacking original docx: {e}")
+            return False
 
-            original_file = temp_path / "word" / "document.xml"
-            if not original_file.exists():
+        with original:
+            original_file = original.root / "word" / "document.xml"
+            if not original.is_file(original_file):
                 print(
                     f"FAILED - Original document.xml not found in {self.original_docx}"
                 )
                 return False
 
             try:
-                modified_tree = ET.parse(modified_file)
-                modified_root = modified_tree.getroot()
-                original_tree = ET.parse(original_file)
-                original_root = original_tree.getroot()
+                with self.package.open(modified_file) as fh:
+                    modified_root = ET.parse(fh).getroot()
+                with original.open(original_file) as fh:
+                    original_root = ET.parse(fh).getroot()
             except (ET.ParseError, DefusedXmlException) as e:
                 print(f"FAILED - Error parsing XML files: {e}")
                 return False
@@ -87,63 +84,57 @@ class RedliningValidator:
                 )
             return True
 
-    def _tracked_change_elements(self, root):
-        ins_tag = f"{{{self.namespaces['w']}}}ins"
-        del_tag = f"{{{self.namespaces['w']}}}del"
-        return [elem for elem in root.iter() if elem.tag in (ins_tag, del_tag)]
-
     def _rendered_text(self, elem):
         preserve = elem.get("{http://www.w3.org/XML/1998/namespace}space") == "preserve"
         return rendered_text(elem.text or "", preserve)
 
-    def _text_elements(self, elem):
-        w = self.namespaces["w"]
-        return [
-            node
-            for node in elem.iter()
-            if node.tag in (f"{{{w}}}t", f"{{{w}}}delText")
-        ]
-
-    def _tracked_change_key(self, elem):
+    def _tracked_change_keys(self, root):
+        # (tag, author, date, text) for every <w:ins>/<w:del>, in document order
         w = self.namespaces["w"]
-        text = "".join(self._rendered_text(node) for node in self._text_elements(elem))
-        return (elem.tag, elem.get(f"{{{w}}}author"), elem.get(f"{{{w}}}date"), text)
+        change_tags = (f"{{{w}}}ins", f"{{{w}}}del")
+        text_tags = (f"{{{w}}}t", f"{{{w}}}delText")
+        keys = {}
+        for elem in root.iter():
+            if elem.tag in change_tags:
+                nodes = [node for node in elem.iter() if node.tag in text_tags]
+                text = "".join([self._rendered_text(node) for node in nodes])
+                keys[elem] = (
+                    elem.tag,
+                    elem.get(f"{{{w}}}author"),
+                    elem.get(f"{{{w}}}date"),
+                    text,
+                )
+        return keys
 
     def _new_tracked_changes(self, original_root, modified_root):
-        original = self._tracked_change_elements(original_root)
-        modified = self._tracked_change_elements(modified_root)
+        original = self._tracked_change_keys(original_root)
+        modified = self._tracked_change_keys(modified_root)
 
         pool = {}
-        for elem in original:
-            pool.setdefault(self._tracked_change_key(elem), []).append(elem)
+        for elem, key in original.items():
+            pool.setdefault(key, []).append(elem)
 
         matched, leftover = set(), []
-        for elem in modified:
-            bucket = pool.get(self._tracked_change_key(elem))
+        for elem, key in modified.items():
+            bucket = pool.get(key)
             if bucket:
                 matched.add(bucket.pop())
             else:
                 leftover.append(elem)
 
-        def group(elem):
-            return self._tracked_change_key(elem)[:3]
-
-        def text_of(elems):
-            return "".join(self._tracked_change_key(e)[3] for e in elems)
-
         unmatched_original = {}
-        for elem in original:
+        for elem, key in original.items():
             if elem not in matched:
-                unmatched_original.setdefault(group(elem), []).append(elem)
+                unmatched_original.setdefault(key[:3], []).append(key[3])
 
         by_group = {}
         for elem in leftover:
-            by_group.setdefault(group(elem), []).append(elem)
+            by_group.setdefault(modified[elem][:3], []).append(elem)
 
         new = set()
         for key, elems in by_group.items():
-            rebuilt = text_of(elems)
-            if rebuilt and rebuilt == text_of(unmatched_original.get(key, [])):
+            rebuilt = "".join(modified[elem][3] for elem in elems)
+            if rebuilt and rebuilt == "".join(unmatched_original.get(key, [])):
                 continue  
             new.update(elems)
         return new
@@ -170,85 +161,14 @@ class RedliningValidator:
             "",
         ]
 
-        git_diff = self._get_git_word_diff(original_text, modified_text)
-        if git_diff:
-            error_parts.extend(["Differences:", "============", git_diff])
+        diff = word_diff(original_text, modified_text)
+        if diff:
+            error_parts.extend(["Differences:", "============", diff])
         else:
-            error_parts.append("Unable to generate word diff (git not available)")
+            error_parts.append("Unable to generate word diff (only whitespace differs)")
 
         return "\n".join(error_parts)
 
-    def _get_git_word_diff(self, original_text, modified_text):
-        try:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_path = Path(temp_dir)
-
-                original_file = temp_path / "original.txt"
-                modified_file = temp_path / "modified.txt"
-
-                original_file.write_text(original_text, encoding="utf-8")
-                modified_file.write_text(modified_text, encoding="utf-8")
-
-                result = subprocess.run(
-                    [
-                        "git",
-                        "diff",
-                        "--word-diff=plain",
-                        "--word-diff-regex=.",  
-                        "-U0",  
-                        "--no-index",
-                        str(original_file),
-                        str(modified_file),
-                    ],
-                    capture_output=True,
-                    text=True,
-                )
-
-                if result.stdout.strip():
-                    lines = result.stdout.split("\n")
-                    content_lines = []
-                    in_content = False
-                    for line in lines:
-                        if line.startswith("@@"):
-                            in_content = True
-                            continue
-                        if in_content and line.strip():
-                            content_lines.append(line)
-
-                    if content_lines:
-                        return "\n".join(content_lines)
-
-                result = subprocess.run(
-                    [
-                        "git",
-                        "diff",
-                        "--word-diff=plain",
-                        "-U0",  
-                        "--no-index",
-                        str(original_file),
-                        str(modified_file),
-                    ],
-                    capture_output=True,
-                    text=True,
-                )
-
-                if result.stdout.strip():
-                    lines = result.stdout.split("\n")
-                    content_lines = []
-                    in_content = False
-                    for line in lines:
-                        if line.startswith("@@"):
-                            in_content = True
-                            continue
-                        if in_content and line.strip():
-                            content_lines.append(line)
-                    return "\n".join(content_lines)
-
-        except (subprocess.CalledProcessError, FileNotFoundError, Exception):
-            pass
-
-        return None
-
     def _remove_tracked_changes(self, root, targets):
         ins_tag = f"{{{self.namespaces['w']}}}ins"
         del_tag = f"{{{self.namespaces['w']}}}del"
@@ -3,22 +3,24 @@ Excel Formula Recalculation Script
 Recalculates all formulas in an Excel file using LibreOffice
 """
 
-import contextlib
 import json
 import os
 import platform
+import posixpath
 import re
 import shutil
 import subprocess
 import sys
 import tempfile
 import time
+import xml.etree.ElementTree as ET
 import zipfile
 from pathlib import Path
 
-from office.soffice import get_soffice_env, run_soffice
+from office.helpers import opc_target
+from office.soffice import copy_seed_profile, get_soffice_env, pool_request, run_soffice
 
-from openpyxl import load_workbook
+from openpyxl.utils import column_index_from_string, get_column_letter
 
 MACRO_FILENAME = "Module1.xba"
 SOFFICE_MISSING = "soffice not found on PATH; LibreOffice is required to recalculate"
@@ -35,6 +37,28 @@ RECALCULATE_MACRO = """<?xml version="1.0" encoding="UTF-8"?>
       ThisComponent.store()
       ThisComponent.close(True)
     End Sub
+
+    Sub RecalculateList()
+      Dim props(0) As New com.sun.star.beans.PropertyValue
+      props(0).Name = "Hidden"
+      props(0).Value = True
+      listFile = FreeFile
+      Open Environ("RECALC_LIST") For Input As #listFile
+      Do While Not EOF(listFile)
+        Line Input #listFile, url
+        On Error Resume Next
+        doc = Nothing
+        doc = StarDesktop.loadComponentFromURL(url, "_blank", 0, props())
+        If Not IsNull(doc) Then
+          doc.calculateAll()
+          doc.store()
+          doc.close(True)
+        End If
+        On Error Goto 0
+      Loop
+      Close #listFile
+      StarDesktop.terminate()
+    End Sub
 </script:module>"""
 
 
@@ -56,11 +80,12 @@ def _stamp(path):
 def setup_libreoffice_macro(profile_dir: Path, timeout=30):
     url = profile_dir.as_uri()
     try:
-        run_soffice(
-            ["--headless", "--terminate_after_init", f"-env:UserInstallation={url}"],
-            capture_output=True,
-            timeout=timeout,
-        )
+        if not copy_seed_profile(profile_dir):
+            run_soffice(
+                ["--headless", "--terminate_after_init", f"-env:UserInstallation={url}"],
+                capture_output=True,
+                timeout=timeout,
+            )
     except FileNotFoundError:
         return None, SOFFICE_MISSING
     except subprocess.TimeoutExpired:
@@ -80,23 +105,21 @@ def setup_libreoffice_macro(profile_dir: Path, timeout=30):
 
 def external_links_at_risk(filename):
     try:
-        with zipfile.ZipFile(filename) as archive:
-            names = archive.namelist()
+        archive = zipfile.ZipFile(filename)
     except (zipfile.BadZipFile, OSError):
         return []
-    if not any(n.startswith("xl/externalLinks/") for n in names):
-        return []
-
-    with contextlib.ExitStack() as stack:
-        formulas = load_workbook(filename, data_only=False)
-        stack.callback(formulas.close)
-        values = load_workbook(filename, data_only=True)
-        stack.callback(values.close)
+    with archive:
+        if not any(n.startswith("xl/externalLinks/") for n in archive.namelist()):
+            return []
 
+        workbook, sheets = _worksheet_parts(archive)
         external_names = [
-            name
-            for name, dn in formulas.defined_names.items()
-            if isinstance(getattr(dn, "value", None), str) and EXTERNAL_REF_RE.search(dn.value)
+            elem.get("name")
+            for elem in ET.fromstring(archive.read(workbook)).iter()
+            if _local(elem.tag) == "definedName"
+            and elem.get("localSheetId") is None
+            and elem.text
+            and EXTERNAL_REF_RE.search(elem.text)
         ]
         name_re = (
             re.compile(r"\b(" + "|".join(re.escape(n) for n in external_names) + r")\b")
@@ -105,23 +128,33 @@ def external_links_at_risk(filename):
         )
 
         at_risk = []
-        for sheet in formulas.sheetnames:
-            ws = formulas[sheet]
-            if not hasattr(ws, "iter_rows"):  
-                continue
-            cached = values[sheet]
-            for row in ws.iter_rows():
-                for cell in row:
-                    v = cell.value
-                    if not (isinstance(v, str) and v.startswith("=")):
-                        continue
-                    reaches_out = EXTERNAL_REF_RE.search(v) or (name_re and name_re.search(v))
-                    if reaches_out and cached[cell.coordinate].value is None:
-                        at_risk.append(f"{sheet}!{cell.coordinate}")
+        for sheet, part in sheets:
+            shared = {}
+            for ref, cell in _iter_cells(archive, part):
+                formula = value = None
+                for child in cell:
+                    child_tag = _local(child.tag)
+                    if child_tag == "f":
+                        formula = child
+                    elif child_tag in ("v", "is"):
+                        value = child
+                if formula is None or formula.get("t") in ("array", "dataTable"):
+                    continue
+                if formula.text:
+                    v = "=" + formula.text
+                    reaches_out = bool(EXTERNAL_REF_RE.search(v) or (name_re and name_re.search(v)))
+                    if formula.get("t") == "shared":
+                        shared[formula.get("si")] = reaches_out
+                elif formula.get("t") == "shared":
+                    reaches_out = shared.get(formula.get("si"), False)
+                else:
+                    continue
+                if reaches_out and (value is None or (value.text is None and len(value) == 0)):
+                    at_risk.append(f"{sheet}!{ref}")
         return at_risk
 
 
-def recalc(filename, timeout=30, force=False):
+def _precheck(filename, force):
     if not Path(filename).exists():
         return {"error": f"File {filename} does not exist"}
 
@@ -154,6 +187,24 @@ def recalc(filename, timeout=30, force=False):
                 "external_link_cells": shown,
                 "external_link_cells_truncated": max(0, len(at_risk) - len(shown)),
             }
+    return None
+
+
+def recalc(filename, timeout=30, force=False):
+    error = _precheck(filename, force)
+    if error:
+        return error
+
+    abs_path = str(Path(filename).absolute())
+
+    before = _stamp(abs_path)
+    pooled = pool_request({"op": "recalc", "path": abs_path}, timeout=timeout)
+    if pooled is not None and pooled.get("timed_out"):
+        return {
+            "error": f"LibreOffice timed out after {timeout}s; formulas were NOT recalculated. Re-run with a longer timeout."
+        }
+    if pooled is not None and "error" not in pooled and _stamp(abs_path) != before:
+        return _formula_report(filename)
 
     with tempfile.TemporaryDirectory(
         prefix="recalc-lo-profile-", ignore_cleanup_errors=True
@@ -211,35 +262,179 @@ def _recalc_with_profile(filename, abs_path, timeout, profile_dir: Path):
             )
         }
 
+    return _formula_report(filename)
+
+
+def recalc_many(filenames, timeout=30, force=False):
+    results = {}
+    pending = []
+    for filename in dict.fromkeys(filenames):
+        error = _precheck(filename, force)
+        if error:
+            results[filename] = error
+        else:
+            pending.append(filename)
+
+    if pending:
+        with tempfile.TemporaryDirectory(
+            prefix="recalc-lo-profile-", ignore_cleanup_errors=True
+        ) as profile_dir:
+            results.update(_recalc_batch_with_profile(pending, timeout, Path(profile_dir)))
+
+    return {filename: results[filename] for filename in dict.fromkeys(filenames)}
+
+
+def _recalc_batch_with_profile(filenames, timeout, profile_dir: Path):
+    started = time.monotonic()
+    profile_url, err = setup_libreoffice_macro(profile_dir, timeout=timeout)
+    if err:
+        return {filename: {"error": err} for filename in filenames}
+
+    timeout = max(5, int(timeout * len(filenames) - (time.monotonic() - started)))
+
+    paths = {filename: Path(filename).absolute() for filename in filenames}
+    before = {filename: _stamp(path) for filename, path in paths.items()}
+    list_file = profile_dir / "recalc-list.txt"
+    list_file.write_text("".join(path.as_uri() + "\n" for path in paths.values()))
+
+    cmd = [
+        "soffice",
+        "--headless",
+        "--norestore",
+        f"-env:UserInstallation={profile_url}",
+        "vnd.sun.star.script:Standard.Module1.RecalculateList?language=Basic&location=application",
+    ]
+
+    if platform.system() == "Linux" and shutil.which("timeout"):
+        cmd = ["timeout", str(timeout)] + cmd
+    elif platform.system() == "Darwin" and has_gtimeout():
+        cmd = ["gtimeout", str(timeout)] + cmd
+
+    not_done = (
+        "LibreOffice exited cleanly but never rewrote the file, so nothing was "
+        "recalculated. Check that the file opens in LibreOffice, then retry."
+    )
     try:
-        wb = load_workbook(filename, data_only=True)
-
-        excel_errors = [
-            "#VALUE!",
-            "#DIV/0!",
-            "#REF!",
-            "#NAME?",
-            "#NULL!",
-            "#NUM!",
-            "#N/A",
-        ]
-        error_details = {err: [] for err in excel_errors}
-        total_errors = 0
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            env={**get_soffice_env(), "RECALC_LIST": str(list_file)},
+            timeout=timeout + 15,
+        )
+        if result.returncode == 124:
+            not_done = f"LibreOffice timed out after {timeout}s for the whole batch; formulas were NOT recalculated. Re-run with a longer timeout."
+        elif result.returncode != 0:
+            detail = (result.stderr or "").strip() or f"soffice exited {result.returncode}"
+            not_done = f"LibreOffice failed to recalculate: {detail}"
+    except subprocess.TimeoutExpired:
+        not_done = f"LibreOffice timed out after {timeout}s for the whole batch; formulas were NOT recalculated. Re-run with a longer timeout."
+    except FileNotFoundError:
+        not_done = SOFFICE_MISSING
+
+    return {
+        filename: (
+            _formula_report(filename)
+            if _stamp(paths[filename]) != before[filename]
+            else {"error": not_done}
+        )
+        for filename in filenames
+    }
 
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            if not hasattr(ws, "iter_rows"):  
+
+EXCEL_ERRORS = ["#VALUE!", "#DIV/0!", "#REF!", "#NAME?", "#NULL!", "#NUM!", "#N/A"]
+
+CELL_REF_RE = re.compile(r"([A-Z]+)(\d+)")
+
+
+def _local(tag):
+    return tag.rpartition("}")[2]
+
+
+def _relationships(archive, rels_name, source_part):
+    try:
+        root = ET.fromstring(archive.read(rels_name))
+    except KeyError:
+        return {}
+    return {
+        rel.get("Id"): (
+            rel.get("Type", ""),
+            opc_target(rel.get("Target", ""), source_part, rel.get("TargetMode", "")),
+        )
+        for rel in root
+        if _local(rel.tag) == "Relationship"
+    }
+
+
+def _worksheet_parts(archive):
+    package_rels = _relationships(archive, "_rels/.rels", "")
+    workbook = next(
+        (target for kind, target in package_rels.values() if kind.endswith("/officeDocument")),
+        "xl/workbook.xml",
+    )
+    folder, name = posixpath.split(workbook)
+    rels = _relationships(archive, posixpath.join(folder, "_rels", name + ".rels"), workbook)
+    sheets = []
+    for elem in ET.fromstring(archive.read(workbook)).iter():
+        if _local(elem.tag) != "sheet":
+            continue
+        rid = next((v for k, v in elem.attrib.items() if _local(k) == "id"), None)
+        kind, target = rels.get(rid, ("", None))
+        if kind.endswith("/worksheet") and target:
+            sheets.append((elem.get("name"), target))
+    return workbook, sheets
+
+
+def _iter_cells(archive, part):
+    row_number = 0
+    column = 0
+    with archive.open(part) as fh:
+        for event, elem in ET.iterparse(fh, events=("start", "end")):
+            tag = _local(elem.tag)
+            if event == "start":
+                if tag == "row":
+                    row_number = int(elem.get("r") or row_number + 1)
+                    column = 0
                 continue
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.value is not None and isinstance(cell.value, str):
-                        for err in excel_errors:
-                            if err in cell.value:
-                                location = f"{sheet_name}!{cell.coordinate}"
-                                error_details[err].append(location)
-                                total_errors += 1
-                                break
+            if tag == "c":
+                ref = elem.get("r")
+                match = CELL_REF_RE.fullmatch(ref or "")
+                if match:
+                    column = column_index_from_string(match.group(1))
+                else:
+                    column += 1
+                    ref = f"{get_column_letter(column)}{row_number}"
+                yield ref, elem
+                elem.clear()
+            elif tag == "row":
+                elem.clear()
+
+
+def _scan_worksheet(archive, part, sheet_name, error_details):
+    formulas = 0
+    for ref, cell in _iter_cells(archive, part):
+        value = None
+        for child in cell:
+            child_tag = _local(child.tag)
+            if child_tag == "f":
+                formulas += 1
+            elif child_tag == "v":
+                value = child.text
+        if cell.get("t") == "e" and value:
+            error_details.setdefault(value, []).append(f"{sheet_name}!{ref}")
+    return formulas
+
+
+def _formula_report(filename):
+    try:
+        error_details = {err: [] for err in EXCEL_ERRORS}
+        formula_count = 0
+        with zipfile.ZipFile(filename) as archive:
+            _, sheets = _worksheet_parts(archive)
+            for sheet_name, part in sheets:
+                formula_count += _scan_worksheet(archive, part, sheet_name, error_details)
 
+        total_errors = sum(len(locations) for locations in error_details.values())
         result = {
             "status": "success" if total_errors == 0 else "errors_found",
             "total_errors": total_errors,
@@ -253,24 +448,6 @@ def _recalc_with_profile(filename, abs_path, timeout, profile_dir: Path):
                     entry["locations_truncated"] = len(locations) - MAX_LOCATIONS
                 result["error_summary"][err_type] = entry
 
-        wb.close()
-
-        wb_formulas = load_workbook(filename, data_only=False)
-        formula_count = 0
-        for sheet_name in wb_formulas.sheetnames:
-            ws = wb_formulas[sheet_name]
-            if not hasattr(ws, "iter_rows"):  
-                continue
-            for row in ws.iter_rows():
-                for cell in row:
-                    if (
-                        cell.value
-                        and isinstance(cell.value, str)
-                        and cell.value.startswith("=")
-                    ):
-                        formula_count += 1
-        wb_formulas.close()
-
         result["total_formulas"] = formula_count
 
         return result
@@ -284,7 +461,7 @@ def main():
     force = "--force" in sys.argv[1:]
 
     if not args:
-        print("Usage: python recalc.py <excel_file> [timeout_seconds] [--force]")
+        print("Usage: python recalc.py <excel_file> [more_excel_files...] [timeout_seconds] [--force]")
         print("\nRecalculates all formulas in an Excel file using LibreOffice")
         print("\nReturns JSON with error details:")
         print("  - status: 'success' or 'errors_found'")
@@ -294,14 +471,22 @@ def main():
         print("    - #VALUE!, #DIV/0!, #REF!, #NAME?, #NULL!, #NUM!, #N/A")
         print("\nOn any failure the JSON has an 'error' key and no 'status'.")
         print("--force recalculates even when it would destroy external links.")
+        print("\nWith several files, all are recalculated in one LibreOffice process and")
+        print("the JSON maps each file name to its result; timeout_seconds is per file.")
         sys.exit(1)
 
-    filename = args[0]
-    timeout = int(args[1]) if len(args) > 1 else 30
+    timeout = 30
+    if len(args) > 1 and args[-1].isdigit():
+        timeout = int(args.pop())
+
+    if len(args) == 1:
+        result = recalc(args[0], timeout, force=force)
+        print(json.dumps(result, indent=2))
+        sys.exit(1 if "error" in result else 0)
 
-    result = recalc(filename, timeout, force=force)
-    print(json.dumps(result, indent=2))
-    sys.exit(1 if "error" in result else 0)
+    results = recalc_many(args, timeout, force=force)
+    print(json.dumps(results, indent=2))
+    sys.exit(1 if any("error" in result for result in results.values()) else 0)
 
 
 if __name__ == "__main__":
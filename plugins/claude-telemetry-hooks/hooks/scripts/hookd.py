@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""Run hook scripts in one long-lived Python process instead of a fresh interpreter per event.
+
+hooks.json calls this file with the hook script to run. The call connects to a per-user Unix
+socket and hands over its stdin, stdout and stderr. The server keeps every script it has run
+compiled, with the library modules it imports loaded and, for scripts behind a __main__ guard,
+its regexes already built. Modules next to a script are imported afresh for every event. It
+forks a child per event, and the child runs the script on the caller's own file descriptors.
+The call then exits with the script's exit code. The client side only imports _socket and os,
+so it starts as fast as Python can.
+
+With no server listening, the call starts one in the background and runs the script itself, the
+same as calling python3 on it. The server exits after IDLE_SECONDS without events, when its
+socket is removed, or when this file changes. One server serves every plugin, and each plugin
+ships its own copy of this file. The socket lives in a directory only this user can enter. Set
+HOOKD=0 to always run hooks directly.
+
+Usage:
+    python3 -I -S hookd.py /path/to/hook_script.py < event.json
+    python3 hookd.py --serve [SCRIPT ...]
+    python3 hookd.py --stop
+"""
+
+import os
+import sys
+
+PROTOCOL = b"hookd1"
+SOCKET_ENV = "HOOKD_SOCKET"
+IDLE_SECONDS = 1800
+HOOK_TIMEOUT = 600
+
+
+def socket_path():
+    """Return the per-user socket path, from HOOKD_SOCKET when set."""
+    if os.environ.get(SOCKET_ENV):
+        return os.environ[SOCKET_ENV]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(runtime_dir, f"hookd-{os.getuid()}", "hookd.sock")
+
+
+def private_dir(path):
+    """Create the directory holding the default socket, and return whether only this user can use it."""
+    import stat
+
+    if os.environ.get(SOCKET_ENV):
+        return True
+    directory = os.path.dirname(path)
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    except OSError:
+        return False
+    st = os.lstat(directory)
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and stat.S_IMODE(st.st_mode) == 0o700
+
+
+def stamp(path):
+    """Return what changes when a file is edited, or None when it is gone."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def connect(path):
+    """Return a socket connected to a server this user owns, or None."""
+    import _socket
+
+    try:
+        if os.lstat(path).st_uid != os.getuid():
+            return None
+        sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    except (OSError, AttributeError):
+        return None
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def call(script):
+    """Run one hook script on the server and return its exit code, or None to run it here."""
+    import _socket
+
+    sock = connect(socket_path())
+    if sock is None:
+        return None
+    fields = [PROTOCOL, os.fsencode(os.path.abspath(script)), os.fsencode(os.getcwd())]
+    fields += [key + b"=" + value for key, value in os.environb.items()]
+    payload = b"\0".join(fields)
+    fds = b"".join(fd.to_bytes(4, sys.byteorder) for fd in (0, 1, 2))
+    reply = b""
+    try:
+        sent = sock.sendmsg([payload], [(_socket.SOL_SOCKET, _socket.SCM_RIGHTS, fds)])
+        sock.sendall(payload[sent:])
+        sock.shutdown(_socket.SHUT_WR)
+        while chunk := sock.recv(64):
+            reply += chunk
+    except OSError:
+        pass
+    finally:
+        sock.close()
+    if reply.strip() == b"fallback":
+        return None
+    try:
+        return int(reply)
+    except ValueError:
+        os.write(2, b"hookd: the hook server closed the connection without an exit code\n")
+        return 1
+
+
+def start_server(script):
+    """Start a detached server that preloads script, without waiting for it."""
+    pid = os.fork()
+    if pid:
+        os.waitpid(pid, 0)
+        return
+    os.setsid()
+    if os.fork():
+        os._exit(0)
+    null = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(null, fd)
+    try:
+        os.execv(sys.executable, [sys.executable, os.path.abspath(__file__), "--serve", script])
+    finally:
+        os._exit(1)
+
+
+def run_here(script):
+    """Replace this process with a plain interpreter running script."""
+    argv = [sys.executable, script]
+    if os.name == "posix":
+        os.execv(sys.executable, argv)
+    import subprocess
+
+    sys.exit(subprocess.call(argv))
+
+
+def serve(preload=()):
+    """Serve hook events until idle, stopped, or this file changes."""
+    import ast
+    import builtins
+    import fcntl
+    import importlib
+    import signal
+    import socket
+    import socketserver
+    import time
+    import traceback
+    import types
+
+    path = socket_path()
+    try:
+        if not private_dir(path):
+            return
+        lock = open(path + ".lock", "w")
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return
+    own_stamp = stamp(__file__)
+    scripts = {}
+
+    def load(script):
+        """Return the compiled script, compiling and warming it when new or edited."""
+        current = stamp(script)
+        cached = scripts.get(script)
+        if cached and cached[0] == current:
+            return cached[1]
+        with open(script, "rb") as fh:
+            source = fh.read()
+        code = compile(source, script, "exec")
+        tree = ast.parse(source)
+        loaded = set(sys.modules)
+        guarded = False
+        for node in tree.body:
+            names = []
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+                names = [node.module]
+            elif isinstance(node, ast.If) and "__main__" in ast.unparse(node.test):
+                guarded = True
+            for name in names:
+                try:
+                    importlib.import_module(name)
+                except Exception:
+                    pass
+        if guarded:
+            # a guarded script only defines things at import, which fills the re cache the child reuses
+            try:
+                exec(code, {"__name__": "hookd_warm", "__file__": script, "__builtins__": builtins})
+            except Exception:
+                pass
+        # modules next to a hook script are left for the child to import, so edits to them and other
+        # plugins' copies of the same module name are never served from this process
+        local = [os.path.dirname(script) + os.sep, os.path.dirname(os.path.abspath(__file__)) + os.sep]
+        for name in set(sys.modules) - loaded:
+            if (getattr(sys.modules[name], "__file__", None) or "").startswith(tuple(local)):
+                del sys.modules[name]
+        scripts[script] = (current, code)
+        return code
+
+    def run(code, script, env, cwd):
+        """Run a compiled script as __main__ on fds 0-2 and return its exit code."""
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.alarm(HOOK_TIMEOUT)
+        os.environ.clear()
+        os.environ.update(env)
+        os.chdir(cwd)
+        sys.stdin = open(0, closefd=False)
+        sys.stdout = open(1, "w", closefd=False)
+        sys.stderr = open(2, "w", closefd=False, errors="backslashreplace")
+        sys.argv = [script]
+        sys.path[0] = os.path.dirname(script)
+        module = types.ModuleType("__main__")
+        module.__file__ = script
+        module.__builtins__ = builtins
+        sys.modules["__main__"] = module
+        try:
+            exec(code, module.__dict__)
+            exit_code = 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                exit_code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                exit_code = 1
+        except BaseException:
+            traceback.print_exc()
+            exit_code = 1
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except OSError:
+                pass
+        return exit_code
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            code, script, env, cwd, fds = self.server.pending
+            for target, fd in enumerate(fds):
+                os.dup2(fd, target)
+                os.close(fd)
+            exit_code = run(code, script, env, cwd)
+            self.request.sendall(b"%d\n" % exit_code)
+
+    class HookServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+        timeout = 1
+
+        def __init__(self):
+            self.pid = os.getpid()
+            self.last_event = time.monotonic()
+            self.pending = None
+            self.stopping = False
+            if os.path.exists(path):
+                os.unlink(path)
+            old_umask = os.umask(0o177)
+            try:
+                super().__init__(path, Handler)
+            finally:
+                os.umask(old_umask)
+
+        def process_request(self, request, client_address):
+            self.last_event = time.monotonic()
+            fds = []
+            try:
+                data, ancdata, _, _ = request.recvmsg(1 << 16, socket.CMSG_SPACE(3 * 4))
+                for level, kind, value in ancdata:
+                    if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                        fds += [int.from_bytes(value[i : i + 4], sys.byteorder) for i in range(0, len(value), 4)]
+                while chunk := request.recv(1 << 16):
+                    data += chunk
+                fields = data.split(b"\0")
+                if fields[0] == b"stop":
+                    self.stopping = True
+                    request.sendall(b"stopped\n")
+                    return
+                if fields[0] != PROTOCOL or len(fds) != 3 or stamp(__file__) != own_stamp:
+                    self.stopping = fields[0] == PROTOCOL
+                    request.sendall(b"fallback\n")
+                    return
+                script, cwd = os.fsdecode(fields[1]), os.fsdecode(fields[2])
+                env = dict(os.fsdecode(field).partition("=")[::2] for field in fields[3:] if b"=" in field)
+                try:
+                    code = load(script)
+                except (OSError, SyntaxError, ValueError):
+                    request.sendall(b"fallback\n")
+                    return
+                self.pending = (code, script, env, cwd, fds)
+                super().process_request(request, client_address)
+            finally:
+                self.pending = None
+                for fd in fds:
+                    try:
+                        os.close(fd)
+                    except OSError:
+                        pass
+                self.shutdown_request(request)
+
+        def shutdown_request(self, request):
+            if request.fileno() >= 0:
+                super().shutdown_request(request)
+
+        def server_close(self):
+            super().server_close()
+            if self.pid == os.getpid() and os.path.exists(path):
+                os.unlink(path)
+
+    for script in preload:
+        try:
+            load(os.path.abspath(script))
+        except (OSError, SyntaxError, ValueError):
+            pass
+    with HookServer() as server:
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        listening = os.stat(path).st_ino
+        while not server.stopping and time.monotonic() - server.last_event < IDLE_SECONDS:
+            server.handle_request()
+            server.collect_children()
+            if (os.stat(path).st_ino if os.path.exists(path) else None) != listening:
+                break
+
+
+def stop():
+    """Ask the server to exit and return whether one answered."""
+    sock = connect(socket_path())
+    if sock is None:
+        return False
+    try:
+        sock.sendall(b"stop")
+        sock.shutdown(1)
+        return sock.recv(64).startswith(b"stopped")
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def main():
+    """Dispatch between the hook client, --serve and --stop."""
+    args = sys.argv[1:]
+    if args[:1] == ["--serve"]:
+        serve(args[1:])
+    elif args[:1] == ["--stop"]:
+        sys.exit(0 if stop() else 1)
+    elif len(args) == 1:
+        script = args[0]
+        enabled = os.name == "posix" and os.environ.get("HOOKD") != "0"
+        exit_code = call(script) if enabled else None
+        if exit_code is None:
+            if enabled:
+                start_server(script)
+            run_here(script)
+        sys.exit(exit_code)
+    else:
+        sys.stderr.write(__doc__)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
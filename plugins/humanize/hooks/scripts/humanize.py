@@ -9,6 +9,7 @@ common words only when they pile up. En-dash is allowed.
 Words draw on Wikipedia "Signs of AI writing": https://en.wikipedia.org/wiki/Wikipedia:Signs_of_AI_writing
 """
 
+import bisect
 import json
 import re
 import shlex
@@ -63,9 +64,6 @@ LIMIT = 3
 OFTEN = ["crucial", "essential", "vital", "significant", "moreover", "furthermore", "additionally", "aligns", "explore", "prompted"]
 
 MARKS = {"—": ("em-dash", "use commas or periods"), "§": ("section sign", "remove it"), ";": ("semicolon", "use a period or comma")}
-MARK_RE = re.compile("|".join(map(re.escape, MARKS)))
-SWAP_RE = re.compile(r"\b(" + "|".join(SWAP) + r")\b", re.IGNORECASE)
-OFTEN_RE = re.compile(r"\b(" + "|".join(OFTEN) + r")\b", re.IGNORECASE)
 
 # groups are the delimiter, the rest of the opening line, and the body
 HEREDOC = re.compile(r"<<-?[ \t]*[\"']?([A-Za-z_]\w*)[\"']?([^\n]*)\r?\n(.*?)\r?\n[ \t]*\1[ \t]*$", re.DOTALL | re.MULTILINE)
@@ -83,27 +81,99 @@ TEXT_KEYS = MESSAGE_KEYS | {"description", "title", "subject", "note", "summary"
 MD_EXT = {".md", ".markdown", ".mdx"}
 HASH_EXT = {".py", ".sh", ".bash", ".zsh", ".rb", ".yaml", ".yml", ".toml"}
 C_EXT = {".js", ".ts", ".jsx", ".tsx", ".c", ".cc", ".cpp", ".h", ".hpp", ".java", ".go", ".rs", ".css", ".scss", ".swift", ".kt", ".php"}
+
+NOT_NEWLINE = re.compile(r"[^\r\n]+")
+# outside a string the next quote or comment opener, inside one the next escape or closing quote
+HASH_TOKEN = re.compile(r"[\"'#]")
+C_TOKEN = re.compile(r"[\"'`]|//|/\*")
+QUOTE_END = {quote: re.compile(r"\\|" + quote) for quote in "\"'`"}
 # fmt: on
 
 
+def trie(words):
+    """Return a regex alternation of words factored by shared prefix, so a miss fails within a letter or two."""
+    tree = {}
+    for word in words:
+        node = tree
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def branches(node):
+        out = [re.escape(char) + branches(child) for char, child in sorted(node.items()) if char]
+        out += [""] if "" in node else []
+        return out[0] if len(out) == 1 else "(?:" + "|".join(out) + ")"
+
+    return branches(tree)
+
+
+def rule_pattern():
+    """Compile every rule into one pattern, named by group: p<index> for PHRASES, word, and mark.
+
+    A phrase sits in a lookahead and consumes nothing, so the words inside it still match on their
+    own, as they would in a pass per rule. Phrases are grouped under their first letter.
+    """
+    phrases = {}
+    for i, (pattern, _) in enumerate(PHRASES):
+        phrases.setdefault(pattern[0], []).append(f"(?P<p{i}>{pattern[1:]})")
+    phrase = "|".join(f"{first}(?:{'|'.join(rest)})" for first, rest in phrases.items())
+    word = trie(list(SWAP) + OFTEN)
+    mark = "|".join(map(re.escape, MARKS))
+    return re.compile(rf"(?=\b(?:{phrase})\b)|\b(?P<word>{word})\b|(?P<mark>{mark})", re.IGNORECASE)
+
+
+RULE_RE = rule_pattern()
+
+
 Region = namedtuple("Region", "source text")
 Finding = namedtuple("Finding", "region start end rule replacement")
 
 
+def merged(spans):
+    """Sort (start, end) spans and join the ones that touch or overlap."""
+    out = []
+    for start, end in sorted(spans):
+        if out and start <= out[-1][1]:
+            out[-1] = (out[-1][0], max(out[-1][1], end))
+        elif start < end:
+            out.append((start, end))
+    return out
+
+
+def outside(spans, length):
+    """Return the spans of 0..length that no given span covers."""
+    out, cursor = [], 0
+    for start, end in merged(spans):
+        out.append((cursor, start))
+        cursor = end
+    out.append((cursor, length))
+    return [(start, end) for start, end in out if start < end]
+
+
 def masked(text, keep):
-    """Mask excluded characters with spaces while preserving newlines."""
-    return "".join(char if char in "\r\n" or keep[i] else " " for i, char in enumerate(text))
+    """Mask characters outside the kept spans with spaces while preserving newlines."""
+    parts, cursor = [], 0
+    for start, end in merged(keep):
+        parts += [NOT_NEWLINE.sub(blank, text[cursor:start]), text[start:end]]
+        cursor = end
+    parts.append(NOT_NEWLINE.sub(blank, text[cursor:]))
+    return "".join(parts)
+
+
+def blank(match):
+    """Return spaces as long as the match."""
+    return " " * (match.end() - match.start())
 
 
 def md_text(text):
     """Mask fenced and inline Markdown code without changing source offsets."""
-    keep = [True] * len(text)
+    fences = []
     offset = 0
     fence = None
     for line in text.splitlines(keepends=True):
         match = re.match(r" {0,3}(`{3,}|~{3,})(.*)$", line.rstrip("\r\n"))
         if fence:
-            keep[offset : offset + len(line)] = [False] * len(line)
+            fences.append((offset, offset + len(line)))
             if (
                 match
                 and match.group(1)[0] == fence[0]
@@ -113,13 +183,18 @@ def md_text(text):
                 fence = None
         elif match:
             fence = match.group(1)
-            keep[offset : offset + len(line)] = [False] * len(line)
+            fences.append((offset, offset + len(line)))
         offset += len(line)
 
+    fences = merged(fences)
+    code = list(fences)
     i = 0
-    while i < len(text):
-        if text[i] != "`" or not keep[i]:
-            i += 1
+    f = 0
+    while (i := text.find("`", i)) >= 0:
+        while f < len(fences) and fences[f][1] <= i:
+            f += 1
+        if f < len(fences) and fences[f][0] <= i:
+            i = fences[f][1]
             continue
         end = i
         while end < len(text) and text[end] == "`":
@@ -129,70 +204,63 @@ def md_text(text):
         if close < 0:
             i = end
             continue
-        keep[i : close + len(delimiter)] = [False] * (close + len(delimiter) - i)
+        code.append((i, close + len(delimiter)))
         i = close + len(delimiter)
-    return masked(text, keep)
+    return masked(text, outside(code, len(text)))
 
 
 def hash_comments(text):
     """Mask everything except docstrings and quote-aware hash comments."""
-    keep = [False] * len(text)
+    keep = []
     for pattern in (r'^[ \t]*[rbuRBU]*""".*?"""', r"^[ \t]*[rbuRBU]*'''.*?'''"):
-        for match in re.finditer(pattern, text, flags=re.DOTALL | re.MULTILINE):
-            keep[match.start() : match.end()] = [True] * (match.end() - match.start())
+        keep += [match.span() for match in re.finditer(pattern, text, flags=re.DOTALL | re.MULTILINE)]
     offset = 0
     for line in text.splitlines(keepends=True):
-        quote = None
-        escaped = False
-        for i, char in enumerate(line):
-            if escaped:
-                escaped = False
-            elif char == "\\" and quote:
-                escaped = True
-            elif quote:
-                if char == quote:
-                    quote = None
-            elif char in "\"'":
-                quote = char
-            elif char == "#":
-                keep[offset + i : offset + len(line)] = [True] * (len(line) - i)
+        if "#" not in line:
+            offset += len(line)
+            continue
+        i = 0
+        while match := HASH_TOKEN.search(line, i):
+            quote = match.group()
+            if quote == "#":
+                keep.append((offset + match.start(), offset + len(line)))
+                break
+            i = match.end()
+            while (inner := QUOTE_END[quote].search(line, i)) and inner.group() != quote:
+                i = inner.start() + 2
+            if not inner:
                 break
+            i = inner.end()
         offset += len(line)
     return masked(text, keep)
 
 
 def c_comments(text):
     """Mask everything except quote-aware C-style comments."""
-    keep = [False] * len(text)
+    keep = []
     i = 0
-    quote = None
-    while i < len(text):
-        if quote:
-            if text[i] == "\\":
-                i += 2
-            else:
-                quote = None if text[i] == quote else quote
-                i += 1
-        elif text[i] in "\"'`":
-            quote = text[i]
-            i += 1
-        elif text.startswith("//", i):
-            end = text.find("\n", i)
+    while match := C_TOKEN.search(text, i):
+        token = match.group()
+        if token == "//":
+            end = text.find("\n", match.start())
             end = len(text) if end < 0 else end
-            keep[i:end] = [True] * (end - i)
+            keep.append((match.start(), end))
             i = end
-        elif text.startswith("/*", i):
-            end = text.find("*/", i + 2)
+        elif token == "/*":
+            end = text.find("*/", match.end())
             end = len(text) if end < 0 else end + 2
-            keep[i:end] = [True] * (end - i)
+            keep.append((match.start(), end))
             i = end
         else:
-            i += 1
+            i = match.end()
+            while (inner := QUOTE_END[token].search(text, i)) and inner.group() != token:
+                i = inner.start() + 2
+            i = inner.end() if inner else len(text)
     return masked(text, keep)
 
 
 def checked(path, text, selected=None):
-    """Return one source-preserving region for a known file type."""
+    """Return one source-preserving region for a known file type, masked to the selected spans if given."""
     ext = Path(path).suffix.lower()
     if ext in MD_EXT:
         text = md_text(text)
@@ -270,22 +338,35 @@ def bash_text(command):
     return parts
 
 
+def clipped(spans, ends, start, end, shift):
+    """Return the parts of sorted spans that fall in start..end, moved by shift."""
+    out = []
+    for span_start, span_end in spans[bisect.bisect_right(ends, start) :]:
+        if span_start >= end:
+            break
+        out.append((max(span_start, start) + shift, min(span_end, end) + shift))
+    return out
+
+
 def apply_edits(path, edits):
     """Apply editor replacements and select only their new text."""
     text = Path(path).read_text()
-    selected = [False] * len(text)
+    selected = []
     for edit in edits:
         old, new = edit["old_string"], edit["new_string"]
-        parts, keep, cursor = [], [], 0
+        ends = [end for _, end in selected]
+        parts, keep, cursor, shift = [], [], 0, 0
         while (start := text.find(old, cursor)) >= 0:
             parts += [text[cursor:start], new]
-            keep += selected[cursor:start] + [True] * len(new)
+            keep += clipped(selected, ends, cursor, start, shift)
+            keep.append((start + shift, start + shift + len(new)))
+            shift += len(new) - len(old)
             cursor = start + len(old)
             if not edit.get("replace_all"):
                 break
         parts.append(text[cursor:])
-        keep += selected[cursor:]
-        text, selected = "".join(parts), keep
+        keep += clipped(selected, ends, cursor, len(text), shift)
+        text, selected = "".join(parts), merged(keep)
     return checked(path, text, selected)
 
 
@@ -297,7 +378,7 @@ def apply_patch_file(path, action, block):
 
     original = Path(path).read_text()
     parts, selected = [], []
-    cursor = 0
+    cursor = length = 0
     for hunk in re.split(r"^@@.*$", block, flags=re.MULTILINE)[1:]:
         lines = [line for line in hunk.strip("\n").splitlines() if not line.startswith("\\ No newline")]
         old_lines = [line[1:] if line.startswith(("-", " ")) else line for line in lines if not line.startswith("+")]
@@ -305,16 +386,15 @@ def apply_patch_file(path, action, block):
         old, new = "\n".join(old_lines), "\n".join(new_lines)
         start = original.index(old, cursor)
         parts += [original[cursor:start], new]
-        selected += [False] * (start - cursor)
-        keep = []
+        length += start - cursor
         for i, line in enumerate(line for line in lines if not line.startswith("-")):
-            if i:
-                keep.append(False)
-            keep += [line.startswith("+")] * len(line[1:] if line.startswith(("+", " ")) else line)
-        selected += keep
+            length += 1 if i else 0
+            size = len(line[1:] if line.startswith(("+", " ")) else line)
+            if line.startswith("+"):
+                selected.append((length, length + size))
+            length += size
         cursor = start + len(old)
     parts.append(original[cursor:])
-    selected += [False] * (len(original) - cursor)
     return checked(path, "".join(parts), selected)
 
 
@@ -369,26 +449,32 @@ def detect(regions):
     findings = []
     piles = {}
     for region in regions:
-        for match in MARK_RE.finditer(region.text):
-            rule, replacement = MARKS[match.group()]
-            findings.append(Finding(region, *match.span(), rule, replacement))
-        for match in SWAP_RE.finditer(region.text):
-            word = match.group().lower()
-            replacement = SWAP[word]
-            findings.append(
-                Finding(
-                    region,
-                    *match.span(),
-                    f'"{word}"',
-                    replacement if replacement == "drop it" else f'use "{replacement}"',
-                )
-            )
-        for pattern, replacement in PHRASES:
-            for match in re.finditer(rf"\b(?:{pattern})\b", region.text, re.IGNORECASE):
-                findings.append(Finding(region, *match.span(), f'"{match.group()}"', replacement))
-        for match in OFTEN_RE.finditer(region.text):
-            rule = f'"{match.group().lower()}"'
-            piles.setdefault(rule, []).append(Finding(region, *match.span(), rule, "vary it"))
+        marks, swaps, phrases = [], [], []
+        for match in RULE_RE.finditer(region.text):
+            rule = match.lastgroup
+            if rule == "mark":
+                name, replacement = MARKS[match.group()]
+                marks.append(Finding(region, *match.span(), name, replacement))
+            elif rule == "word":
+                word = match.group().lower()
+                if word in SWAP:
+                    replacement = SWAP[word]
+                    swaps.append(
+                        Finding(
+                            region,
+                            *match.span(),
+                            f'"{word}"',
+                            replacement if replacement == "drop it" else f'use "{replacement}"',
+                        )
+                    )
+                else:
+                    piles.setdefault(f'"{word}"', []).append(Finding(region, *match.span(), f'"{word}"', "vary it"))
+            else:
+                index = int(rule[1:])
+                end = match.end(rule)
+                phrase = Finding(region, match.start(), end, f'"{region.text[match.start() : end]}"', PHRASES[index][1])
+                phrases.append((index, phrase))
+        findings += marks + swaps + [phrase for _, phrase in sorted(phrases, key=lambda item: item[0])]
     return findings, {rule: matches for rule, matches in piles.items() if len(matches) >= LIMIT}
 
 
@@ -423,18 +509,19 @@ def format_findings(findings, piles):
     return "humanize:\n" + "\n".join(lines)
 
 
-data = json.load(sys.stdin)
-findings, piles = detect(extract(data.get("tool_name", ""), data.get("tool_input") or {}))
+if __name__ == "__main__":
+    data = json.load(sys.stdin)
+    findings, piles = detect(extract(data.get("tool_name", ""), data.get("tool_input") or {}))
 
-if findings or piles:
-    print(
-        json.dumps(
-            {
-                "hookSpecificOutput": {
-                    "hookEventName": "PreToolUse",
-                    "permissionDecision": "deny",
-                    "permissionDecisionReason": format_findings(findings, piles),
+    if findings or piles:
+        print(
+            json.dumps(
+                {
+                    "hookSpecificOutput": {
+                        "hookEventName": "PreToolUse",
+                        "permissionDecision": "deny",
+                        "permissionDecisionReason": format_findings(findings, piles),
+                    }
                 }
-            }
+            )
         )
-    )
@@ -26,21 +26,21 @@ def check_prettier_version() -> bool:
     return False
 
 
-def main():
+def run(data):
+    """Format the shell script named in one hook payload with prettier-plugin-sh."""
     try:
-        data = json.load(sys.stdin)
         file_path = data.get("tool_input", {}).get("file_path", "")
 
         if not file_path.endswith(('.sh', '.bash')):
-            sys.exit(0)
+            return
 
         sh_file = Path(file_path)
         if not sh_file.exists() or any(p in sh_file.parts for p in ['.git', '.venv', 'venv', 'env', '.env', '__pycache__', '.mypy_cache', '.pytest_cache', '.tox', '.nox', '.eggs', 'eggs', '.idea', '.vscode', 'node_modules', 'site-packages', 'build', 'dist', '.claude']):
-            sys.exit(0)
+            return
 
         # Check if prettier is available
         if not check_prettier_version():
-            sys.exit(0)
+            return
 
         # Try prettier with prettier-plugin-sh, handle any failure gracefully
         try:
@@ -52,6 +52,13 @@ def main():
     except Exception:
         pass
 
+
+def main():
+    try:
+        data = json.load(sys.stdin)
+    except Exception:
+        sys.exit(0)
+    run(data)
     sys.exit(0)
 
 if __name__ == "__main__":
@@ -476,16 +476,15 @@ def preserve_trailing_newlines(original: str, formatted: str) -> str:
     return formatted if o == f else formatted.rstrip("\n") + ("\n" * o)
 
 
-def read_python_path() -> Path | None:
-    """Read the Python path from stdin payload.
+def read_python_path(data: dict) -> Path | None:
+    """Read the Python path from a hook payload.
+
+    Args:
+        data (dict): Hook input payload.
 
     Returns:
         (Path | None): Python file path when present and valid.
     """
-    try:
-        data = json.load(sys.stdin)
-    except Exception:
-        return None
     file_path = data.get("tool_input", {}).get("file_path", "")
     path = Path(file_path) if file_path else None
     if not path or path.suffix != ".py" or not path.exists():
@@ -518,9 +517,13 @@ def read_python_path() -> Path | None:
     return path
 
 
-def main() -> None:
-    """Format Python docstrings in files."""
-    python_file = read_python_path()
+def run(data: dict) -> None:
+    """Format Python docstrings in the file named in one hook payload.
+
+    Args:
+        data (dict): Hook input payload.
+    """
+    python_file = read_python_path(data)
     if python_file:
         try:
             content = python_file.read_text()
@@ -536,6 +539,15 @@ def main() -> None:
                 }
             }
             print(json.dumps(output))
+
+
+def main() -> None:
+    """Format Python docstrings in files."""
+    try:
+        data = json.load(sys.stdin)
+    except Exception:
+        sys.exit(0)
+    run(data)
     sys.exit(0)
 
 
@@ -88,13 +88,15 @@ def format_code_with_ruff(temp_dir: Path) -> None:
         temp_dir (Path): Directory containing extracted Python blocks.
     """
     try:
-        subprocess.run(["ruff", "format", "--line-length=120", str(temp_dir)], check=True)
+        result = subprocess.run(["ruff", "format", "--line-length=120", str(temp_dir)], capture_output=True, text=True)
+        print(result.stdout + result.stderr, end="")
+        result.check_returncode()
         print("Completed ruff format ✅")
     except Exception as exc:
         print(f"ERROR running ruff format ❌ {exc}")
 
     try:
-        subprocess.run(
+        result = subprocess.run(
             [
                 "ruff",
                 "check",
@@ -104,8 +106,11 @@ def format_code_with_ruff(temp_dir: Path) -> None:
                 "--ignore=B018,BLE001,D100,D101,D103,D104,D203,D205,D212,D213,D401,D406,D407,D413,F821,F841,RUF001,RUF002,RUF012,S110",
                 str(temp_dir),
             ],
-            check=True,
+            capture_output=True,
+            text=True,
         )
+        print(result.stdout + result.stderr, end="")
+        result.check_returncode()
         print("Completed ruff check ✅")
     except Exception as exc:
         print(f"ERROR running ruff check ❌ {exc}")
@@ -280,16 +285,15 @@ def format_markdown_file(markdown_file: Path) -> None:
     run_prettier(markdown_file)
 
 
-def read_markdown_path() -> Path | None:
-    """Read the markdown path from stdin payload.
+def read_markdown_path(data: dict) -> Path | None:
+    """Read the markdown path from a hook payload.
+
+    Args:
+        data (dict): Hook input payload.
 
     Returns:
         markdown_path (Path | None): Markdown path when present and valid.
     """
-    try:
-        data = json.load(sys.stdin)
-    except Exception:
-        return None
     file_path = data.get("tool_input", {}).get("file_path", "")
     path = Path(file_path) if file_path else None
     if not path or path.suffix.lower() != ".md" or not path.exists():
@@ -299,11 +303,24 @@ def read_markdown_path() -> Path | None:
     return path
 
 
-def main() -> None:
-    """Run markdown formatting hook."""
-    markdown_file = read_markdown_path()
+def run(data: dict) -> None:
+    """Format the markdown file named in one hook payload.
+
+    Args:
+        data (dict): Hook input payload.
+    """
+    markdown_file = read_markdown_path(data)
     if markdown_file:
         format_markdown_file(markdown_file)
+
+
+def main() -> None:
+    """Run markdown formatting hook."""
+    try:
+        data = json.load(sys.stdin)
+    except Exception:
+        sys.exit(0)
+    run(data)
     sys.exit(0)
 
 
@@ -1,19 +1,33 @@
 #!/usr/bin/env python3
-"""Run file formatters for every path changed by a write tool."""
+"""Run file formatters for every path changed by a write tool.
 
+The formatters are imported and run in this process through their run(data) entry point. When one
+Codex patch changes several files, each file is formatted on its own thread, with that file's
+formatters run in order and their output collected per thread.
+"""
+
+import io
 import json
 import re
-import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import bash_formatting
+import format_python_docstrings
+import markdown_formatting
+import prettier_formatting
+import python_code_quality
+
+MAX_WORKERS = 8
 FORMATTERS = {
-    ".py": ("format_python_docstrings.py", "python_code_quality.py"),
-    ".md": ("markdown_formatting.py",),
-    ".sh": ("bash_formatting.py",),
-    ".bash": ("bash_formatting.py",),
+    ".py": (format_python_docstrings, python_code_quality),
+    ".md": (markdown_formatting,),
+    ".sh": (bash_formatting,),
+    ".bash": (bash_formatting,),
     **{
-        suffix: ("prettier_formatting.py",)
+        suffix: (prettier_formatting,)
         for suffix in (
             ".js",
             ".jsx",
@@ -33,6 +47,23 @@ FORMATTERS = {
 }
 
 
+class ThreadOutput(io.TextIOBase):
+    """Stream that sends each thread's writes to that thread's buffer, or to the wrapped stream."""
+
+    def __init__(self, stream):
+        """Wrap stream and start with no thread capturing."""
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text: str) -> int:
+        """Write text to the calling thread's buffer when it has one."""
+        return (getattr(self.local, "buffer", None) or self.stream).write(text)
+
+    def flush(self) -> None:
+        """Flush the wrapped stream."""
+        self.stream.flush()
+
+
 def changed_paths(data: dict) -> list[str]:
     """Return changed file paths from Claude writes or Codex patches.
 
@@ -52,30 +83,51 @@ def changed_paths(data: dict) -> list[str]:
     )
 
 
+def format_path(data: dict, file_path: str, stdout: ThreadOutput, stderr: ThreadOutput) -> list[str]:
+    """Run each formatter for one file in order and return what they printed.
+
+    Args:
+        data (dict): Hook input payload.
+        file_path (str): Changed file to format.
+        stdout (ThreadOutput): Installed sys.stdout that captures this thread's writes.
+        stderr (ThreadOutput): Installed sys.stderr that captures this thread's writes.
+
+    Returns:
+        (list[str]): Non-empty stdout and stderr text from each formatter.
+    """
+    payload = {
+        **data,
+        "tool_input": {
+            **(data.get("tool_input") or {}),
+            "file_path": file_path,
+        },
+    }
+    messages = []
+    for formatter in FORMATTERS.get(Path(file_path).suffix.lower(), ()):
+        stdout.local.buffer, stderr.local.buffer = io.StringIO(), io.StringIO()
+        try:
+            formatter.run(payload)
+        except Exception as e:
+            print(f"{formatter.__name__} failed for {file_path}: {type(e).__name__}: {e}", file=sys.stderr)
+        finally:
+            out, err = stdout.local.buffer.getvalue(), stderr.local.buffer.getvalue()
+            stdout.local.buffer = stderr.local.buffer = None
+        messages.extend(part for part in (out.strip(), err.strip()) if part)
+    return messages
+
+
 def main() -> None:
-    """Run each formatter with one normalized file path."""
+    """Run each formatter with one normalized file path, one thread per file."""
     data = json.load(sys.stdin)
-    messages = []
-    for file_path in dict.fromkeys(changed_paths(data)):
-        payload = json.dumps(
-            {
-                **data,
-                "tool_input": {
-                    **(data.get("tool_input") or {}),
-                    "file_path": file_path,
-                },
-            }
-        )
-        for formatter in FORMATTERS.get(Path(file_path).suffix.lower(), ()):
-            result = subprocess.run(
-                [sys.executable, str(Path(__file__).with_name(formatter))],
-                input=payload,
-                capture_output=True,
-                text=True,
-            )
-            messages.extend(
-                part for part in (result.stdout.strip(), result.stderr.strip()) if part
-            )
+    paths = list(dict.fromkeys(changed_paths(data)))
+    stdout, stderr = ThreadOutput(sys.stdout), ThreadOutput(sys.stderr)
+    sys.stdout, sys.stderr = stdout, stderr
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(paths)))) as executor:
+            results = list(executor.map(lambda file_path: format_path(data, file_path, stdout, stderr), paths))
+    finally:
+        sys.stdout, sys.stderr = stdout.stream, stderr.stream
+    messages = [message for result in results for message in result]
     if messages:
         print(
             json.dumps(
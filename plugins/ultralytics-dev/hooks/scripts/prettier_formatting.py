@@ -32,25 +32,25 @@ def check_prettier_version() -> bool:
     return False
 
 
-def main():
+def run(data):
+    """Format the file named in one hook payload with prettier."""
     try:
-        data = json.load(sys.stdin)
         file_path = data.get("tool_input", {}).get("file_path", "")
 
         if not file_path:
-            sys.exit(0)
+            return
 
         py_file = Path(file_path)
         if not py_file.exists() or py_file.suffix not in PRETTIER_EXTENSIONS:
-            sys.exit(0)
+            return
 
         # Skip virtual env, cache, .claude directories, lock files, model.json, and minified assets
         if any(p in py_file.parts for p in ['.git', '.venv', 'venv', 'env', '.env', '__pycache__', '.mypy_cache', '.pytest_cache', '.tox', '.nox', '.eggs', 'eggs', '.idea', '.vscode', 'node_modules', 'site-packages', 'build', 'dist', '.claude']) or LOCK_FILE_PATTERN.match(py_file.name) or py_file.name == 'model.json' or py_file.name.endswith(('.min.js', '.min.css')):
-            sys.exit(0)
+            return
 
         # Check if prettier is available
         if not check_prettier_version():
-            sys.exit(0)
+            return
 
         # Run prettier
         subprocess.run([
@@ -60,6 +60,13 @@ def main():
     except Exception:
         pass
 
+
+def main():
+    try:
+        data = json.load(sys.stdin)
+    except Exception:
+        sys.exit(0)
+    run(data)
     sys.exit(0)
 
 if __name__ == "__main__":
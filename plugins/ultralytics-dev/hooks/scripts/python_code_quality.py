@@ -12,22 +12,18 @@ EXCLUDED_DIRS = {'.git', '.venv', 'venv', 'env', '.env', '__pycache__', '.mypy_c
                  'build', 'dist', '.claude'}
 
 
-def main():
-    try:
-        data = json.load(sys.stdin)
-    except Exception:
-        sys.exit(0)
-
+def run(data):
+    """Lint and format the file named in one hook payload, printing feedback on errors."""
     file_path = data.get("tool_input", {}).get("file_path", "")
     if not file_path.endswith('.py'):
-        sys.exit(0)
+        return
 
     py_file = Path(file_path)
     if not py_file.exists() or any(p in py_file.parts for p in EXCLUDED_DIRS):
-        sys.exit(0)
+        return
 
     if not shutil.which('ruff'):
-        sys.exit(0)
+        return
 
     work_dir = py_file.parent
     issues = []
@@ -60,6 +56,13 @@ def main():
                    "additionalContext": "\n\n".join(issues)}}
         print(json.dumps(output))
 
+
+def main():
+    try:
+        data = json.load(sys.stdin)
+    except Exception:
+        sys.exit(0)
+    run(data)
     sys.exit(0)
 
 